@@ -0,0 +1,75 @@
+"""
+Market Themes Momentum Dashboard — scoring package
+==================================================
+RULES:
+  - Every stock appears in exactly ONE theme (no cross-theme duplication)
+  - 5-6 stocks per theme
+  - All stocks have $10M+ average daily dollar volume
+  - Each stock is a pure-play or primary revenue driver for that theme
+
+SCORING:
+  Composite Score = RetBlend×35% + RSBlend×30% + Resilience×20% + Breadth×15%
+  Fully data-driven — no manual MA signal input
+  RetBlend / RSBlend = 1D×20% + 1W×35% + 1M×45%
+  Resilience = avg theme return on SPY red days minus avg SPY return (last 20 sessions)
+  Breadth    = % of constituents above 20-day MA (0–10 scale)
+  ADR weight = 1/ADR% so high-vol small caps don't dominate the signal
+
+  1D = current price vs previous session close
+  1W = today vs the last NYSE session close on or before 7 calendar days ago
+  1M = today vs the last NYSE session close on or before 30 calendar days ago
+
+Library use:
+  from market_themes import ThemeScorer
+  scorer = ThemeScorer().load()
+  scorer.theme("ai")
+
+Command line: python -m market_themes  (or the fetch_data.py wrapper)
+"""
+
+from .themes   import (THEMES, ThemeConfigError, check_duplicates, load_themes,
+                       ticker_index, validate_themes)
+from .net      import http_get, request, CircuitOpen
+from .store    import load_bars, save_bars, merge_bars, HISTORY_RANGE, HISTORY_DAYS
+from .fetcher  import (parse_chart, raw_from_bars, fetch, fetch_cached, fetch_quote, fetch_spark,
+                       prefetch, prefetch_intraday, report_health, universe_of)
+from .sessions import SessionCalendar, nyse
+from .metrics  import (LOOKBACKS, TIMEFRAMES, reference_times, mkets, compute_spy, red_day_avg,
+                       price_on, pct, wavg, avg, compute_adr_adv, compute_resilience,
+                       compute_breadth, compute_vol_accumulation, compute_adr_contraction,
+                       compute_rs_trend, compute_proximity_to_high)
+from .engine   import compute_universe
+from .records  import Bars, TickerMetrics
+from .cohesion import compute_cohesion
+from .scoring  import (ADV_MIN, ThemeScorer, score_theme, build_spark5, build_output,
+                       build_details, build_vectors)
+from .output   import render_output, write_output, write_run_stats
+from .columnar import render_columnar, write_columnar, load_columnar, columnar_records
+from .history  import ScoreArchive, archive_run, session_date
+from .alerts   import AlertConfigError, AlertState, compile_rules, load_rules
+from .screen   import UniverseState
+from .backtest import session_scores, run_backtest
+from .stats    import RunStats
+from .cli      import main
+
+__all__ = [
+    "THEMES", "ThemeConfigError", "check_duplicates", "load_themes", "ticker_index",
+    "validate_themes",
+    "http_get", "request", "CircuitOpen",
+    "load_bars", "save_bars", "merge_bars", "HISTORY_RANGE", "HISTORY_DAYS",
+    "parse_chart", "raw_from_bars", "fetch", "fetch_cached", "fetch_quote", "fetch_spark",
+    "prefetch", "prefetch_intraday", "report_health", "universe_of",
+    "SessionCalendar", "nyse",
+    "LOOKBACKS", "TIMEFRAMES", "reference_times", "mkets", "compute_spy", "red_day_avg",
+    "price_on", "pct", "wavg", "avg", "compute_adr_adv", "compute_resilience",
+    "compute_breadth", "compute_vol_accumulation", "compute_adr_contraction",
+    "compute_rs_trend", "compute_proximity_to_high",
+    "compute_universe", "Bars", "TickerMetrics", "compute_cohesion",
+    "ADV_MIN", "ThemeScorer", "score_theme", "build_spark5", "build_output", "build_details", "build_vectors",
+    "render_output", "write_output", "write_run_stats",
+    "render_columnar", "write_columnar", "load_columnar", "columnar_records",
+    "ScoreArchive", "archive_run", "session_date", "UniverseState",
+    "AlertConfigError", "AlertState", "compile_rules", "load_rules",
+    "session_scores", "run_backtest",
+    "RunStats", "main",
+]
@@ -0,0 +1,236 @@
+"""Declarative alert rules, evaluated after each publish against what changed
+since the previous run; triggered alerts are appended to an events file."""
+
+import json, operator, os, re
+
+from .metrics import TIMEFRAMES
+from .scoring import DETAIL_KEYS
+from .themes import _read_config
+
+ALERTS_FILE  = os.environ.get("ALERTS_FILE")
+ALERTS_PATH  = os.environ.get("ALERTS_PATH", os.path.join("data", "alerts.jsonl"))
+ALERTS_STATE = os.environ.get("ALERTS_STATE", os.path.join("data", "alerts_state.json"))
+
+class AlertConfigError(ValueError):
+    """A rules file that can't be read or fails validation (lists every problem)."""
+
+# ── Rules ─────────────────────────────────────────────────────────────────────
+# {"rules": [{"id": "score-5", "when": "score crosses above 5"}, …]} (or
+# [[rules]] tables in TOML). "scope" is "theme" (default) or "constituent";
+# "when" is one or more conditions joined by "and":
+#   FIELD > N   (also >=, <, <=, ==, !=)      true while it holds
+#   FIELD crosses above N / crosses below N  previous run on the other side
+#   FIELD rises / falls [by N]               moved (by at least N) since then
+# Fields are the published record keys, plus "rank" (1 = top) for themes.
+# A rule made only of comparisons fires when it becomes true, not every run
+# it stays true; a rule with a crossing or a move fires each run it matches.
+THEME_ALERT_FIELDS = (("rank", "rank_chg", "score", "emerging", "price", "resilience", "breadth",
+                       "vol_accum", "adr_contraction", "rs_trend", "n_stocks", "cohesion")
+                      + tuple(f"ret{tf}" for tf in TIMEFRAMES) + tuple(f"rs{tf}" for tf in TIMEFRAMES))
+CONSTITUENT_ALERT_FIELDS = DETAIL_KEYS + ("price", "adv", "theme_corr")
+SCOPES = {"theme": THEME_ALERT_FIELDS, "constituent": CONSTITUENT_ALERT_FIELDS}
+RULE_FIELDS = ("id", "scope", "when")
+_ID_RE = re.compile(r"^[A-Za-z0-9][A-Za-z0-9_.-]{0,63}$")
+
+_NUM  = r"(-?\d+(?:\.\d+)?)"
+_COND = re.compile(rf"^([a-zA-Z_]\w*)\s+(?:(>=|<=|==|!=|>|<)\s*{_NUM}"
+                   rf"|crosses\s+(above|below)\s+{_NUM}|(rises|falls)(?:\s+by\s+{_NUM})?)$")
+_OPS  = {">": operator.gt, ">=": operator.ge, "<": operator.lt, "<=": operator.le,
+         "==": operator.eq, "!=": operator.ne}
+
+def _condition(text):
+    """(field, test(now, prev) → bool, is a level comparison) for one condition."""
+    m = _COND.match(text.strip())
+    if not m:
+        raise ValueError(f"can't parse condition {text.strip()!r}")
+    f, op, x, side, cx, move, by = m.groups()
+    if op:
+        cmp, x = _OPS[op], float(x)
+        return f, lambda now, prev: now.get(f) is not None and cmp(now[f], x), True
+    if side:
+        x = float(cx)
+        if side == "above":
+            test = lambda v, p: p <= x < v
+        else:
+            test = lambda v, p: v < x <= p
+    else:
+        d    = float(by) if by else 0.0
+        sign = 1 if move == "rises" else -1
+        test = (lambda v, p: sign * (v - p) >= d) if by else (lambda v, p: sign * (v - p) > 0)
+    return f, lambda now, prev: (now.get(f) is not None and prev.get(f) is not None
+                                 and test(now[f], prev[f])), False
+
+class Rule:
+    """One compiled rule: test(now, prev) over {field: value} dicts."""
+    __slots__ = ("id", "scope", "when", "fields", "test", "level")
+
+    def __init__(self, rid, scope, when, conditions):
+        self.id, self.scope, self.when = rid, scope, when
+        self.fields = tuple(dict.fromkeys(f for f, _, _ in conditions))
+        self.level  = all(lv for _, _, lv in conditions)
+        tests = [t for _, t, _ in conditions]
+        self.test = tests[0] if len(tests) == 1 else (lambda now, prev: all(t(now, prev) for t in tests))
+
+    def __repr__(self):
+        return f"<Rule {self.id} [{self.scope}] {self.when}>"
+
+def compile_rules(entries, source="rules"):
+    """Rule dicts → Rule objects. Collects every problem before raising AlertConfigError."""
+    if not isinstance(entries, list):
+        raise AlertConfigError(f"{source}: expected a list of rules")
+    out, errors, ids = [], [], set()
+    for i, e in enumerate(entries):
+        where = f"{source}[{i}]"
+        if not isinstance(e, dict):
+            errors.append(f"{where}: expected a table/object, got {type(e).__name__}")
+            continue
+        where += f" ({e.get('id')!r})" if "id" in e else ""
+        bad = len(errors)
+        unknown = set(e) - set(RULE_FIELDS)
+        if unknown:
+            errors.append(f"{where}: unknown field(s) {', '.join(sorted(unknown))}")
+        rid, scope, when = e.get("id"), e.get("scope", "theme"), e.get("when")
+        if not isinstance(rid, str) or not _ID_RE.match(rid):
+            errors.append(f"{where}: id must be 1-64 chars of A-Z, a-z, 0-9, '.', '-' or '_'")
+        elif rid in ids:
+            errors.append(f"{where}: duplicate id")
+        ids.add(rid)
+        if scope not in SCOPES:
+            errors.append(f"{where}: scope must be one of {', '.join(SCOPES)}")
+        conditions = []
+        if not isinstance(when, str) or not when.strip():
+            errors.append(f"{where}: when is required")
+        else:
+            for part in re.split(r"\s+and\s+", when.strip()):
+                try:
+                    conditions.append(_condition(part))
+                except ValueError as err:
+                    errors.append(f"{where}: {err}")
+            if scope in SCOPES:
+                for f, _, _ in conditions:
+                    if f not in SCOPES[scope]:
+                        errors.append(f"{where}: unknown {scope} field {f!r}")
+        if len(errors) == bad:
+            out.append(Rule(rid, scope, " ".join(when.split()), conditions))
+    if errors:
+        raise AlertConfigError(f"{len(errors)} problem(s) in {source}:\n  " + "\n  ".join(errors))
+    return out
+
+def load_rules(path):
+    """Compiled rules from a JSON / TOML / YAML file."""
+    cfg = _read_config(path, AlertConfigError, "alert rules")
+    if isinstance(cfg, dict):
+        unknown = set(cfg) - {"rules"}
+        if unknown:
+            raise AlertConfigError(f"{path}: unknown top-level key(s) {', '.join(sorted(unknown))}")
+        cfg = cfg.get("rules", [])
+    return compile_rules(cfg, path)
+
+# ── Evaluation ────────────────────────────────────────────────────────────────
+# The state file keeps, per theme / constituent, only the fields some rule
+# reads (the prior snapshot), plus which level rules are currently true:
+#   {"rules": {id: "scope: when"}, "values": {scope: {key: {field: value}}},
+#    "active": {id: [key, …]}}
+# Each run compares those fields with the new records; a rule is evaluated
+# only on records where a field it reads changed, so the work follows the
+# deltas. A new or edited rule is evaluated everywhere once to set its
+# baseline, without firing. Constituent keys are "<theme id>/<ticker>".
+def _records(output, details):
+    """(scope, key, theme id, ticker, record) for every theme and constituent."""
+    for i, t in enumerate(output["themes"]):
+        yield "theme", t["id"], t["id"], None, {**t, "rank": i + 1}
+    for tid, d in details.items():
+        for row in d.get("constituents", ()):
+            yield "constituent", f"{tid}/{row['ticker']}", tid, row["ticker"], row
+
+class AlertState:
+    def __init__(self, path=ALERTS_STATE):
+        self.path = path
+        try:
+            with open(path) as f:
+                state = json.load(f)
+        except (FileNotFoundError, ValueError):
+            state = {}
+        self.rules  = state.get("rules", {})
+        self.values = {s: state.get("values", {}).get(s, {}) for s in SCOPES}
+        self.active = {rid: set(keys) for rid, keys in state.get("active", {}).items()}
+        self.stats  = {}
+
+    def evaluate(self, rules, output, details):
+        """Events for this run's records; updates the state (save() to keep it)."""
+        sig   = {r.id: f"{r.scope}: {r.when}" for r in rules}
+        fresh = {r.id for r in rules if self.rules.get(r.id) != sig[r.id]}
+        by_field = {s: {} for s in SCOPES}          # scope → field → rules reading it
+        for r in rules:
+            for f in r.fields:
+                by_field[r.scope].setdefault(f, []).append(r)
+        fields = {s: list(by_field[s]) for s in SCOPES}
+        for rid in fresh:
+            self.active[rid] = set()
+        baseline = [r for r in rules if r.id in fresh]
+
+        events, seen, changed_n, tested = [], {s: set() for s in SCOPES}, 0, 0
+        meta = {"updated": output.get("updated"), "mode": output.get("mode")}
+        for scope, key, tid, ticker, rec in _records(output, details):
+            if not fields[scope]:
+                continue
+            seen[scope].add(key)
+            now  = {f: rec.get(f) for f in fields[scope]}
+            prev = self.values[scope].get(key)
+            if prev == now:
+                todo = [r for r in baseline if r.scope == scope]
+            else:
+                changed_n += 1
+                self.values[scope][key] = now
+                prev = prev or {}
+                moved = [f for f in fields[scope] if f not in prev or prev[f] != now[f]]
+                todo  = list({r.id: r for f in moved for r in by_field[scope][f]}.values())
+                todo += [r for r in baseline if r.scope == scope and r not in todo]
+            for r in todo:
+                tested += 1
+                hit = r.test(now, prev)
+                if r.level:                  # fires on false → true only
+                    if hit == (key in self.active[r.id]):
+                        continue
+                    if not hit:
+                        self.active[r.id].discard(key)
+                        continue
+                    self.active[r.id].add(key)
+                if hit and r.id not in fresh:
+                    ev = {**meta, "rule": r.id, "scope": scope, "theme": tid}
+                    if ticker is not None:
+                        ev["ticker"] = ticker
+                    ev.update({"when": r.when, "values": {f: now[f] for f in r.fields},
+                               "prev": {f: prev.get(f) for f in r.fields}})
+                    events.append(ev)
+
+        for s in SCOPES:                 # records and fields no rule reads any more
+            if not fields[s]:
+                self.values[s] = {}
+            for key in self.values[s].keys() - seen[s]:
+                del self.values[s][key]
+        scope_of = {r.id: r.scope for r in rules}
+        self.active = {rid: keys & seen[scope_of[rid]] for rid, keys in self.active.items()
+                       if rid in scope_of}
+        self.rules = sig
+        self.stats = {"records": sum(len(v) for v in seen.values()), "changed": changed_n,
+                      "tested": tested, "fired": len(events), "baseline": len(baseline)}
+        return events
+
+    def save(self):
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        state = {"rules": self.rules, "values": self.values,
+                 "active": {rid: sorted(keys) for rid, keys in sorted(self.active.items())}}
+        tmp = self.path + ".tmp"
+        with open(tmp, "w") as f:
+            f.write(json.dumps(state, separators=(",", ":")))     # C encoder; json.dump streams in Python
+        os.replace(tmp, self.path)
+
+def append_events(events, path=ALERTS_PATH):
+    """Append events to the JSON-lines log (never rewritten)."""
+    if not events:
+        return
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with open(path, "a") as f:
+        for ev in events:
+            f.write(json.dumps(ev, separators=(",", ":"), ensure_ascii=False) + "\n")
@@ -0,0 +1,458 @@
+"""Backtest: the composite and emerging scores re-evaluated at every stored
+session, ranked, rotated top-N and measured against forward returns."""
+
+import datetime, os
+
+import numpy as np
+
+from .metrics import LOOKBACKS
+from .records import Bars
+from .scoring import ADV_MIN, BLEND_WEIGHTS, EMERGING_WEIGHTS, SCORE_WEIGHTS
+from .sessions import nyse
+from .store import load_bars
+
+BACKTEST_TOP  = int(os.environ.get("BACKTEST_TOP", "5"))     # themes held by the rotation
+BACKTEST_HOLD = int(os.environ.get("BACKTEST_HOLD", "5"))    # sessions between rebalances
+HORIZONS      = {"1W": 5, "1M": 21}                          # forward-return windows, sessions
+QUANTILES     = 5
+
+# ══════════════════════════════════════════════════════════════════════════════
+# SESSION SCORES — the live scoring at every past session, in one pass
+# ══════════════════════════════════════════════════════════════════════════════
+# Replaying session D means scoring what the 22:00 UTC job would have seen on
+# D: each ticker's bars through that UTC day, priced at its last valid close
+# (prev close = the one before), lookbacks anchored from D. Every per-ticker
+# metric reads "the last N valid values" of some column, so each column is
+# compacted once per ticker (valid values moved left, in order) and the
+# running count of valid values at each session indexes the window's end —
+# the N-value window at every (ticker, session) is N column gathers. Sums run
+# over the window left → right and rounding is Python's, so each cell equals
+# compute_universe() / score_theme() for that session bit for bit
+# (tools/check_backtest.py verifies it). Themes aggregate the same way over
+# their constituent slots, every session at once.
+
+def session_time(ts):
+    """When the daily job runs for the session at `ts` (22:00 UTC that day)."""
+    return datetime.datetime.utcfromtimestamp(int(ts) // 86400 * 86400) + datetime.timedelta(hours=22)
+
+def _round(x, nd):
+    """round(v, nd) for every cell (NaN stays NaN). rint() of the scaled value
+    is exact unless it sits within a hair of a .5 tie; those cells go through
+    Python's round()."""
+    scale = 10.0 ** nd
+    y     = x * scale
+    out   = np.rint(y) / scale
+    with np.errstate(invalid="ignore"):
+        near = np.abs(y - np.floor(y) - 0.5) < 1e-6
+    for i in np.flatnonzero(near).tolist():
+        out.flat[i] = round(float(x.flat[i]), nd)
+    return out
+
+def _pct(cur, base):
+    ok = (np.nan_to_num(cur) != 0) & (np.nan_to_num(base) != 0)
+    return np.where(ok, _round((cur - base) / np.abs(base) * 100, 2), np.nan)
+
+def _seqsum(cells):
+    """Cell-wise sum of a list of arrays, left → right like sum(); NaN skipped."""
+    acc = 0.0
+    for x in cells:
+        acc = acc + np.where(np.isnan(x), 0.0, x)
+    return acc
+
+def _counts(mask, at):
+    """Valid cells per row up to calendar column `at` (−1 = none), per session."""
+    cum = np.zeros((mask.shape[0], mask.shape[1] + 1), dtype=np.int64)
+    np.cumsum(mask, axis=1, out=cum[:, 1:])
+    return cum[:, np.asarray(at) + 1]
+
+def _compact(mask, *arrays):
+    """Each row's cells where `mask` holds, moved left in order, behind one
+    NaN column — so column k is the k-th valid value and column 0 is "none"."""
+    order = np.argsort(~mask, axis=1, kind="stable")
+    n     = mask.sum(axis=1)
+    width = int(n.max()) if n.size else 0
+    keep  = np.arange(width) < n[:, None]
+    pad   = np.full((mask.shape[0], 1), np.nan)
+    return [np.hstack([pad, np.where(keep, np.take_along_axis(a, order[:, :width], axis=1), np.nan)])
+            for a in arrays]
+
+def _at(K, k):
+    """K[i, k[i, s]] for every (ticker, session); k ≤ 0 reads NaN."""
+    return np.take_along_axis(K, np.maximum(k, 0), axis=1)
+
+def _last(K, cnt, n):
+    """The last `n` valid values at every cell, oldest first (NaN if fewer)."""
+    return [_at(K, cnt - n + 1 + j) for j in range(n)]
+
+def _window_max(K, w):
+    """max over K[i, k−w+1 … k] for every k (van Herk / Gil-Werman blocks)."""
+    rows, n = K.shape
+    X = np.hstack([np.where(np.isnan(K), -np.inf, K), np.full((rows, -n % w), -np.inf)])
+    X = X.reshape(rows, -1, w)
+    g = np.maximum.accumulate(X, axis=2).reshape(rows, -1)[:, :n]
+    h = np.maximum.accumulate(X[:, :, ::-1], axis=2)[:, :, ::-1].reshape(rows, -1)[:, :n]
+    out = g.copy()
+    out[:, w - 1:] = np.maximum(h[:, :n - w + 1], g[:, w - 1:])
+    return out
+
+def ticker_sessions(bars):
+    """{metric: float[tickers, sessions]} for every ticker at every SPY session,
+    NaN where the live metric is None. `bars` maps ticker → Bars; returns
+    (tickers, session ts, metrics, close) where close is the price used."""
+    if not isinstance(bars.get("SPY"), Bars) or not len(bars["SPY"]):
+        raise ValueError("backtest needs SPY bars")
+    tickers = [t for t, b in bars.items() if isinstance(b, Bars) and len(b)]
+    recs    = [bars[t] for t in tickers]
+    nt      = len(tickers)
+    ts      = np.concatenate([b.ts for b in recs]).astype(np.int64)
+    cal     = np.unique(ts)
+    rows    = np.repeat(np.arange(nt), [len(b) for b in recs])
+    cols    = np.searchsorted(cal, ts)
+    vals    = np.concatenate([b.values for b in recs], axis=1)
+    C, H, L, V = (np.full((nt, len(cal)), np.nan) for _ in range(4))
+    C[rows, cols], H[rows, cols], L[rows, cols], V[rows, cols] = vals
+    B = np.zeros((nt, len(cal)), dtype=bool)
+    B[rows, cols] = True
+    bits    = np.array([b.present for b in recs])
+    has_hl  = ((bits & 0b0110) == 0b0110)[:, None]
+    has_vol = ((bits & 0b1000) != 0)[:, None]
+
+    spy  = tickers.index("SPY")
+    sess = bars["SPY"].ts.astype(np.int64)
+    E    = np.searchsorted(cal // 86400, sess // 86400, side="right") - 1   # last column per session
+    out  = {}
+    with np.errstate(invalid="ignore", divide="ignore"):
+        mc      = ~np.isnan(C)
+        (Kc,)   = _compact(mc, C)
+        ncl     = _counts(mc, E)
+        nbars   = _counts(B, E)
+        last    = _at(Kc, ncl)
+        price   = np.where(np.nan_to_num(last) != 0, last, np.nan)
+        prev    = np.where(ncl >= 2, _at(Kc, ncl - 1), last)
+        has_price = ~np.isnan(price)
+        out["r1D"] = _pct(price, prev)
+
+        # ── Anchored returns ──────────────────────────────────────────────────
+        # reference_times() for every session at once: the close of the last
+        # NYSE session on or before the run's New York date minus N days
+        ncal  = nyse(session_time(sess[-1]).year)
+        today = ncal.day(sess // 86400 * 86400 + 22 * 3600)
+        for tf, days in LOOKBACKS.items():
+            a = ncal.on_or_before(today - days)
+            k = np.searchsorted(cal, np.where(a >= 0, ncal.closes[np.maximum(a, 0)], 0), side="right") - 1
+            out[f"r{tf}"] = _pct(price, _at(Kc, _counts(mc, k)))
+
+        # ── ADR% / ADV / breadth ──────────────────────────────────────────────
+        mhl = ~np.isnan(H) & ~np.isnan(L) & mc & (np.nan_to_num(C) > 0)
+        Kh, Kl, Khc = _compact(mhl, H, L, C)
+        nd  = _counts(mhl, E)
+        rng = _last((Kh - Kl) / Khc * 100, nd, 20)
+        out["adr_pct"] = np.where(has_hl & (nd > 0),
+                                  _round(_seqsum(rng) / np.minimum(nd, 20), 2), np.nan)
+        mvc = ~np.isnan(V) & mc & (np.nan_to_num(V) > 0)
+        Kv, Kvc = _compact(mvc, V, C)
+        nv  = _counts(mvc, E)
+        out["adv"] = np.where(has_vol & (nv > 0),
+                              _seqsum(_last(Kv * Kvc, nv, 20)) / np.minimum(nv, 20), np.nan)
+        ma20 = _seqsum(_last(Kc, ncl, 20)) / 20
+        out["brd"] = np.where((ncl >= 20) & has_price, (price > ma20).astype(float), np.nan)
+
+        # ── SPY daily returns: the 20-session window each session sees ────────
+        sv   = ~np.isnan(bars["SPY"].values[0])
+        scl  = bars["SPY"].values[0][sv]
+        sret = _round((scl[1:] - scl[:-1]) / scl[:-1] * 100, 4)
+        nret = np.maximum(ncl[spy] - 1, 0)
+        n_spy = np.minimum(nret, 20)
+
+        # ── Resilience on SPY red days ────────────────────────────────────────
+        k   = np.searchsorted(cal, bars["SPY"].ts[sv][1:].astype(np.int64), side="right") - 1
+        cq  = _counts(mc, k)
+        cur, prv = _at(Kc, cq), _at(Kc, cq - 1)
+        R   = (cur - prv) / prv * 100
+        Rok = (cq >= 2) & (np.nan_to_num(cur) != 0) & (np.nan_to_num(prv) != 0)
+        red_sum, red_n = np.zeros(price.shape), np.zeros(price.shape, dtype=int)
+        spy_sum, spy_n = np.zeros(len(sess)), np.zeros(len(sess), dtype=int)
+        for j in range(20 if len(sret) else 0):
+            q   = nret - 20 + j
+            qq  = np.maximum(q, 0)
+            red = (q >= 0) & (sret[qq] < 0)
+            ok  = Rok[:, qq] & red
+            red_sum = red_sum + np.where(ok, R[:, qq], 0.0)
+            red_n  += ok
+            spy_sum = spy_sum + np.where(red, sret[qq], 0.0)
+            spy_n  += red
+        red_avg = np.where(spy_n > 0, _round(spy_sum / np.maximum(spy_n, 1), 2), np.nan)
+        res_ok  = (red_n > 0) & (ncl >= 2) & (spy_n > 0)
+        out["res"] = np.where(res_ok, _round(_round(red_sum / np.maximum(red_n, 1), 2) - red_avg, 2),
+                              np.nan)
+
+        # ── Volume accumulation ───────────────────────────────────────────────
+        mva = mvc & (np.nan_to_num(C) > 0)
+        Kac, Kav = _compact(mva, C, V)
+        na  = _counts(mva, E)
+        c11, v11 = _last(Kac, na, 11), _last(Kav, na, 11)
+        up_sum = dn_sum = 0.0
+        up_n = dn_n = 0
+        for j in range(10):
+            r  = (c11[j + 1] - c11[j]) / c11[j]
+            dv = c11[j + 1] * v11[j + 1]
+            up, dn = r > 0, r < 0
+            up_sum, up_n = up_sum + np.where(up, dv, 0.0), up_n + up
+            dn_sum, dn_n = dn_sum + np.where(dn, dv, 0.0), dn_n + dn
+        ratio = (up_sum / np.maximum(up_n, 1)) / (dn_sum / np.maximum(dn_n, 1))
+        vacc_ok = has_vol & (nbars >= 12) & (na >= 6) & (up_n > 0) & (dn_n > 0)
+        out["vacc"] = np.where(vacc_ok, _round(np.minimum(ratio, 3.0), 2), np.nan)
+
+        # ── ADR contraction ───────────────────────────────────────────────────
+        recent, older = _seqsum(rng[10:]) / 10, _seqsum(rng[:10]) / 10
+        adrc_ok = has_hl & (nbars >= 25) & (nd >= 25) & ~(recent < 0.1)
+        out["adrc"] = np.where(adrc_ok, _round(np.minimum(older / recent, 3.0), 2), np.nan)
+
+        # ── RS trend (SPY returns paired as in compute_packed) ────────────────
+        s12 = _last(Kc, ncl, 12)
+        rs  = []
+        for j in range(1, 11):
+            # sp_ret[j] = window[n_spy − 10 + j], 0 past either end of the window
+            sp = (np.where(n_spy - 10 + j >= 0, sret[np.maximum(nret - 10 + j, 0)], 0.0)
+                  if j < 10 and len(sret) else 0.0)
+            rs.append((s12[j + 1] - s12[j]) / s12[j] * 100 - sp)
+        my  = _seqsum(rs) / 10
+        num = _seqsum([(j - 4.5) * (y - my) for j, y in enumerate(rs)])
+        out["rst"] = np.where((ncl >= 12) & (n_spy >= 5), _round(num / 82.5, 3), np.nan)
+
+        # ── Proximity to 52-week high ─────────────────────────────────────────
+        high = _at(np.hstack([Kc[:, :1], _window_max(Kc[:, 1:], 252)]), ncl)
+        dist = np.where(high > 0, (high - price) / high, 1.0)
+        prox = np.where(dist > 0.40, 0.0, _round(np.maximum(0.0, 1.0 - dist / 0.15), 3))
+        out["prox"] = np.where((ncl >= 10) & has_price, prox, np.nan)
+
+    out["nbars"] = nbars
+    return tickers, sess, out, price
+
+def _avg(cells, include):
+    """avg() of the non-None values per (theme, session), over constituent slots."""
+    tot, n = 0.0, 0
+    for v, inc in zip(cells, include):
+        has = inc & ~np.isnan(v)
+        tot, n = tot + np.where(has, v, 0.0), n + has
+    return np.where(n > 0, _round(tot / np.maximum(n, 1), 2), np.nan)
+
+def _wavg(cells, weights, include):
+    num = den = 0.0
+    n = 0
+    for v, w, inc in zip(cells, weights, include):
+        has = inc & ~np.isnan(v)
+        num, den, n = num + np.where(has, v * w, 0.0), den + np.where(has, w, 0.0), n + has
+    return np.where(n > 0, _round(num / np.where(n > 0, den, 1.0), 2), np.nan)
+
+def _ranks(values):
+    """1-based rank of each theme per session, sorted like build_output()."""
+    order = np.argsort(-np.where(np.isnan(values), -999, values), axis=0, kind="stable")
+    ranks = np.empty_like(order)
+    np.put_along_axis(ranks, order, np.arange(1, len(values) + 1)[:, None], axis=0)
+    return ranks
+
+def session_scores(themes, bars):
+    """Score, emerging and rank of every theme at every SPY session in `bars`
+    ({ticker: Bars}). Returns {"ids", "ts", "dates", "score", "emerging",
+    "rank", "rank_emerging", "members", "included", "close"} — theme × session
+    arrays, NaN where the live score would be None."""
+    tickers, sess, m, close = ticker_sessions(bars)
+    row   = {t: i for i, t in enumerate(tickers)}
+    nt    = len(tickers)
+    width = max((len(th[5]) for th in themes), default=0)
+    members = np.full((len(themes), width), nt)                 # nt = the empty row
+    for i, th in enumerate(themes):
+        members[i, :len(th[5])] = [row.get(t, nt) for t in th[5]]
+    pad = lambda a, fill=np.nan: np.vstack([a, np.full((1, a.shape[1]), fill, dtype=a.dtype)])
+    with np.errstate(invalid="ignore", divide="ignore"):
+        adv  = m["adv"]
+        live = pad((m["nbars"] > 0) & ~(adv < ADV_MIN), False)
+        m    = {k: pad(v.astype(float)) for k, v in m.items() if k != "nbars"}
+        slots    = [members[:, j] for j in range(width)]
+        include  = [live[s] for s in slots]
+        adr      = [m["adr_pct"][s] for s in slots]
+        weights  = [1.0 / np.maximum(np.where(np.isnan(a) | (a == 0), 3.0, a), 0.5) for a in adr]
+        col      = lambda k: [m[k][s] for s in slots]
+
+        ret = {tf: _wavg(col(f"r{tf}"), weights, include) for tf in ("1D", "1W", "1M")}
+        rs  = {tf: np.where(np.isnan(ret[tf]) | np.isnan(m[f"r{tf}"][row["SPY"]]), np.nan,
+                            _round(ret[tf] - m[f"r{tf}"][row["SPY"]], 2)) for tf in ret}
+        resilience = _avg(col("res"), include)
+        breadth    = _avg(col("brd"), include)
+        b, w       = BLEND_WEIGHTS, SCORE_WEIGHTS
+        ret_blend  = ret["1D"] * b["1D"] + ret["1W"] * b["1W"] + ret["1M"] * b["1M"]
+        rs_blend   = rs["1D"] * b["1D"] + rs["1W"] * b["1W"] + rs["1M"] * b["1M"]
+        res_score  = np.where(np.isnan(resilience), 0, resilience)
+        brd_score  = np.where(np.isnan(breadth), 5, breadth * 10)
+        score = _round(ret_blend * w["ret"] + rs_blend * w["rs"] + res_score * w["res"]
+                       + brd_score * w["brd"], 1)
+
+        vacc, adrc, rst, prox = (_avg(col(k), include) for k in ("vacc", "adrc", "rst", "prox"))
+        norm   = lambda x: np.minimum(np.maximum(x, 0), 10)
+        v_norm = np.where(np.nan_to_num(vacc) != 0, norm((vacc - 0.5) / 1.5 * 10), 5.0)
+        a_norm = np.where(np.nan_to_num(adrc) != 0, norm((adrc - 0.5) / 1.5 * 10), 5.0)
+        r_norm = np.where(~np.isnan(rst), norm((rst + 0.5) / 1.0 * 10), 5.0)
+        p_norm = np.where(~np.isnan(prox), prox * 10, 5.0)
+        w = EMERGING_WEIGHTS
+        emerging = np.where(np.isnan(vacc) & np.isnan(adrc) & np.isnan(rst) & np.isnan(prox), np.nan,
+                            _round(v_norm * w["vacc"] + a_norm * w["adrc"] + r_norm * w["rst"]
+                                   + p_norm * w["prox"], 1))
+    return {
+        "ids":      [th[0] for th in themes],
+        "ts":       sess,
+        "dates":    [datetime.datetime.utcfromtimestamp(int(t)).strftime("%Y-%m-%d") for t in sess],
+        "score":    score,
+        "emerging": emerging,
+        "rank":     _ranks(score),
+        "rank_emerging": _ranks(emerging),
+        "members":  members,
+        "included": np.array(include) if include else np.zeros((0, len(themes), len(sess)), dtype=bool),
+        "close":    pad(close),
+        "spy":      row["SPY"],
+    }
+
+# ══════════════════════════════════════════════════════════════════════════════
+# EVALUATION — forward returns and top-N rotation
+# ══════════════════════════════════════════════════════════════════════════════
+# A theme's return from session a to b is the equal-weight average of its
+# scored constituents' close-to-close returns (the ones that passed the ADV
+# filter at a), i.e. buying the basket at a's close and holding to b's.
+
+def theme_returns(hist, a, b):
+    """float[themes, len(a)]: each theme's return from session a[k] to b[k]."""
+    close = hist["close"]
+    tot, n = 0.0, 0
+    with np.errstate(invalid="ignore", divide="ignore"):
+        for j, inc in enumerate(hist["included"]):
+            s  = hist["members"][:, j]
+            r  = close[s][:, b] / close[s][:, a] - 1
+            ok = inc[:, a] & np.isfinite(r)
+            tot, n = tot + np.where(ok, r, 0.0), n + ok
+        return np.where(n > 0, tot / np.maximum(n, 1), np.nan)
+
+def _spearman(x, y):
+    """Rank correlation per column over the rows where both are present."""
+    out = []
+    for xs, ys in zip(x.T, y.T):
+        ok = ~np.isnan(xs) & ~np.isnan(ys)
+        if ok.sum() < 3:
+            continue
+        rx = np.argsort(np.argsort(xs[ok])).astype(float)
+        ry = np.argsort(np.argsort(ys[ok])).astype(float)
+        out.append(np.corrcoef(rx, ry)[0, 1])
+    return float(np.nanmean(out)) if out else None
+
+def _curve_stats(period_rets, sessions):
+    curve = np.cumprod(1 + np.nan_to_num(period_rets))
+    peak  = np.maximum.accumulate(np.concatenate([[1.0], curve]))[1:]
+    years = sessions / 252
+    total = float(curve[-1] - 1) if len(curve) else 0.0
+    return {"total": total,
+            "cagr": (1 + total) ** (1 / years) - 1 if years > 0 and total > -1 else None,
+            "max_dd": float(np.min(curve / peak - 1)) if len(curve) else 0.0,
+            "curve": curve.tolist()}
+
+def evaluate(hist, key="score", top=BACKTEST_TOP, hold=BACKTEST_HOLD, start=0,
+             horizons=HORIZONS):
+    """Forward-return and rotation statistics for ranking by `key`
+    ("score" or "emerging") from session index `start` on."""
+    values = hist[key]
+    ranks  = hist["rank" if key == "score" else "rank_emerging"]
+    n      = values.shape[1]
+    close  = hist["close"][hist["spy"]]
+    out    = {"key": key, "forward": {}}
+    for name, h in horizons.items():
+        a = np.arange(start, n - h)
+        if not len(a):
+            continue
+        fwd  = theme_returns(hist, a, a + h)
+        rk   = ranks[:, a]
+        scored = ~np.isnan(values[:, a]) & ~np.isnan(fwd)
+        pick = scored & (rk <= top)
+        # quantile by rank among the scored themes (unscored themes rank last)
+        q    = np.where(scored, (rk - 1) * QUANTILES // np.maximum(scored.sum(axis=0), 1), -1)
+        mean = lambda mask: float(np.sum(np.where(mask, fwd, 0)) / max(mask.sum(), 1))
+        out["forward"][name] = {
+            "sessions": len(a),
+            "top":      mean(pick),
+            "all":      mean(scored),
+            "spy":      float(np.nanmean(close[a + h] / close[a] - 1)),
+            "hit":      float(np.mean([np.sum(np.where(p, f, 0)) / max(p.sum(), 1) >
+                                       np.sum(np.where(s, f, 0)) / max(s.sum(), 1)
+                                       for p, s, f in zip(pick.T, scored.T, fwd.T) if p.any()] or [0])),
+            "ic":       _spearman(np.where(scored, values[:, a], np.nan), fwd),
+            "quantiles": [mean(q == i) for i in range(QUANTILES)],
+        }
+
+    # ── Top-N rotation, rebalanced every `hold` sessions ─────────────────────
+    a = np.arange(start, n - 1, hold)
+    b = np.minimum(a + hold, n - 1)
+    rot = {}
+    if len(a):
+        period = theme_returns(hist, a, b)
+        scored = ~np.isnan(values[:, a])
+        pick   = scored & (ranks[:, a] <= top)
+        held   = np.where(pick & ~np.isnan(period), period, 0).sum(axis=0)
+        cnt    = (pick & ~np.isnan(period)).sum(axis=0)
+        port   = np.where(cnt > 0, held / np.maximum(cnt, 1), 0.0)
+        ew_ok  = scored & ~np.isnan(period)
+        ew     = np.where(ew_ok, period, 0).sum(axis=0) / np.maximum(ew_ok.sum(axis=0), 1)
+        spy    = close[b] / close[a] - 1
+        turn   = [1 - len(set(np.flatnonzero(p)) & set(np.flatnonzero(q))) / max(p.sum(), 1)
+                  for q, p in zip(pick.T, pick.T[1:])]
+        span   = int(b[-1] - a[0])
+        rot = {"rebalances": len(a), "sessions": span,
+               "top": _curve_stats(port, span), "all": _curve_stats(ew, span),
+               "spy": _curve_stats(np.nan_to_num(spy), span),
+               "beat_spy": float(np.mean(port > np.nan_to_num(spy))),
+               "turnover": float(np.mean(turn)) if turn else 0.0}
+    out["rotation"] = rot
+    return out
+
+def stored_bars(tickers):
+    """{ticker: Bars} from the bar store for every ticker it has (no network)."""
+    out = {}
+    for t in tickers:
+        b = load_bars(t)
+        if b:
+            out[t] = Bars.from_lists(b, None, None)
+    return out
+
+def run_backtest(themes, bars, top=BACKTEST_TOP, hold=BACKTEST_HOLD, since=None,
+                 horizons=HORIZONS):
+    """session_scores() plus evaluate() for both scores. `since` (YYYY-MM-DD)
+    starts the evaluation; default is the first session with any score."""
+    hist  = session_scores(themes, bars)
+    dates = hist["dates"]
+    if since:
+        start = next((i for i, d in enumerate(dates) if d >= since), len(dates))
+    else:
+        ok    = np.flatnonzero(~np.isnan(hist["score"]).all(axis=0))
+        start = int(ok[0]) if len(ok) else len(dates)
+    return hist, {
+        "from": dates[start] if start < len(dates) else None, "to": dates[-1] if dates else None,
+        "themes": len(themes), "top": top, "hold": hold,
+        "score":    evaluate(hist, "score", top, hold, start, horizons),
+        "emerging": evaluate(hist, "emerging", top, hold, start, horizons),
+    }
+
+def print_backtest(report):
+    pc  = lambda x: "—" if x is None else f"{x * 100:+.2f}%"
+    print(f"\nBacktest {report['from']} → {report['to']} · {report['themes']} themes · "
+          f"top {report['top']}, rebalanced every {report['hold']} sessions")
+    for key in ("score", "emerging"):
+        r = report[key]
+        print(f"\n  Ranked by {key}")
+        for name, f in r["forward"].items():
+            print(f"    fwd {name:>2}  top {pc(f['top'])}  all {pc(f['all'])}  SPY {pc(f['spy'])}"
+                  f"  hit {f['hit'] * 100:.0f}%  IC {f['ic'] if f['ic'] is None else round(f['ic'], 3)}"
+                  f"  quintiles " + " ".join(pc(x) for x in f["quantiles"]))
+        rot = r["rotation"]
+        if rot:
+            row = lambda s: f"{pc(s['total'])} (CAGR {pc(s['cagr'])}, max DD {pc(s['max_dd'])})"
+            print(f"    rotation  top {row(rot['top'])}")
+            print(f"              all {row(rot['all'])}")
+            print(f"              SPY {row(rot['spy'])}")
+            print(f"              beats SPY in {rot['beat_spy'] * 100:.0f}% of "
+                  f"{rot['rebalances']} periods · turnover {rot['turnover'] * 100:.0f}%")
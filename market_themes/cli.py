@@ -0,0 +1,213 @@
+"""Command-line entry point: fetch, score and publish (python -m market_themes)."""
+
+import argparse, cProfile, datetime, os, pstats, time, tracemalloc
+
+from .alerts import ALERTS_FILE, ALERTS_PATH, AlertConfigError, AlertState, append_events, load_rules
+from .backtest import BACKTEST_HOLD, BACKTEST_TOP, print_backtest, run_backtest, stored_bars
+from .columnar import COLUMNAR_DIR, write_columnar
+from .fetcher import _cache, universe_of
+from .history import ScoreArchive, archive_run, session_date
+from .metrics import LOOKBACKS
+from .output import RUN_LOG, write_output, write_run_stats
+from .parallel import THEME_PROCS
+from .scoring import ThemeScorer
+from .screen import UniverseState
+from .server import SERVE_PORT, SERVE_INTERVAL, ThemeService, serve
+from .stats import _stats
+from .store import HISTORY_RANGE, HISTORY_DAYS
+from .themes import THEMES, THEMES_FILE, ThemeConfigError, check_duplicates, load_themes
+
+WATCH_INTERVAL = 1.0     # seconds between theme-file mtime checks
+
+def parse_args(argv=None):
+    ap = argparse.ArgumentParser(description="Fetch constituents and score market themes")
+    ap.add_argument("--history", default=HISTORY_RANGE, choices=sorted(HISTORY_DAYS, key=HISTORY_DAYS.get),
+                    help="daily-bar window downloaded once per ticker (default: %(default)s)")
+    ap.add_argument("--intraday", action="store_true",
+                    help="reuse stored bars and fetch only live quotes (store is not written)")
+    ap.add_argument("--profile", nargs="?", const="fetch_data.prof", metavar="FILE",
+                    help="cProfile the run into FILE (default %(const)s) and track allocations")
+    ap.add_argument("--serve", nargs="?", type=int, const=SERVE_PORT, metavar="PORT",
+                    help="keep scores in memory and serve them as JSON on PORT (default %(const)s)")
+    ap.add_argument("--interval", type=float, default=SERVE_INTERVAL, metavar="SECONDS",
+                    help="background refresh period with --serve (default %(default)gs)")
+    ap.add_argument("--verbose", action="store_true", help="log every request with --serve")
+    ap.add_argument("--themes", default=THEMES_FILE, metavar="FILE",
+                    help="JSON/TOML/YAML theme definitions instead of the built-in list")
+    ap.add_argument("--procs", type=int, default=THEME_PROCS, metavar="N",
+                    help="score themes in N processes when 64+ need scoring (per-theme log lines are skipped)")
+    ap.add_argument("--no-screen", dest="screen", action="store_false",
+                    help="fetch every ticker in full, ignoring data/universe_state.json")
+    ap.add_argument("--columnar", nargs="?", const=COLUMNAR_DIR, metavar="DIR",
+                    help=f"also export themes and constituents as NumPy column tables (default {COLUMNAR_DIR})")
+    ap.add_argument("--watch", action="store_true",
+                    help="after publishing, rescore and republish whenever --themes FILE changes")
+    ap.add_argument("--alerts", default=ALERTS_FILE, metavar="FILE",
+                    help=f"JSON/TOML/YAML alert rules checked after each publish (events → {ALERTS_PATH})")
+    bt = ap.add_argument_group("backtest")
+    bt.add_argument("--backtest", action="store_true",
+                    help="score every session in the bar store and evaluate the rankings (no network)")
+    bt.add_argument("--top", type=int, default=BACKTEST_TOP, metavar="N",
+                    help=f"themes held by the backtest rotation (default {BACKTEST_TOP})")
+    bt.add_argument("--hold", type=int, default=BACKTEST_HOLD, metavar="SESSIONS",
+                    help=f"sessions between backtest rebalances (default {BACKTEST_HOLD})")
+    bt.add_argument("--since", metavar="YYYY-MM-DD", help="start the backtest evaluation at this date")
+    args = ap.parse_args(argv)
+    if args.watch and not args.themes:
+        ap.error("--watch needs --themes FILE")
+    return args
+
+def main(argv=None):
+    args = parse_args(argv)
+    if not args.profile:
+        return run(args)
+    tracemalloc.start()
+    prof = cProfile.Profile()
+    try:
+        prof.enable()
+        return run(args)
+    finally:
+        prof.disable()
+        prof.dump_stats(args.profile)
+        print(f"\n── Profile (main thread, by cumulative time) → {args.profile}")
+        pstats.Stats(prof).sort_stats("cumulative").print_stats(20)
+        print("── Top allocation sites")
+        for st in tracemalloc.take_snapshot().statistics("lineno")[:10]:
+            print(f"  {st}")
+        tracemalloc.stop()
+
+def run(args):
+    try:
+        themes = load_themes(args.themes) if args.themes else THEMES
+        rules  = load_rules(args.alerts) if args.alerts else None
+    except (OSError, ThemeConfigError, AlertConfigError) as e:
+        raise SystemExit(f"✗ {e}")
+    if args.backtest:
+        return backtest(themes, args)
+    if args.serve is not None:
+        # Long-running: nothing is written to data/; the scheduled run still publishes
+        scorer = ThemeScorer(themes, procs=args.procs)
+        check_duplicates(scorer.themes, scorer.themes_of)
+        service = ThemeService(scorer, args.interval, args.intraday, args.history,
+                               UniverseState() if args.screen else None)
+        return serve(service, port=args.serve, verbose=args.verbose)
+    scorer = ThemeScorer(themes, cache=_cache, verbose=True, procs=args.procs)
+    check_duplicates(scorer.themes, scorer.themes_of)
+    now    = scorer.now
+    print("Anchors: " + "  ".join(f"{tf}={(now - datetime.timedelta(days=d)).strftime('%b %d')}"
+                                  for tf, d in LOOKBACKS.items()))
+    if HISTORY_DAYS[args.history] < max(LOOKBACKS.values()):
+        print(f"  note: --history {args.history} is shorter than some lookbacks; those report null")
+
+    # Fetch stage: whole universe up front, one download per ticker serves every lookback
+    universe = scorer.universe
+    state    = UniverseState() if args.screen else None
+    with _stats.stage("fetch"):
+        if args.intraday:
+            print(f"\nQuoting {len(universe)} tickers (intraday)...")
+        else:
+            print(f"\nFetching {len(universe)} tickers ({args.history} history)...")
+        scorer.load(intraday=args.intraday, period=args.history, state=state)
+    publish(scorer, args, rules)
+    if state is not None:
+        scorer.record(state)
+        state.save()
+    if args.watch:
+        watch(scorer, args, rules)
+
+def backtest(themes, args):
+    """--backtest: rescore every stored session offline and report how the
+    rankings did. The store holds --history worth of bars (5y for years)."""
+    universe = universe_of(themes)
+    bars     = stored_bars(universe)
+    missing  = [t for t in universe if t not in bars]
+    print(f"Backtest over the bar store: {len(bars)}/{len(universe)} tickers"
+          + (f" (not stored: {', '.join(missing[:8])}{' …' if len(missing) > 8 else ''})" if missing else ""))
+    if "SPY" not in bars:
+        raise SystemExit("✗ no stored SPY bars — run a refresh first")
+    t0 = time.monotonic()
+    hist, report = run_backtest(themes, bars, args.top, args.hold, args.since)
+    print_backtest(report)
+    print(f"\n  {len(hist['dates'])} sessions × {len(themes)} themes scored in {time.monotonic() - t0:.1f}s")
+
+def publish(scorer, args, rules=None):
+    """Score, archive and write every output file from the scorer's current state,
+    then check alert `rules` against what changed since the last run."""
+    universe = scorer.universe
+    with _stats.stage("metrics"):
+        scorer.metrics()
+    with _stats.stage("cohesion"):
+        scorer.cohesion()
+    with _stats.stage("themes"):
+        output  = scorer.output("intraday" if args.intraday else "daily")
+        details = scorer.details()
+    with _stats.stage("archive"):
+        archive_run(ScoreArchive(), session_date(scorer.cache.get("SPY"), scorer.now), output, details)
+
+    if tracemalloc.is_tracing():
+        _stats.peak_traced = round(tracemalloc.get_traced_memory()[1] / 2**20, 1)
+    with _stats.stage("write"):
+        written = write_output(output, details)
+        if args.columnar:
+            columns = write_columnar(output, details, args.columnar)
+    if rules:
+        with _stats.stage("alerts"):
+            alerts = AlertState()
+            events = alerts.evaluate(rules, output, details)
+            append_events(events)
+            alerts.save()
+    summary = _stats.summary(scorer.cache, universe)
+    write_run_stats(summary, _stats.per_ticker(scorer.cache), log=RUN_LOG)
+
+    results = output["themes"]
+    print(f"\n✅  Written {len(written)} changed files to data/  ({len(results)} themes)")
+    if args.columnar:
+        print(f"    columnar: {len(columns)} changed files in {args.columnar}/")
+    if rules:
+        a = alerts.stats
+        print(f"    alerts: {a['fired']} fired → {ALERTS_PATH} · {a['changed']}/{a['records']} records changed"
+              f" · {a['tested']} rule checks" + (f" · {a['baseline']} new rule(s) baselined" if a["baseline"] else ""))
+        for ev in events[:10]:
+            where = ev["theme"] + (f"/{ev['ticker']}" if "ticker" in ev else "")
+            print(f"      {ev['rule']}: {where} {ev['values']}")
+    print(f"    Top 3: {', '.join(r['name'] for r in results[:3])}")
+    f = summary["fetch"]
+    print(f"    {summary['total_s']}s total · " + " · ".join(f"{k} {v}s" for k, v in summary["stages"].items())
+          + f" · {f['requests']} requests, {f['bytes'] / 1024:.0f} KB, p90 {f['latency_ms']['p90']} ms")
+
+def watch(scorer, args, rules=None):
+    """Poll the theme file; on change rescore only the themes whose definitions
+    changed, fetching just the tickers that are new to the universe."""
+    path  = args.themes
+    mtime = os.stat(path).st_mtime_ns
+    print(f"\nWatching {path} for changes (Ctrl-C to stop)...")
+    try:
+        while True:
+            time.sleep(WATCH_INTERVAL)
+            try:
+                m = os.stat(path).st_mtime_ns
+                if m == mtime:
+                    continue
+                mtime = m
+                themes = load_themes(path)
+            except (OSError, ThemeConfigError) as e:
+                print(f"✗ {e}\n  keeping the previous themes")
+                continue
+            t0 = time.monotonic()
+            changed = scorer.set_themes(themes)
+            if not changed:
+                print(f"\n{path} changed — no theme definitions differ")
+                continue
+            edited = sorted(changed & scorer.by_id.keys())
+            print(f"\n{path} changed — rescoring {len(edited)} theme(s)"
+                  + (f": {', '.join(edited)}" if edited else "")
+                  + (f" · {len(changed) - len(edited)} removed" if len(changed) > len(edited) else ""))
+            check_duplicates(scorer.themes, scorer.themes_of)
+            new = [t for t in scorer.universe if t not in scorer.cache]
+            if new:
+                with _stats.stage("fetch"):
+                    scorer.load(new, intraday=args.intraday, period=args.history)
+            publish(scorer, args, rules)
+            print(f"    reload took {time.monotonic() - t0:.2f}s")
+    except KeyboardInterrupt:
+        pass
@@ -0,0 +1,186 @@
+"""Theme cohesion: rolling pairwise return correlations for the whole universe,
+reduced to per-theme, per-constituent and cross-theme figures."""
+
+import os
+
+import numpy as np
+
+from .engine import pack_bars, session_columns
+
+COHESION_WINDOW  = int(os.environ.get("COHESION_WINDOW", "60"))     # sessions of daily returns
+COHESION_MIN_OBS = int(os.environ.get("COHESION_MIN_OBS", "20"))    # common returns a pair needs
+COHESION_PEERS   = int(os.environ.get("COHESION_PEERS", "3"))       # neighbours listed per theme / stock
+COHESION_BLOCK_CELLS = 1 << 20      # correlation cells held at once (8 MB of float64 per temporary)
+
+# ── Returns window ────────────────────────────────────────────────────────────
+# Every constituent's bars are laid on the engine's session columns; the last
+# COHESION_WINDOW + 1 columns give COHESION_WINDOW close-to-close returns, NaN
+# where either close is missing. Rows are (theme, ticker) slots in theme order
+# so each theme's members are one contiguous run of rows and columns.
+def return_window(raws, window=COHESION_WINDOW):
+    """(returns float64[n, window], valid bool[n, window]) for `raws` (records)."""
+    n = len(raws)
+    if not n:
+        return np.zeros((0, window)), np.zeros((0, window), dtype=bool)
+    p    = pack_bars(raws)
+    rows = np.repeat(np.arange(n), p["nbars"])
+    cols, m, _ = session_columns(p["ts"], rows)
+    C = np.full((n, window + 1), np.nan)
+    keep = cols >= m - window - 1
+    C[rows[keep], cols[keep] - (m - window - 1)] = p["closes"][keep]
+    with np.errstate(invalid="ignore", divide="ignore"):
+        R = C[:, 1:] / C[:, :-1] - 1
+    ok = np.isfinite(R)
+    return np.where(ok, R, 0.0), ok
+
+# ── Correlation ───────────────────────────────────────────────────────────────
+# Pairwise-complete Pearson correlation as matrix products over a block of rows
+# at a time, so only a block × n slab is ever held. Rows with a full window are
+# standardized once and correlate as one product, Z·Zᵀ. Pairs involving a row
+# with holes use six products — with X the returns (0 where missing) and M the
+# validity mask, over the sessions rows i and columns j have in common:
+#   n  = M·Mᵀ   Σx = X·Mᵀ   Σy = M·Xᵀ   Σx² = X²·Mᵀ   Σy² = M·X²ᵀ   Σxy = X·Xᵀ
+#   r  = (Σxy − ΣxΣy/n) / √((Σx² − Σx²/n)(Σy² − Σy²/n))
+# Rows are centred on their own mean first (r is shift-invariant) so the
+# differences don't cancel. With many holey rows the masked form does it all.
+def _masked(X, X2, Mf, rows, cols, min_obs):
+    """Correlation of rows × cols from the masked sums (NaN = not enough overlap)."""
+    with np.errstate(invalid="ignore", divide="ignore"):
+        N  = Mf[rows] @ Mf[cols].T
+        N[N < min_obs] = np.nan
+        mx = np.divide(X[rows] @ Mf[cols].T, N)      # each side's mean over the common sessions
+        Sy = Mf[rows] @ X[cols].T
+        r  = X[rows] @ X[cols].T
+        r -= mx * Sy                                 # covariance × n
+        vx = X2[rows] @ Mf[cols].T
+        vx -= mx * mx * N
+        vy = Mf[rows] @ X2[cols].T
+        vy -= Sy * Sy / N
+        vx *= vy
+        vx[vx <= 0] = np.nan                         # a flat series
+        np.sqrt(vx, out=vx)
+        r /= vx
+    return r
+
+def correlation_blocks(X, M, min_obs=COHESION_MIN_OBS, block_cells=COHESION_BLOCK_CELLS):
+    """Yield (first row, corr[rows, n]) — NaN where fewer than `min_obs`
+    common returns or a flat series; the diagonal is NaN."""
+    n, w = X.shape
+    Mf  = M.astype(float)
+    cnt = Mf.sum(axis=1)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        X  = np.where(M, X - (X.sum(axis=1) / np.maximum(cnt, 1))[:, None], 0.0)
+        X2 = X * X
+        full = (cnt == w) if w >= min_obs else np.zeros(n, dtype=bool)
+        Z = np.where(full[:, None], X / np.sqrt(X2.sum(axis=1))[:, None], 0.0)
+    part = np.flatnonzero(~full)
+    fast = 3 * len(part) < n
+    step = max(1, block_cells // max(n, 1))
+    for lo in range(0, n, step):
+        hi = min(n, lo + step)
+        if fast:
+            r = Z[lo:hi] @ Z.T
+            if len(part):
+                r[:, part] = _masked(X, X2, Mf, slice(lo, hi), part, min_obs)
+                mine = part[(part >= lo) & (part < hi)]
+                r[mine - lo] = _masked(X, X2, Mf, mine, slice(None), min_obs)
+        else:
+            r = _masked(X, X2, Mf, slice(lo, hi), slice(None), min_obs)
+        np.clip(r, -1.0, 1.0, out=r)
+        r[np.arange(hi - lo), np.arange(lo, hi)] = np.nan
+        yield lo, r
+
+# ── Cohesion ──────────────────────────────────────────────────────────────────
+def compute_cohesion(themes, cache, window=COHESION_WINDOW, min_obs=COHESION_MIN_OBS,
+                     peers=COHESION_PEERS, block_cells=COHESION_BLOCK_CELLS):
+    """{"themes": {id: {cohesion, neighbours, neighbour_corr}},
+        "constituents": {(id, ticker): {theme_corr, peers, peer_corr}}}
+
+    cohesion        mean pairwise correlation between the theme's members
+    theme_corr      a member's mean correlation with the rest of its theme
+    neighbours      the other themes with the highest mean cross-correlation
+    peers           a member's most correlated stocks outside its theme
+    Unrounded; members without `min_obs` returns in the window are left out.
+    """
+    slots = [(g, tid, t) for g, (tid, *_, stocks, _) in enumerate(themes)
+             for t in stocks if cache.get(t)]
+    X, M = return_window([cache[t] for _, _, t in slots], window)
+    use  = M.sum(axis=1) >= min_obs
+    slots, X, M = [s for s, u in zip(slots, use) if u], X[use], M[use]
+    k, n = len(themes), len(slots)
+    out  = {"themes": {}, "constituents": {}}
+    if not n:
+        return out
+
+    group  = np.array([g for g, _, _ in slots], dtype=np.int64)
+    names  = [t for _, _, t in slots]
+    _, tick = np.unique(names, return_inverse=True)
+    twice  = len(set(names)) < n                 # a ticker listed in two themes
+    starts = np.flatnonzero(np.r_[True, group[1:] != group[:-1]])
+    owners = group[starts]                       # theme of each contiguous run
+    ends   = np.r_[starts[1:], n]
+    S, Q   = np.zeros((k, k)), np.zeros((k, k))
+    own, own_n = np.zeros(n), np.zeros(n)
+    best_r = np.full((n, peers), np.nan)
+    best_j = np.zeros((n, peers), dtype=np.int64)
+    for lo, r in correlation_blocks(X, M, min_obs, block_cells):
+        b = np.arange(lo, lo + len(r))
+        if twice:
+            r[tick[b][:, None] == tick[None, :]] = np.nan
+        ok = ~np.isnan(r)
+        rs = np.add.reduceat(np.where(ok, r, 0.0), starts, axis=1)     # rows × runs
+        rq = np.add.reduceat(ok, starts, axis=1, dtype=np.int64)
+        run  = np.searchsorted(starts, b, side="right") - 1
+        head = np.flatnonzero(np.r_[True, run[1:] != run[:-1]])        # the block's own runs
+        cell = np.ix_(owners[run[head]], owners)
+        S[cell] += np.add.reduceat(rs, head, axis=0)
+        Q[cell] += np.add.reduceat(rq, head, axis=0)
+        own[b], own_n[b] = rs[b - lo, run], rq[b - lo, run]
+        if peers:
+            r[~ok] = -np.inf
+            edge = np.r_[head, len(b)]
+            for h0, h1, g in zip(edge[:-1], edge[1:], run[head]):     # peers come from other themes
+                r[h0:h1, starts[g]:ends[g]] = -np.inf
+            if n > peers:
+                top = np.argpartition(r, n - peers, axis=1)[:, n - peers:]
+            else:
+                top = np.broadcast_to(np.arange(n), r.shape)
+            val   = np.take_along_axis(r, top, axis=1)
+            order = np.argsort(-val, axis=1, kind="stable")
+            top, val = np.take_along_axis(top, order, axis=1), np.take_along_axis(val, order, axis=1)
+            best_j[b, :top.shape[1]] = top
+            best_r[b, :val.shape[1]] = np.where(np.isfinite(val), val, np.nan)
+
+    with np.errstate(invalid="ignore", divide="ignore"):
+        mean = S / Q
+    for g, (tid, *_) in enumerate(themes):
+        row = np.where(np.arange(k) == g, np.nan, mean[g])
+        row[~(Q[g] > 0)] = np.nan
+        near = [h for h in np.argsort(-np.nan_to_num(row, nan=-np.inf), kind="stable")[:peers]
+                if not np.isnan(row[h])]
+        out["themes"][tid] = {
+            "cohesion":       float(mean[g, g]) if Q[g, g] > 0 else None,
+            "neighbours":     [themes[h][0] for h in near],
+            "neighbour_corr": [float(row[h]) for h in near],
+        }
+    for i, (_, tid, t) in enumerate(slots):
+        found = ~np.isnan(best_r[i])
+        out["constituents"][(tid, t)] = {
+            "theme_corr": float(own[i] / own_n[i]) if own_n[i] else None,
+            "peers":      [names[j] for j in best_j[i][found]],
+            "peer_corr":  [float(v) for v in best_r[i][found]],
+        }
+    return out
+
+# ── Published fields ──────────────────────────────────────────────────────────
+# Rounded to 2 dp. Themes and constituents without data get null / empty lists
+# so every record carries the same keys (the columnar export relies on it).
+_BLANK = {"themes":       {"cohesion": None, "neighbours": [], "neighbour_corr": []},
+          "constituents": {"theme_corr": None, "peers": [], "peer_corr": []}}
+
+def cohesion_fields(cohesion, part, key):
+    """The published fields of one theme ("themes", id) or constituent
+    ("constituents", (id, ticker)) from compute_cohesion() output."""
+    r2 = lambda v: round(v, 2) if isinstance(v, float) else v
+    fields = cohesion[part].get(key, _BLANK[part])
+    return {k: [r2(x) for x in v] if isinstance(v, list) else r2(v) for k, v in fields.items()}
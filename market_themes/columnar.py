@@ -0,0 +1,201 @@
+"""Columnar export: the published themes and constituents as memory-mappable
+NumPy columns, for bulk readers that don't want to decode JSON every run."""
+
+import io, json, os
+
+import numpy as np
+
+COLUMNAR_DIR     = os.environ.get("COLUMNAR_DIR", os.path.join("data", "columnar"))
+COLUMNAR_VERSION = 2
+COLUMN_ALIGN     = 64      # byte alignment of every column inside a table file
+
+# ── Layout ────────────────────────────────────────────────────────────────────
+# One file per table, the columns stored raw and back to back (each starting on
+# a COLUMN_ALIGN boundary), so a reader maps the table once and takes any
+# column as a zero-copy view — only the pages of the columns it reads are ever
+# touched. Two tables:
+#   themes.col        one row per theme record in summary.json, in published order
+#   constituents.col  one row per constituent in themes/<id>.json, grouped by
+#                     theme; its "theme" key is the row index into themes
+# Columns are derived from the records themselves, so every JSON field has a
+# column and the two formats can't drift apart:
+#   numbers → float64 (null = NaN; "json": "int" when every value is an int)
+#   bool    → bool        str → fixed-width UTF-8 bytes (dtype S<n>)
+#   lists   → a values block + an int64 offsets block (row i is
+#             values[offsets[i]:offsets[i+1]])
+# Fields present on only some rows (constituents without metrics) are listed
+# under "optional" and the table's "present" block flags the rows that carry
+# them; other rows hold NaN / False / b"" there.
+# schema.json holds the run scalars (updated, mode, spy) and every block's
+# dtype, byte offset and count in its table file. Score history is in
+# data/history, not here.
+
+def _kind(v):
+    if isinstance(v, bool):
+        return "bool"
+    if isinstance(v, int):
+        return "int"
+    if isinstance(v, float):
+        return "float"
+    if isinstance(v, str):
+        return "str"
+    if isinstance(v, list):
+        return "list"
+    raise TypeError(f"no columnar encoding for {type(v).__name__}")
+
+_ABSENT = object()      # an optional field missing from the row (see "present")
+
+def _scalar(values, field):
+    """(array, json type) for one scalar field across rows."""
+    kinds = {_kind(v) for v in values if v is not None and v is not _ABSENT}
+    if kinds <= {"int", "float"}:
+        return (np.array([np.nan if v is None or v is _ABSENT else v for v in values],
+                         dtype=np.float64),
+                "int" if kinds == {"int"} else "float")
+    if None in values or len(kinds) > 1:
+        raise TypeError(f"{field}: mixed or null {'/'.join(sorted(kinds))} values")
+    if kinds == {"bool"}:
+        return np.array([v is True for v in values], dtype=bool), "bool"
+    return np.array([b"" if v is _ABSENT else v.encode() for v in values], dtype=bytes), "str"
+
+class _TableFile:
+    """Blocks appended to one table file; block() returns the schema entry."""
+    def __init__(self):
+        self.buf = io.BytesIO()
+
+    def block(self, arr):
+        pad = -self.buf.tell() % COLUMN_ALIGN
+        self.buf.write(b"\0" * pad)
+        entry = {"dtype": arr.dtype.str, "offset": self.buf.tell(), "count": len(arr)}
+        self.buf.write(np.ascontiguousarray(arr).tobytes())
+        return entry
+
+def _table(rows, name):
+    """(schema entry, table file bytes) for `rows` (dicts)."""
+    out    = _TableFile()
+    fields = list(dict.fromkeys(k for r in rows for k in r))
+    optional = [k for k in fields if any(k not in r for r in rows)]
+    present = np.array([all(k in r for k in optional) for r in rows], dtype=bool)
+    if optional and any(any(k in r for k in optional) and not p for r, p in zip(rows, present)):
+        raise TypeError(f"{name}: rows carry only part of {optional}")
+    columns = []
+    for k in fields:
+        values = [r.get(k, _ABSENT) for r in rows]
+        if any(isinstance(v, list) for v in values):
+            if any(v is not None and v is not _ABSENT and not isinstance(v, list) for v in values):
+                raise TypeError(f"{name}.{k}: lists mixed with scalars")
+            lists = [v if isinstance(v, list) else [] for v in values]
+            flat, kind = _scalar([x for v in lists for x in v], f"{name}.{k}[]")
+            offsets = np.zeros(len(lists) + 1, dtype=np.int64)
+            np.cumsum([len(v) for v in lists], out=offsets[1:])
+            columns.append({"name": k, "json": f"list[{kind}]",
+                            "values": out.block(flat), "offsets": out.block(offsets)})
+        else:
+            arr, kind = _scalar(values, f"{name}.{k}")
+            columns.append({"name": k, "json": kind, **out.block(arr)})
+    spec = {"file": f"{name}.col", "rows": len(rows), "columns": columns, "optional": optional}
+    if optional:
+        spec["present"] = out.block(present)
+    return spec, out
+
+def render_columnar(output, details):
+    """{file name: bytes}: one .col file per table plus schema.json."""
+    themes = output["themes"]
+    cons, owner = [], []
+    for i, t in enumerate(themes):
+        for row in details.get(t["id"], {}).get("constituents", ()):
+            cons.append(row)
+            owner.append(i)
+    (t_spec, t_file), (c_spec, c_file) = _table(themes, "themes"), _table(cons, "constituents")
+    c_spec["key"] = {"name": "theme", "references": "themes",
+                     **c_file.block(np.array(owner, dtype=np.int32))}
+    schema = {
+        "version": COLUMNAR_VERSION,
+        **{k: output.get(k) for k in ("updated", "mode", "methodology", "spy")},
+        "tables": {"themes": t_spec, "constituents": c_spec},
+    }
+    return {"themes.col": t_file.buf.getvalue(), "constituents.col": c_file.buf.getvalue(),
+            "schema.json": (json.dumps(schema, indent=1, ensure_ascii=False) + "\n").encode()}
+
+def write_columnar(output, details, out_dir=COLUMNAR_DIR):
+    """Write the column files (unchanged ones are skipped, stale ones removed).
+    Returns the names actually written."""
+    files = render_columnar(output, details)
+    os.makedirs(out_dir, exist_ok=True)
+    written = []
+    for name, body in files.items():
+        path = os.path.join(out_dir, name)
+        try:
+            with open(path, "rb") as f:
+                if f.read() == body:
+                    continue
+        except FileNotFoundError:
+            pass
+        with open(path + ".tmp", "wb") as f:
+            f.write(body)
+        os.replace(path + ".tmp", path)
+        written.append(name)
+    for name in os.listdir(out_dir):               # incl. version 1's .npy column files
+        if name not in files and name.endswith((".col", ".npy", ".tmp")):
+            os.remove(os.path.join(out_dir, name))
+    return written
+
+# ── Reader ────────────────────────────────────────────────────────────────────
+def load_columnar(path=COLUMNAR_DIR, columns=None, mmap=True):
+    """{"schema": …, "themes": {field: array}, "constituents": {field: array}}.
+    Only the fields named in `columns` are loaded (all by default), and a
+    table none of them is in isn't opened. List fields load as (values,
+    offsets). Each table file is mapped once and its columns are read-only
+    views into it; mmap=False reads the file instead."""
+    with open(os.path.join(path, "schema.json")) as f:
+        schema = json.load(f)
+    want = None if columns is None else set(columns)
+    out  = {"schema": schema}
+    for table, spec in schema["tables"].items():
+        key   = spec.get("key")
+        names = [c["name"] for c in spec["columns"]] + (["present"] if spec["optional"] else [])
+        names += [key["name"]] if key else []
+        if want is not None and not want.intersection(names):
+            continue
+        file = os.path.join(path, spec["file"])
+        buf  = (np.memmap(file, dtype=np.uint8, mode="r") if mmap and os.path.getsize(file)
+                else np.fromfile(file, dtype=np.uint8))       # an empty file can't be mapped
+        view = lambda b: buf[b["offset"]:b["offset"] + np.dtype(b["dtype"]).itemsize * b["count"]].view(b["dtype"])
+        cols = {c["name"]: ((view(c["values"]), view(c["offsets"])) if "offsets" in c else view(c))
+                for c in spec["columns"] if want is None or c["name"] in want}
+        if spec["optional"] and (want is None or "present" in want):
+            cols["present"] = view(spec["present"])
+        if key and (want is None or key["name"] in want):
+            cols[key["name"]] = view(key)
+        out[table] = cols
+    return out
+
+def _json_value(v, kind):
+    if kind in ("int", "float"):
+        return None if v != v else (int(v) if kind == "int" else float(v))
+    return bool(v) if kind == "bool" else v.decode()
+
+def columnar_records(cols):
+    """(theme records, {theme id: constituent rows}) rebuilt from load_columnar()
+    — the JSON documents' values, for checks and readers that want dicts."""
+    tables = {}
+    for table, spec in cols["schema"]["tables"].items():
+        data, rows = cols[table], [{} for _ in range(spec["rows"])]
+        present = data.get("present")
+        for c in spec["columns"]:
+            name, kind = c["name"], c["json"]
+            keep = range(spec["rows"]) if name not in spec["optional"] else np.flatnonzero(present)
+            if "offsets" in c:
+                values, offsets = data[name]
+                inner = kind[5:-1]
+                for i in keep:
+                    rows[i][name] = [_json_value(v, inner) for v in values[offsets[i]:offsets[i + 1]].tolist()]
+            else:
+                col = data[name].tolist()
+                for i in keep:
+                    rows[i][name] = _json_value(col[i], kind)
+        tables[table] = rows
+    themes, details = tables["themes"], {t["id"]: [] for t in tables["themes"]}
+    for row, i in zip(tables["constituents"], cols["constituents"]["theme"].tolist()):
+        details[themes[i]["id"]].append(row)
+    return themes, details
@@ -0,0 +1,231 @@
+"""Vectorized metrics engine: every per-ticker metric for a universe at once."""
+
+import datetime
+
+import numpy as np
+
+from .records import Bars, TickerMetrics
+from .sessions import nyse
+
+# ══════════════════════════════════════════════════════════════════════════════
+# VECTORIZED METRICS ENGINE — every per-ticker metric for the whole universe
+# ══════════════════════════════════════════════════════════════════════════════
+# All tickers are laid onto one calendar as a tickers × sessions float matrix,
+# NaN where a ticker has no value: the NYSE session ordinals the bars span, or
+# the sorted union of bar timestamps when some bar is off the calendar. The
+# scalar functions above work on "the last N non-None values"; here each
+# validity mask is right-aligned with a stable argsort so those windows become
+# plain column slices. Sums run column by column, left to right, so every
+# float matches the scalar code bit for bit and rounds identically.
+
+def _flat(raws, key, nbars):
+    """One bar field of every ticker, back to back, None → NaN (padded to len(ts))."""
+    flat = []
+    for raw, n in zip(raws, nbars):
+        vals = raw.get(key) or ()
+        flat.extend(vals if len(vals) == n else (list(vals[:n]) + [None] * (n - len(vals))))
+    return np.array(flat, dtype=float)
+
+def _right_align(mask, *arrays, width=None):
+    """Move each row's valid cells to the right end, keeping their order; only
+    the last `width` columns are gathered (all of them by default)."""
+    order = np.argsort(mask, axis=1, kind="stable")[:, -(width or mask.shape[1]):]
+    keep  = np.take_along_axis(mask, order, axis=1)
+    return [np.where(keep, np.take_along_axis(a, order, axis=1), np.nan) for a in arrays]
+
+def _seqsum(block):
+    """Row sums accumulated left → right like sum(); NaN cells are skipped."""
+    acc = np.zeros(block.shape[0])
+    for j in range(block.shape[1]):
+        x   = block[:, j]
+        acc = acc + np.where(np.isnan(x), 0.0, x)
+    return acc
+
+def _rounded(values, nd, ok):
+    return [round(float(v), nd) if k else None for v, k in zip(values, ok)]
+
+def _pct_vec(cur, base):
+    ok  = (np.nan_to_num(cur) != 0) & (np.nan_to_num(base) != 0)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        out = (cur - base) / np.abs(base) * 100
+    return _rounded(out, 2, ok)
+
+def compute_universe(raws_by_ticker, spy_sessions, red_avg, anchors):
+    """Metrics for every ticker in one batched pass.
+
+    `anchors` maps a return key (e.g. "r1W") to the unix timestamp whose last
+    close is the base price. Returns {ticker: {metric: value}} with the same
+    keys/rounding as the scalar compute_* functions.
+    """
+    tickers = [t for t, r in raws_by_ticker.items() if r]
+    if not tickers:
+        return {}
+    return compute_packed(tickers, pack_bars([raws_by_ticker[t] for t in tickers]),
+                          spy_sessions, red_avg, anchors)
+
+# ── Packed bars ───────────────────────────────────────────────────────────────
+# The engine's input: every bar column flattened with each ticker's run back to
+# back ("nbars" gives the run lengths), plus one slot per ticker for the live
+# price / prev close and whether it has high-low and volume data. Flat numpy
+# columns can be sliced per shard or placed in shared memory as they are.
+PACKED_BAR_COLS = ("ts", "closes", "highs", "lows", "vols")
+PACKED_TICKER_COLS = ("nbars", "price", "prev", "has_hl", "has_vol")
+
+def pack_bars(raws):
+    if raws and all(isinstance(r, Bars) for r in raws):
+        # the columns are already NaN-holed float64 — concatenate the buffers
+        vals = np.concatenate([r.values for r in raws], axis=1)
+        bits = np.array([r.present for r in raws])
+        return {
+            "nbars":   np.array([len(r.ts) for r in raws], dtype=np.int64),
+            "ts":      np.concatenate([r.ts for r in raws]).astype(np.int64),
+            "closes":  vals[0], "highs": vals[1], "lows": vals[2], "vols": vals[3],
+            "price":   np.array([r.price for r in raws], dtype=float),
+            "prev":    np.array([r.prev_close for r in raws], dtype=float),
+            "has_hl":  (bits & 0b0110) == 0b0110,
+            "has_vol": (bits & 0b1000) != 0,
+        }
+    nbars = np.array([len(r["ts"]) for r in raws], dtype=np.int64)
+    with np.errstate(invalid="ignore"):
+        return {
+            "nbars":   nbars,
+            "ts":      np.array([t for r in raws for t in r["ts"]], dtype=np.int64),
+            "closes":  _flat(raws, "closes", nbars),
+            "highs":   _flat(raws, "highs", nbars),
+            "lows":    _flat(raws, "lows", nbars),
+            "vols":    _flat(raws, "vols", nbars),
+            "price":   np.array([r["price"] for r in raws], dtype=float),
+            "prev":    np.array([r["prev_close"] for r in raws], dtype=float),
+            "has_hl":  np.array([bool(r.get("highs")) and bool(r.get("lows")) for r in raws]),
+            "has_vol": np.array([bool(r.get("vols")) for r in raws]),
+        }
+
+def session_columns(ts, rows):
+    """(column of each bar, column count, column(ts) → last column at or before)
+    for bars `ts` of tickers `rows`. Columns are NYSE session ordinals offset to
+    the first one, so a lookup is two array reads; bars off the calendar (or two
+    on one session) fall back to the union of bar timestamps and bisection."""
+    if len(ts):
+        cal  = nyse(datetime.datetime.utcfromtimestamp(int(ts.max())).year)
+        ords = cal.ordinal(cal.day(ts))
+        same = (rows[1:] == rows[:-1]) & (ords[1:] <= ords[:-1])
+        if ords.min() >= 0 and not same.any():
+            lo, hi = int(ords.min()), int(ords.max())
+            def column(t):
+                return min(int(cal.on_or_before(cal.day(t))) - lo, hi - lo)
+            return ords - lo, hi - lo + 1, column
+    union = np.unique(ts)
+    return (np.searchsorted(union, ts), len(union),
+            lambda t: int(np.searchsorted(union, t, side="right")) - 1)
+
+def compute_packed(tickers, p, spy_sessions, red_avg, anchors):
+    """compute_universe() over pack_bars() columns for `tickers` (same order)."""
+    n      = len(tickers)
+    rows   = np.repeat(np.arange(n), p["nbars"])
+    cols, m, column = session_columns(p["ts"], rows)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        C, H, L, V = (np.full((n, m), np.nan) for _ in range(4))
+        C[rows, cols], H[rows, cols] = p["closes"], p["highs"]
+        L[rows, cols], V[rows, cols] = p["lows"], p["vols"]
+        price, prev = p["price"], p["prev"]
+        has_price = np.nan_to_num(price) != 0
+        has_hl, has_vol, nbars = p["has_hl"], p["has_vol"], p["nbars"]
+
+        mc  = ~np.isnan(C)
+        ncl = mc.sum(axis=1)
+        (Cc,) = _right_align(mc, C)
+        out = {"r1D": _pct_vec(price, prev)}
+
+        # ── Anchored returns: last close at or before each anchor ─────────────
+        last_valid = np.maximum.accumulate(np.where(mc, np.arange(m), -1), axis=1)
+        rows = np.arange(n)
+        for key, target in anchors.items():
+            k    = column(target)
+            idx  = last_valid[:, k] if k >= 0 else np.full(n, -1)
+            base = np.where(idx >= 0, C[rows, np.maximum(idx, 0)], np.nan)
+            out[key] = _pct_vec(price, base)
+
+        # ── ADR% / ADV (last 20 sessions) ─────────────────────────────────────
+        mhl = ~np.isnan(H) & ~np.isnan(L) & mc & (np.nan_to_num(C) > 0)
+        Hd, Ld, Cd = _right_align(mhl, H, L, C, width=20)
+        del H, L                          # only the right-aligned tails are read
+        rng_pct = (Hd - Ld) / Cd * 100
+        ndays   = mhl.sum(axis=1)
+        adr     = _seqsum(rng_pct[:, -20:]) / np.minimum(ndays, 20)
+        out["adr_pct"] = _rounded(adr, 2, has_hl & (ndays > 0))
+
+        mvc = ~np.isnan(V) & mc & (np.nan_to_num(V) > 0)
+        Va, Ca = _right_align(mvc, V, C, width=20)
+        npairs = mvc.sum(axis=1)
+        adv    = _seqsum((Va * Ca)[:, -20:]) / np.minimum(npairs, 20)
+        out["adv"] = [float(a) if k else None for a, k in zip(adv, has_vol & (npairs > 0))]
+
+        # ── Breadth: current price vs 20-day MA ───────────────────────────────
+        ma20 = _seqsum(Cc[:, -20:]) / 20
+        out["brd"] = [(1 if p > a else 0) if k else None
+                      for p, a, k in zip(price, ma20, (ncl >= 20) & has_price)]
+
+        # ── Resilience on SPY red days ────────────────────────────────────────
+        reds = [s for s in spy_sessions if s["ret"] < 0]
+        seen = np.cumsum(mc, axis=1)
+        red_sum, red_n = np.zeros(n), np.zeros(n, dtype=int)
+        for s in reds:
+            k   = column(s["ts"])
+            cnt = seen[:, k] if k >= 0 else np.zeros(n, dtype=int)
+            ok  = cnt >= 2
+            pos = m - ncl + cnt - 1          # index of that close in Cc
+            cur = Cc[rows, np.clip(pos, 0, m - 1)]
+            prv = Cc[rows, np.clip(pos - 1, 0, m - 1)]
+            ok &= (np.nan_to_num(cur) != 0) & (np.nan_to_num(prv) != 0)
+            ret = (cur - prv) / prv * 100
+            red_sum = red_sum + np.where(ok, ret, 0.0)
+            red_n  += ok
+        res_ok = (red_n > 0) & (ncl >= 2) & bool(reds) & (red_avg is not None)
+        out["res"] = [round(round(float(t) / int(c), 2) - red_avg, 2) if k else None
+                      for t, c, k in zip(red_sum, np.maximum(red_n, 1), res_ok)]
+
+        # ── Volume accumulation: up-day vs down-day $ volume, last 10 pairs ───
+        mva = mvc & (np.nan_to_num(C) > 0)
+        Vv, Cv = _right_align(mva, V, C, width=11)
+        del V
+        c11, v11 = Cv[:, -11:], Vv[:, -11:]
+        rets = (c11[:, 1:] - c11[:, :-1]) / c11[:, :-1]
+        dv   = c11[:, 1:] * v11[:, 1:]
+        up, dn = rets > 0, rets < 0
+        up_n, dn_n = up.sum(axis=1), dn.sum(axis=1)
+        ratio = ((_seqsum(np.where(up, dv, np.nan)) / np.maximum(up_n, 1)) /
+                 (_seqsum(np.where(dn, dv, np.nan)) / np.maximum(dn_n, 1)))
+        vacc_ok = has_vol & (nbars >= 12) & (mva.sum(axis=1) >= 6) & (up_n > 0) & (dn_n > 0)
+        out["vacc"] = _rounded(np.minimum(ratio, 3.0), 2, vacc_ok)
+
+        # ── ADR contraction: sessions 11-20 ago vs last 10 ────────────────────
+        recent = _seqsum(rng_pct[:, -10:]) / 10
+        older  = _seqsum(rng_pct[:, -20:-10]) / 10
+        adrc_ok = has_hl & (nbars >= 25) & (ndays >= 25) & ~(recent < 0.1)
+        out["adrc"] = _rounded(np.minimum(older / recent, 3.0), 2, adrc_ok)
+
+        # ── RS trend: slope of (stock − SPY) daily return, last 10 sessions ───
+        n_spy = len(spy_sessions)
+        if n_spy >= 5:
+            spy_i  = [n_spy - (11 - i) for i in range(1, 12)]
+            sp_ret = np.array([spy_sessions[j]["ret"] if 0 <= j < n_spy else 0 for j in spy_i],
+                              dtype=float)
+            s12 = Cc[:, -12:]
+            if m < 12:                       # a universe of short histories (none qualifies)
+                s12 = np.pad(s12, ((0, 0), (12 - m, 0)), constant_values=np.nan)
+            rs  = ((s12[:, 1:] - s12[:, :-1]) / s12[:, :-1] * 100 - sp_ret)[:, 1:]
+            my  = _seqsum(rs) / 10
+            num = _seqsum((np.arange(10) - 4.5) * (rs - my[:, None]))
+            out["rst"] = _rounded(num / 82.5, 3, ncl >= 12)
+        else:
+            out["rst"] = [None] * n
+
+        # ── Proximity to 52-week high ─────────────────────────────────────────
+        tail = Cc[:, -252:]
+        high = np.max(np.where(np.isnan(tail), -np.inf, tail), axis=1)
+        dist = np.where(high > 0, (high - price) / high, 1.0)
+        prox = np.where(dist > 0.40, 0.0, np.maximum(0.0, 1.0 - dist / 0.15))
+        out["prox"] = [(0.0 if d > 0.40 else round(float(p), 3)) if k else None
+                       for p, d, k in zip(prox, dist, (ncl >= 10) & has_price)]
+
+    return {t: TickerMetrics(**{k: v[i] for k, v in out.items()}) for i, t in enumerate(tickers)}
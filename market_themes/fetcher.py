@@ -0,0 +1,227 @@
+"""Yahoo chart/spark fetcher, the in-memory ticker cache and prefetch."""
+
+import datetime, functools, json, time, urllib.parse
+from concurrent.futures import ThreadPoolExecutor
+
+from .net import (YAHOO_BASE, FETCH_WORKERS, FETCH_RATE, request, retryable,
+                  _breaker, _budget)
+from .records import Bars
+from .stats import _stats
+from .store import (HISTORY_RANGE, HISTORY_DAYS, HISTORY_PAD_DAYS, STORE_OVERLAP_DAYS,
+                    BAR_FIELDS, load_bars, save_bars, merge_bars)
+
+# ── Yahoo Finance fetcher ─────────────────────────────────────────────────────
+def parse_chart(d):
+    """(meta, bars) from a decoded /v8/finance/chart payload."""
+    res = d["chart"]["result"][0]
+    q   = res["indicators"]["quote"][0]
+    ts  = res.get("timestamp") or []
+    col = lambda k: q.get(k) or [None] * len(ts)
+    return res["meta"], {"ts": ts, "closes": col("close"), "highs": col("high"),
+                         "lows": col("low"), "vols": col("volume")}
+
+def _chart(ticker, query):
+    url  = f"{YAHOO_BASE}/v8/finance/chart/{urllib.parse.quote(ticker, safe='')}?{query}&interval=1d"
+    body = request(url)
+    t0   = time.monotonic()
+    out  = parse_chart(json.loads(body))
+    _stats.add(parse_s=time.monotonic() - t0)
+    return out
+
+def raw_from_bars(meta, bars):
+    """The per-ticker record every metric consumes: bars + live price/prev close."""
+    price = meta.get("regularMarketPrice") or meta.get("previousClose")
+    raw   = Bars.from_lists(bars, price, meta.get("regularMarketPreviousClose"))
+    if not raw.prev_close:
+        last = raw.tail("closes", 2)
+        raw.prev_close = last[0] if last else None
+    return raw
+
+def stale_raw(bars):
+    """Record from stored bars alone — last stored close as price, flagged stale."""
+    raw  = raw_from_bars({}, bars)
+    last = raw.tail("closes", 1)
+    raw.price, raw.stale = (last[0] if last else None), True
+    return raw
+
+# Last non-transient failure per ticker (404, empty chart) — the screen uses it
+# to tell delisted symbols from ones that merely timed out.
+_hard_failures = {}
+
+def _stale_or_none(ticker, stored, e):
+    """Last-known-good bars after a transient failure; None for hard errors (e.g. 404)."""
+    if stored and retryable(e):
+        day = datetime.datetime.utcfromtimestamp(stored["ts"][-1]).strftime("%Y-%m-%d")
+        print(f"    STALE {ticker}: {e} — using stored bars through {day}")
+        return stale_raw(stored)
+    if not retryable(e):
+        _hard_failures[ticker] = str(e)[:200]
+    print(f"    ERR {ticker}: {e}")
+    return None
+
+def _warm(stored, period):
+    return bool(stored) and HISTORY_DAYS.get(stored.get("history"), 0) >= HISTORY_DAYS[period]
+
+def history_query(stored, period, now):
+    """Chart query for a ticker's history: bars since the last stored session
+    (minus the overlap) when the store covers `period`, else the full window."""
+    if _warm(stored, period):
+        since = stored["ts"][-1] - STORE_OVERLAP_DAYS * 86400
+    else:
+        since = now - (HISTORY_DAYS[period] + HISTORY_PAD_DAYS) * 86400
+    return f"period1={since}&period2={now}"
+
+def store_history(ticker, stored, period, meta, fresh):
+    """Merge fetched bars into the store and build the ticker's record."""
+    if _warm(stored, period):
+        bars = merge_bars(stored, fresh, period)
+    else:
+        bars = fresh
+        bars["history"] = period
+    save_bars(ticker, bars)
+    return raw_from_bars(meta, bars)
+
+def fetch(ticker, period=HISTORY_RANGE):
+    stored = load_bars(ticker)
+    try:
+        meta, fresh = _chart(ticker, history_query(stored, period, int(time.time())))
+        return store_history(ticker, stored, period, meta, fresh)
+    except Exception as e:
+        return _stale_or_none(ticker, stored, e)
+
+# ── Cache ─────────────────────────────────────────────────────────────────────
+_cache = {}
+def fetch_cached(ticker):
+    if ticker in _cache:
+        _stats.add(cache_hits=1)
+    else:
+        _stats.add(cache_misses=1)
+        with _stats.ticker(ticker):
+            _cache[ticker] = fetch(ticker)
+    return _cache[ticker]
+
+def prefetch(tickers, workers=FETCH_WORKERS, fetcher=None, cache=None):
+    """Fill `cache` (default: the module _cache) for every ticker concurrently;
+    pacing is left to the shared rate limiter."""
+    fetcher = fetcher or fetch
+    cache   = _cache if cache is None else cache
+    uniq = list(dict.fromkeys(tickers))
+    todo = [t for t in uniq if t not in cache]
+    _stats.add(cache_hits=len(uniq) - len(todo), cache_misses=len(todo))
+    if not todo:
+        return
+    t0 = time.monotonic()
+
+    def timed(ticker):
+        with _stats.ticker(ticker):
+            return fetcher(ticker)
+
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+        for ticker, raw in zip(todo, pool.map(timed, todo)):
+            cache[ticker] = raw
+    ok = sum(1 for t in todo if cache[t] and not cache[t].get("stale"))
+    print(f"Fetched {ok}/{len(todo)} tickers in {time.monotonic() - t0:.1f}s"
+          f"  ({workers} workers, {FETCH_RATE:g} req/s)")
+    report_health(todo, cache)
+
+def report_health(tickers, cache=None):
+    cache = _cache if cache is None else cache
+    stale = sum(1 for t in tickers if cache.get(t) and cache[t].get("stale"))
+    if stale or _budget.used or _breaker.trips:
+        print(f"  {stale} stale · {_budget.used}/{_budget.total} retries used"
+              f" · circuit opened {_breaker.trips}×")
+
+def prefetch_history(tickers, period=HISTORY_RANGE, workers=FETCH_WORKERS, cache=None):
+    """prefetch() of full history: one chart request per ticker. (Yahoo's
+    multi-symbol spark endpoint carries closes only, so it can't serve bars.)"""
+    prefetch(tickers, workers, functools.partial(fetch, period=period), cache)
+
+# ── Intraday quotes ───────────────────────────────────────────────────────────
+# Between daily runs only the live price moves. An intraday pass reuses the
+# stored bars and asks the batched spark endpoint for current prices — one
+# small request per SPARK_BATCH symbols instead of a chart download each. The
+# quote becomes today's close in memory only (high/low/volume are unknown
+# mid-session); the store keeps the completed sessions written by daily runs.
+SPARK_BATCH = 20
+
+def fetch_spark(tickers):
+    """{ticker: (meta, bars)} for one /v7/finance/spark batch (latest session)."""
+    q  = urllib.parse.urlencode({"symbols": ",".join(tickers)})
+    body = request(f"{YAHOO_BASE}/v7/finance/spark?{q}&range=1d&interval=1d")
+    t0 = time.monotonic()
+    d  = json.loads(body)
+    _stats.add(parse_s=time.monotonic() - t0)
+    out = {}
+    for item in (d.get("spark") or {}).get("result") or []:
+        res = item.get("response")
+        if not res:
+            continue
+        out[item["symbol"]] = parse_chart({"chart": {"result": res}})
+    return out
+
+def fetch_quote(ticker):
+    """(meta, bars) for the latest session of one ticker — spark fallback."""
+    try:
+        return _chart(ticker, "range=1d")
+    except Exception as e:
+        return e
+
+def patch_quote(bars, meta, today):
+    """Stored bars with the live price as the current session's close."""
+    price = meta.get("regularMarketPrice")
+    ts    = today["ts"][-1] if today["ts"] else meta.get("regularMarketTime")
+    if price is None or ts is None:
+        return bars
+    if bars["ts"][-1] // 86400 == ts // 86400:
+        bars["closes"][-1] = price
+    elif ts > bars["ts"][-1]:
+        for k, v in zip(BAR_FIELDS, (ts, price, None, None, None)):
+            bars[k].append(v)
+    return bars
+
+def prefetch_intraday(tickers, period=HISTORY_RANGE, workers=FETCH_WORKERS, cache=None):
+    """Fill `cache` from stored bars + batched live quotes; cold tickers get a full fetch."""
+    cache = _cache if cache is None else cache
+    uniq = list(dict.fromkeys(tickers))
+    todo = [t for t in uniq if t not in cache]
+    stored = {t: load_bars(t) for t in todo}
+    warm = [t for t in todo if stored[t]]
+    cold = [t for t in todo if not stored[t]]
+    _stats.add(cache_hits=len(uniq) - len(todo), cache_misses=len(warm))   # cold: prefetch() counts them
+    t0 = time.monotonic()
+
+    def spark(batch):
+        try:
+            with _stats.batch(batch):
+                return fetch_spark(batch)
+        except Exception as e:
+            print(f"    ERR spark {batch[0]}…{batch[-1]}: {e} — falling back per ticker")
+            return {}
+
+    def quote(ticker):
+        with _stats.ticker(ticker):
+            return fetch_quote(ticker)
+
+    batches = [warm[i:i + SPARK_BATCH] for i in range(0, len(warm), SPARK_BATCH)]
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+        quotes = {}
+        for got in pool.map(spark, batches):
+            quotes.update(got)
+        missing = [t for t in warm if t not in quotes]
+        for t, q in zip(missing, pool.map(quote, missing)):
+            quotes[t] = q
+    for t in warm:
+        q = quotes[t]
+        cache[t] = (_stale_or_none(t, stored[t], q) if isinstance(q, Exception)
+                     else raw_from_bars(q[0], patch_quote(stored[t], *q)))
+    ok = sum(1 for t in warm if cache[t] and not cache[t].get("stale"))
+    print(f"Quoted {ok}/{len(warm)} stored tickers in {time.monotonic() - t0:.1f}s"
+          f"  ({len(batches)} spark batches, {len(missing)} single quotes)")
+    report_health(warm, cache)
+    if cold:
+        print(f"  {len(cold)} tickers have no stored history — full fetch")
+        prefetch_history(cold, period, workers, cache)
+
+def universe_of(themes):
+    """SPY plus every constituent, in first-seen order."""
+    return list(dict.fromkeys(["SPY"] + [s for th in themes for s in th[5]]))
@@ -0,0 +1,123 @@
+"""Append-only per-theme score / emerging / rank archive."""
+
+import bisect, datetime, json, os
+
+# ── Score archive: append-only per-theme time series under data/history/ ────
+# One CSV per metric, one row per session: "date,v0,v1,…" where column i
+# belongs to the theme mapped to i in index.json (new themes get new columns;
+# retired ones keep theirs, so older rows never move). index.json also holds
+# every row's byte offset, so a query seeks straight to the rows it needs.
+# A rerun for the same session replaces that session's row.
+ARCHIVE_DIR     = os.environ.get("ARCHIVE_DIR", os.path.join("data", "history"))
+ARCHIVE_METRICS = ("score", "emerging", "rank")
+ARCHIVE_TAIL    = 60    # sessions of history shipped in each theme detail file
+
+class ScoreArchive:
+    def __init__(self, path=ARCHIVE_DIR):
+        self.path = path
+        try:
+            with open(os.path.join(path, "index.json")) as f:
+                self.index = json.load(f)
+        except FileNotFoundError:
+            self.index = {"metrics": list(ARCHIVE_METRICS), "themes": {}, "dates": [],
+                          "offsets": {m: [] for m in ARCHIVE_METRICS},
+                          "ends":    {m: 0 for m in ARCHIVE_METRICS}}
+
+    def _file(self, metric):
+        return os.path.join(self.path, f"{metric}.csv")
+
+    def append(self, date, values):
+        """Record one session; values = {metric: {theme id: number or None}}."""
+        ix = self.index
+        if ix["dates"] and date < ix["dates"][-1]:
+            raise ValueError(f"archive is append-only: {date} < {ix['dates'][-1]}")
+        replace = bool(ix["dates"]) and ix["dates"][-1] == date
+        for row in values.values():
+            for tid in row:
+                ix["themes"].setdefault(tid, len(ix["themes"]))
+        cols = sorted(ix["themes"], key=ix["themes"].get)
+        os.makedirs(self.path, exist_ok=True)
+        for m in ARCHIVE_METRICS:
+            offs = ix["offsets"][m]
+            end  = offs.pop() if replace else ix["ends"][m]
+            line = ",".join([date] + [_fmt_cell(values[m].get(t)) for t in cols]) + "\n"
+            with open(self._file(m), "a+b") as f:
+                f.truncate(end)          # also drops a row left by an interrupted run
+                f.seek(end)
+                f.write(line.encode())
+            offs.append(end)
+            ix["ends"][m] = end + len(line.encode())
+        if replace:
+            ix["dates"].pop()
+        ix["dates"].append(date)
+        tmp = os.path.join(self.path, "index.json.tmp")
+        with open(tmp, "w") as f:
+            json.dump(ix, f, separators=(",", ":"))
+        os.replace(tmp, os.path.join(self.path, "index.json"))
+
+    def _rows(self, metric, start, stop=None):
+        """Parsed rows [start, stop) of one metric file — one seek, one read."""
+        ix, offs = self.index, self.index["offsets"][metric]
+        stop = len(offs) if stop is None else stop
+        if start >= stop:
+            return []
+        end = offs[stop] if stop < len(offs) else ix["ends"][metric]
+        with open(self._file(metric), "rb") as f:
+            f.seek(offs[start])
+            chunk = f.read(end - offs[start]).decode()
+        return [line.split(",") for line in chunk.splitlines()]
+
+    def series(self, theme_id, metric="score", last=None, since=None):
+        """[(date, value)] for one theme, newest last; `last` sessions or from `since`."""
+        ix  = self.index
+        col = ix["themes"].get(theme_id)
+        if col is None:
+            return []
+        start = bisect.bisect_left(ix["dates"], since) if since else 0
+        if last is not None:
+            start = max(start, len(ix["dates"]) - last)
+        cast = int if metric == "rank" else float
+        return [(r[0], _parse_cell(r[col + 1], cast) if col + 1 < len(r) else None)
+                for r in self._rows(metric, start)]
+
+    def rank_changes(self, sessions=1):
+        """{theme id: places gained over `sessions` sessions} (positive = moved up)."""
+        n = len(self.index["dates"])
+        if n <= sessions:
+            return {}
+        old, cur = self._rows("rank", n - 1 - sessions, n - 1)[0], self._rows("rank", n - 1)[0]
+        out = {}
+        for tid, col in self.index["themes"].items():
+            a = _parse_cell(old[col + 1], int) if col + 1 < len(old) else None
+            b = _parse_cell(cur[col + 1], int) if col + 1 < len(cur) else None
+            out[tid] = a - b if a is not None and b is not None else None
+        return out
+
+def _fmt_cell(v):
+    return "" if v is None else str(v)
+
+def _parse_cell(s, cast=float):
+    return cast(s) if s else None
+
+def session_date(spy_raw, now):
+    """Trading date of the latest SPY bar (so weekend reruns replace Friday's row)."""
+    ts = spy_raw and (spy_raw["ts"] if isinstance(spy_raw, dict) else spy_raw.ts)
+    if ts is not None and len(ts):
+        return datetime.datetime.utcfromtimestamp(int(ts[-1])).strftime("%Y-%m-%d")
+    return now.strftime("%Y-%m-%d")
+
+def archive_run(archive, date, output, details):
+    """Append this run's ranks/scores and attach rank_chg + recent history to the output."""
+    themes = output["themes"]
+    archive.append(date, {
+        "score":    {t["id"]: t["score"] for t in themes},
+        "emerging": {t["id"]: t["emerging"] for t in themes},
+        "rank":     {t["id"]: i + 1 for i, t in enumerate(themes)},
+    })
+    changes = archive.rank_changes(1)
+    for t in themes:
+        t["rank_chg"] = changes.get(t["id"])
+        if t["id"] in details:
+            hist = {m: archive.series(t["id"], m, last=ARCHIVE_TAIL) for m in ARCHIVE_METRICS}
+            details[t["id"]]["hist"] = {"dates": [d for d, _ in hist["score"]],
+                                        **{m: [v for _, v in hist[m]] for m in ARCHIVE_METRICS}}
@@ -0,0 +1,244 @@
+"""Return helpers, lookback anchors, the SPY benchmark and the scalar
+per-ticker metric functions (the reference the vectorized engine matches)."""
+
+import bisect, datetime
+
+from .sessions import nyse
+
+def price_on(ts, closes, target_ts):
+    """Last non-None close at or before target_ts (ts ascending) — bisect, not a scan."""
+    i = bisect.bisect_right(ts, target_ts) - 1
+    while i >= 0 and closes[i] is None:
+        i -= 1
+    return closes[i] if i >= 0 else None
+
+def pct(cur, base):
+    if cur and base and base != 0:
+        return round((cur - base) / abs(base) * 100, 2)
+    return None
+
+def wavg(values, weights):
+    pairs = [(v, w) for v, w in zip(values, weights)
+             if v is not None and w is not None and w > 0]
+    if not pairs:
+        return None
+    total_w = sum(w for _, w in pairs)
+    return round(sum(v * w for v, w in pairs) / total_w, 2)
+
+def avg(values):
+    vals = [v for v in values if v is not None]
+    return round(sum(vals) / len(vals), 2) if vals else None
+
+# ── Reference timestamps ──────────────────────────────────────────────────────
+# Every lookback is served from the one daily-bar download: the base price is
+# the last close on or before today minus N calendar days. "Today" is the New
+# York date and the anchor is that session's close on the NYSE calendar
+# (sessions.py), so holidays, early closes and DST need no special casing.
+LOOKBACKS  = {"1W": 7, "1M": 30, "3M": 91, "6M": 182, "1Y": 365}
+TIMEFRAMES = ("1D",) + tuple(LOOKBACKS)
+SPY_KEYS   = {"1D": "d", "1W": "w", "1M": "m", "3M": "m3", "6M": "m6", "1Y": "y1"}
+LONG_TIMEFRAMES = ("3M", "6M", "1Y")    # reported, not part of the score blend
+
+def reference_times(now=None):
+    """(now, {timeframe: anchor ts}) for every entry in LOOKBACKS — each anchor
+    is the close of the last NYSE session on or before today minus N days."""
+    now   = now or datetime.datetime.utcnow()
+    cal   = nyse(now.year)
+    today = int(cal.day(int(now.replace(tzinfo=datetime.timezone.utc).timestamp())))
+    sess  = cal.on_or_before([today - d for d in LOOKBACKS.values()])
+    return now, {tf: int(cal.closes[k]) if k >= 0 else 0 for tf, k in zip(LOOKBACKS, sess.tolist())}
+
+def mkets(dt):
+    """Anchor timestamp for the date of `dt`: the close of the last NYSE
+    session on or before it (reference_times() applies this per lookback)."""
+    cal = nyse(dt.year)
+    day = int(cal.day(int(dt.replace(tzinfo=datetime.timezone.utc).timestamp())))
+    k   = int(cal.on_or_before([day])[0])
+    return int(cal.closes[k]) if k >= 0 else 0
+
+# ── SPY benchmark ─────────────────────────────────────────────────────────────
+def compute_spy(spy_raw, anchors, verbose=True):
+    spy = {**{k: None for k in SPY_KEYS.values()}, "daily_rets": []}
+    if not spy_raw:
+        return spy
+    c, pc   = spy_raw["price"], spy_raw["prev_close"]
+    if isinstance(spy_raw, dict):
+        ts_list, cl_list = spy_raw["ts"], spy_raw["closes"]
+        valid_cl = [(t, p) for t, p in zip(ts_list, cl_list) if p is not None][-21:]
+        close_on = lambda ts: price_on(ts_list, cl_list, ts)
+    else:                             # Bars: read the buffers, don't rebuild the lists
+        idx      = spy_raw.last_valid("closes", 21)
+        valid_cl = list(zip(spy_raw.ts[idx].tolist(), spy_raw.array("closes")[idx].tolist()))
+        close_on = spy_raw.close_on
+    spy_daily = []
+    for i in range(1, len(valid_cl)):
+        prev, curr = valid_cl[i-1][1], valid_cl[i][1]
+        spy_daily.append({"ts": valid_cl[i][0],
+                          "ret": round((curr - prev) / prev * 100, 4)})
+    spy_daily = spy_daily[-20:]
+    spy = {"d": pct(c, pc), "daily_rets": spy_daily}
+    for tf, ts in anchors.items():
+        spy[SPY_KEYS[tf]] = pct(c, close_on(ts))
+    if verbose:
+        print("  SPY " + "  ".join(f"{tf}={spy[SPY_KEYS[tf]]}%" for tf in TIMEFRAMES))
+    return spy
+
+def red_day_avg(spy_sessions):
+    """Avg SPY return over the red sessions in `spy_sessions`."""
+    return avg([s["ret"] for s in spy_sessions if s["ret"] < 0])
+
+# ══════════════════════════════════════════════════════════════════════════════
+# PER-TICKER METRICS — scalar reference implementations
+# The pipeline scores through compute_universe() below, which evaluates the
+# same formulas for every ticker at once; these stay as the readable spec.
+# ══════════════════════════════════════════════════════════════════════════════
+
+# ── ADR / ADV ─────────────────────────────────────────────────────────────────
+def compute_adr_adv(raw):
+    """(ADR%, avg daily $ volume) over the last 20 sessions."""
+    highs, lows = raw.get("highs", []), raw.get("lows", [])
+    closes, vols = raw["closes"], raw.get("vols", [])
+
+    # ADR% — avg daily range as % of close, last 20 days
+    adr_pct = None
+    if highs and lows and closes:
+        days = [(h, l, c) for h, l, c in zip(highs, lows, closes)
+                if h is not None and l is not None and c is not None and c > 0]
+        days = days[-20:]
+        if days:
+            adr_pct = round(sum((h - l) / c * 100 for h, l, c in days) / len(days), 2)
+
+    # Avg daily dollar volume (last 20 days) — used for liquidity check
+    adv = None
+    if vols and closes:
+        pairs = [(v, c) for v, c in zip(vols, closes)
+                 if v is not None and c is not None and v > 0][-20:]
+        if pairs:
+            adv = sum(v * c for v, c in pairs) / len(pairs)
+    return adr_pct, adv
+
+# ── Resilience ────────────────────────────────────────────────────────────────
+def compute_resilience(raw, spy_sessions):
+    spy_red_avg = red_day_avg(spy_sessions)
+    if not raw or spy_red_avg is None:
+        return None
+    valid = [(t, p) for t, p in zip(raw["ts"], raw["closes"]) if p is not None]
+    if len(valid) < 2:
+        return None
+    close_map = {t: p for t, p in valid}
+    ts_sorted = sorted(close_map.keys())
+    stock_reds = []
+    for s in spy_sessions:
+        if s["ret"] >= 0:
+            continue
+        idx = bisect.bisect_right(ts_sorted, s["ts"]) - 1
+        if idx > 0:
+            curr_p = close_map.get(ts_sorted[idx])
+            prev_p = close_map.get(ts_sorted[idx - 1])
+            if curr_p and prev_p:
+                stock_reds.append((curr_p - prev_p) / prev_p * 100)
+    if not stock_reds:
+        return None
+    return round(avg(stock_reds) - spy_red_avg, 2)
+
+# ── Breadth ───────────────────────────────────────────────────────────────────
+def compute_breadth(raw):
+    if not raw:
+        return None
+    cl = [c for c in raw["closes"] if c is not None]
+    if len(cl) < 20 or not raw["price"]:
+        return None
+    return 1 if raw["price"] > (sum(cl[-20:]) / 20) else 0
+
+
+
+# ══════════════════════════════════════════════════════════════════════════════
+# EMERGING THEME METRICS — catch themes before they break out
+# ══════════════════════════════════════════════════════════════════════════════
+
+def compute_vol_accumulation(raw):
+    """Up-day vs down-day volume ratio (last 10 sessions). >1.5 = accumulation."""
+    if not raw:
+        return None
+    closes = raw["closes"]
+    vols   = raw.get("vols", [])
+    if not vols or len(closes) < 12:
+        return None
+    valid = [(c, v) for c, v in zip(closes, vols)
+             if c is not None and v is not None and c > 0 and v > 0]
+    pairs = []
+    for i in range(1, len(valid)):
+        prev_c = valid[i-1][0]
+        curr_c, v = valid[i]
+        pairs.append(((curr_c - prev_c) / prev_c, curr_c * v))
+    pairs = pairs[-10:]
+    if len(pairs) < 5:
+        return None
+    up   = [dv for ret, dv in pairs if ret > 0]
+    down = [dv for ret, dv in pairs if ret < 0]
+    if not up or not down:
+        return None
+    return round(min((sum(up)/len(up)) / (sum(down)/len(down)), 3.0), 2)
+
+
+def compute_adr_contraction(raw):
+    """ADR 11-20 sessions ago vs last 10 sessions. >1.5 = range tightening = base forming."""
+    if not raw:
+        return None
+    highs  = raw.get("highs", [])
+    lows   = raw.get("lows", [])
+    closes = raw["closes"]
+    if not highs or not lows or len(closes) < 25:
+        return None
+    days = [(h, l, c) for h, l, c in zip(highs, lows, closes)
+            if h is not None and l is not None and c is not None and c > 0]
+    if len(days) < 25:
+        return None
+    recent = sum((h-l)/c*100 for h,l,c in days[-10:]) / 10
+    older  = sum((h-l)/c*100 for h,l,c in days[-20:-10]) / 10
+    if recent < 0.1:
+        return None
+    return round(min(older / recent, 3.0), 2)
+
+
+def compute_rs_trend(raw, spy_sessions):
+    """RS slope vs SPY over last 10 sessions. Positive = RS line rising before price move."""
+    if not raw or not spy_sessions or len(spy_sessions) < 5:
+        return None
+    closes = raw["closes"]
+    valid  = [c for c in closes if c is not None]
+    if len(valid) < 12:
+        return None
+    stock_cl = valid[-12:]
+    rs_vals  = []
+    n_spy    = len(spy_sessions)
+    for i in range(1, len(stock_cl)):
+        sc_ret = (stock_cl[i] - stock_cl[i-1]) / stock_cl[i-1] * 100
+        spy_i  = n_spy - (len(stock_cl) - 1 - i)
+        sp_ret = spy_sessions[spy_i]["ret"] if 0 <= spy_i < n_spy else 0
+        rs_vals.append(sc_ret - sp_ret)
+    rs_vals = rs_vals[-10:]
+    if len(rs_vals) < 5:
+        return None
+    n  = len(rs_vals)
+    xs = list(range(n))
+    mx = sum(xs) / n
+    my = sum(rs_vals) / n
+    num = sum((x-mx)*(y-my) for x,y in zip(xs, rs_vals))
+    den = sum((x-mx)**2 for x in xs)
+    return round(num/den, 3) if den > 0 else None
+
+
+def compute_proximity_to_high(raw):
+    """How close to 52-week high. 1.0=at high, 0=more than 40% away. Sweet spot: within 15%."""
+    if not raw or not raw.get("price"):
+        return None
+    closes = raw["closes"]
+    valid  = [c for c in closes if c is not None]
+    if len(valid) < 10:
+        return None
+    high52w  = max(valid[-252:])
+    distance = (high52w - raw["price"]) / high52w if high52w > 0 else 1.0
+    if distance > 0.40:
+        return 0.0
+    return round(max(0.0, 1.0 - (distance / 0.15)), 3)
@@ -0,0 +1,187 @@
+"""HTTP layer: keep-alive connections, shared rate limit, retries and breaker."""
+
+import gzip, http.client, os, random, threading, time, urllib.error, urllib.parse
+
+from .stats import _stats
+
+# ── HTTP: keep-alive connections + shared rate limit ─────────────────────────
+# All chart requests go through one token bucket so the worker pool can never
+# exceed FETCH_RATE requests/second against Yahoo, whatever FETCH_WORKERS is.
+# Yahoo publishes no limit; the default is ~4× the old serial loop's ~2 req/s,
+# and overshooting a throttle trips the breaker (README "Request rate").
+# YAHOO_BASE_URL can point at tools/mock_yahoo.py for offline runs.
+YAHOO_BASE    = os.environ.get("YAHOO_BASE_URL", "https://query1.finance.yahoo.com").rstrip("/")
+FETCH_WORKERS = int(os.environ.get("FETCH_WORKERS", "8"))
+FETCH_RATE    = float(os.environ.get("FETCH_RATE", "8"))     # requests/sec, 0 = unlimited
+FETCH_BURST   = int(os.environ.get("FETCH_BURST", "4"))
+FETCH_TIMEOUT = float(os.environ.get("FETCH_TIMEOUT", "10"))
+
+HEADERS = {"User-Agent": "Mozilla/5.0", "Accept": "application/json",
+           "Accept-Encoding": "gzip"}
+
+class TokenBucket:
+    """Thread-safe token bucket: `rate` tokens/sec, at most `burst` banked."""
+    def __init__(self, rate, burst=1):
+        self.rate     = rate
+        self.capacity = max(burst, 1)
+        self.tokens   = float(self.capacity)
+        self.stamp    = time.monotonic()
+        self.lock     = threading.Lock()
+
+    def acquire(self):
+        if self.rate <= 0:
+            return
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.stamp) * self.rate)
+                self.stamp  = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = (1 - self.tokens) / self.rate
+            time.sleep(wait)
+
+_limiter = TokenBucket(FETCH_RATE, FETCH_BURST)
+_local   = threading.local()    # per-thread {(scheme, host): connection}
+
+def http_get(url):
+    """GET `url` over a reused per-thread, per-host connection. Returns body bytes."""
+    parts = urllib.parse.urlsplit(url)
+    key   = (parts.scheme, parts.netloc)
+    path  = parts.path + (f"?{parts.query}" if parts.query else "")
+    conns = getattr(_local, "conns", None)
+    if conns is None:
+        conns = _local.conns = {}
+
+    t0 = time.monotonic()
+    _limiter.acquire()
+    t1 = time.monotonic()
+    while True:
+        conn   = conns.get(key)
+        reused = conn is not None
+        if conn is None:
+            cls  = http.client.HTTPSConnection if parts.scheme == "https" else http.client.HTTPConnection
+            conn = conns[key] = cls(parts.netloc, timeout=FETCH_TIMEOUT)
+        try:
+            conn.request("GET", path, headers=HEADERS)
+            r    = conn.getresponse()
+            body = r.read()
+        except (http.client.HTTPException, ConnectionError):
+            conn.close()
+            conns.pop(key, None)
+            if reused:      # server dropped an idle keep-alive socket — reconnect once
+                continue
+            raise
+        except OSError:
+            conn.close()
+            conns.pop(key, None)
+            raise
+        if r.will_close:
+            conn.close()
+            conns.pop(key, None)
+        _stats.add(requests=1, bytes=len(body), wait_s=t1 - t0, http_s=time.monotonic() - t1)
+        if r.getheader("Content-Encoding") == "gzip":
+            body = gzip.decompress(body)
+        if r.status != 200:
+            raise urllib.error.HTTPError(url, r.status, r.reason, r.headers, None)
+        return body
+
+# ── Retries: jittered backoff, per-run error budget, circuit breaker ─────────
+# Throttling (429), server errors and network timeouts are retried with full-
+# jitter exponential backoff. Retries draw on one budget for the whole run, so
+# a bad day degrades to single attempts instead of multiplying traffic, and a
+# run of consecutive failures opens the breaker: requests then fail fast until
+# BREAKER_COOLDOWN has passed and one probe gets through. Callers fall back to
+# stored bars when a ticker still fails.
+FETCH_RETRIES     = int(os.environ.get("FETCH_RETRIES", "3"))
+FETCH_BACKOFF     = float(os.environ.get("FETCH_BACKOFF", "0.5"))    # first retry delay cap (s)
+FETCH_BACKOFF_MAX = 8.0
+ERROR_BUDGET      = int(os.environ.get("FETCH_ERROR_BUDGET", "60"))  # retries per run
+BREAKER_THRESHOLD = 8       # consecutive retryable failures that open the breaker
+BREAKER_COOLDOWN  = 30.0
+
+class CircuitOpen(Exception):
+    pass
+
+class CircuitBreaker:
+    """Opens after `threshold` consecutive failures; half-opens after `cooldown` s."""
+    def __init__(self, threshold, cooldown):
+        self.threshold = threshold
+        self.cooldown  = cooldown
+        self.failures  = 0
+        self.opened_at = None
+        self.trips     = 0
+        self.lock      = threading.Lock()
+
+    def allow(self):
+        with self.lock:
+            return self.opened_at is None or time.monotonic() - self.opened_at >= self.cooldown
+
+    def record(self, ok):
+        with self.lock:
+            if ok:
+                self.failures, self.opened_at = 0, None
+                return
+            self.failures += 1
+            if self.failures >= self.threshold:
+                if self.opened_at is None:
+                    self.trips += 1
+                    print(f"    circuit open after {self.failures} consecutive failures"
+                          f" — pausing requests for {self.cooldown:g}s")
+                self.opened_at = time.monotonic()
+
+class ErrorBudget:
+    """Thread-safe count of retries still allowed this run."""
+    def __init__(self, total):
+        self.total = total
+        self.used  = 0
+        self.lock  = threading.Lock()
+
+    def take(self):
+        with self.lock:
+            if self.used >= self.total:
+                return False
+            self.used += 1
+            return True
+
+    def reset(self):
+        """New allowance for the next run (long-running processes refresh repeatedly)."""
+        with self.lock:
+            self.used = 0
+
+_breaker = CircuitBreaker(BREAKER_THRESHOLD, BREAKER_COOLDOWN)
+_budget  = ErrorBudget(ERROR_BUDGET)
+
+def retryable(e):
+    """Transient failures worth another attempt (and a stale fallback)."""
+    if isinstance(e, urllib.error.HTTPError):
+        return e.code == 429 or e.code >= 500
+    return isinstance(e, (CircuitOpen, OSError, http.client.HTTPException))
+
+def _backoff(attempt, e):
+    delay = random.uniform(0, min(FETCH_BACKOFF_MAX, FETCH_BACKOFF * 2 ** attempt))
+    after = getattr(e, "headers", None) and e.headers.get("Retry-After")
+    if after and after.isdigit():
+        delay = max(delay, min(float(after), FETCH_BACKOFF_MAX))
+    return delay
+
+def request(url):
+    """http_get with bounded retries under the run's error budget and breaker."""
+    attempt = 0
+    while True:
+        if not _breaker.allow():
+            raise CircuitOpen("circuit open — upstream throttling or failing")
+        try:
+            body = http_get(url)
+        except Exception as e:
+            transient = retryable(e)
+            _breaker.record(not transient)
+            if not transient or attempt >= FETCH_RETRIES or not _budget.take():
+                raise
+            _stats.add(retries=1)
+            time.sleep(_backoff(attempt, e))
+            attempt += 1
+            continue
+        _breaker.record(True)
+        return body
@@ -0,0 +1,70 @@
+"""Published files: summary, per-theme details, hash manifest, run stats."""
+
+import hashlib, json, os
+
+from .scoring import build_vectors
+
+# ── Output files ──────────────────────────────────────────────────────────────
+# summary.json is everything the first paint needs; themes/<id>.json is fetched
+# when a row is expanded. manifest.json maps each file to a content hash so the
+# page revalidates one small file and loads the rest from ?v=<hash> URLs that
+# stay cacheable until their content changes. market_data.json keeps the full
+# document (details inlined) for older pages and external readers; vectors.json
+# holds every theme's scored constituent inputs for the what-if sliders.
+def _dumps(obj):
+    return json.dumps(obj, separators=(",", ":"), ensure_ascii=False).encode()
+
+def _digest(body):
+    return hashlib.sha256(body).hexdigest()[:16]
+
+def render_output(output, details):
+    """{path relative to the data dir: bytes} for every published file."""
+    files = {"summary.json": _dumps(output)}
+    for tid, d in details.items():
+        files[f"themes/{tid}.json"] = _dumps(d)
+    full = {**output, "themes": [{**t, **details.get(t["id"], {})} for t in output["themes"]]}
+    files["market_data.json"] = _dumps(full)
+    files["vectors.json"] = _dumps(build_vectors(output, details))
+    files["manifest.json"] = _dumps({
+        "updated": output["updated"],
+        "files":   {p: _digest(b) for p, b in sorted(files.items())},
+    })
+    return files
+
+def write_output(output, details, out_dir="data"):
+    """Write the rendered files, skipping unchanged ones; drops stale theme files.
+    Returns the paths actually written."""
+    files   = render_output(output, details)
+    written = []
+    for rel, body in files.items():
+        path = os.path.join(out_dir, rel)
+        try:
+            with open(path, "rb") as f:
+                if f.read() == body:
+                    continue
+        except FileNotFoundError:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp = path + ".tmp"
+        with open(tmp, "wb") as f:
+            f.write(body)
+        os.replace(tmp, path)
+        written.append(rel)
+    theme_dir = os.path.join(out_dir, "themes")
+    for name in os.listdir(theme_dir) if os.path.isdir(theme_dir) else ():
+        if f"themes/{name}" not in files:
+            os.remove(os.path.join(theme_dir, name))
+    return written
+
+# ── Run statistics sidecar ────────────────────────────────────────────────────
+RUN_STATS_PATH = os.path.join("data", "run_stats.json")
+RUN_LOG        = os.environ.get("RUN_LOG")      # optional JSON-lines log of every run's summary
+
+def write_run_stats(summary, per_ticker, path=RUN_STATS_PATH, log=None):
+    """Sidecar with per-ticker detail; the summary line is appended to `log` for graphing."""
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w") as f:
+        json.dump({**summary, "tickers": per_ticker}, f, separators=(",", ":"))
+    if log:
+        os.makedirs(os.path.dirname(log), exist_ok=True)
+        with open(log, "a") as f:
+            f.write(json.dumps(summary, separators=(",", ":")) + "\n")
@@ -0,0 +1,120 @@
+"""Process-pool theme scoring over bars shared through one shared-memory block."""
+
+import os
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from .engine import PACKED_BAR_COLS, PACKED_TICKER_COLS, compute_packed, pack_bars
+from .metrics import red_day_avg
+from .records import Bars
+from .scoring import build_spark5, score_theme
+
+THEME_PROCS = int(os.environ.get("THEME_PROCS", "0"))   # 0/1 = serial
+SHARDS_PER_PROC = 4        # smaller shards even out baskets of different sizes
+
+# ── Shared bar block ──────────────────────────────────────────────────────────
+# The parent packs the universe once (engine.pack_bars) and copies each column
+# into one shared-memory block; only the layout descriptor is pickled. A worker
+# gathers its shard's runs out of the shared columns with numpy indexing and
+# runs the same engine on them, so every metric is computed exactly as in the
+# serial path (per-ticker results don't depend on which tickers share a pass).
+def _layout(nbars):
+    n, total = len(nbars), int(nbars.sum())
+    cols = [(k, np.int64 if k == "ts" else np.float64, total) for k in PACKED_BAR_COLS]
+    cols += [("nbars", np.int64, n), ("price", np.float64, n), ("prev", np.float64, n),
+             ("has_hl", np.bool_, n), ("has_vol", np.bool_, n), ("stale", np.bool_, n)]
+    return cols
+
+def _views(buf, layout):
+    out, pos = {}, 0
+    for name, dtype, count in layout:
+        out[name] = np.ndarray((count,), dtype=dtype, buffer=buf, offset=pos)
+        pos += -(-np.dtype(dtype).itemsize * count // 8) * 8     # 8-byte aligned columns
+    return out
+
+def pack_shared(cache, tickers):
+    """(SharedMemory, descriptor) with every non-empty record in `tickers`."""
+    tickers = [t for t in tickers if cache.get(t)]
+    raws    = [cache[t] for t in tickers]
+    packed  = pack_bars(raws)
+    packed["stale"] = np.array([bool(r.get("stale")) for r in raws])
+    layout  = _layout(packed["nbars"])
+    size    = sum(-(-np.dtype(d).itemsize * c // 8) * 8 for _, d, c in layout)
+    shm     = shared_memory.SharedMemory(create=True, size=max(size, 8))
+    for k, view in _views(shm.buf, layout).items():
+        view[:] = packed[k]
+    del view
+    return shm, {"name": shm.name, "layout": layout, "tickers": tickers}
+
+def _gather(v, offsets, idx):
+    """pack_bars()-style columns for the tickers at positions `idx`."""
+    lens = v["nbars"][idx]
+    ends = np.cumsum(lens)
+    sel  = np.repeat(offsets[idx] - (ends - lens), lens) + np.arange(int(ends[-1]) if len(ends) else 0)
+    out  = {k: v[k][sel] for k in PACKED_BAR_COLS}
+    out.update({k: v[k][idx] for k in PACKED_TICKER_COLS + ("stale",)})
+    return out
+
+def _records(p, tickers):
+    """The part of each record scoring reads (closes, price, stale) as closes-only
+    Bars over views of the gathered columns — no per-bar Python objects."""
+    out, pos = {}, 0
+    for t, n, price, stale in zip(tickers, p["nbars"].tolist(), p["price"].tolist(), p["stale"].tolist()):
+        closes = p["closes"][pos:pos + n][None]
+        out[t] = Bars(p["ts"][pos:pos + n], closes, np.packbits(~np.isnan(closes), axis=1), 0b0001,
+                      None if price != price else price, None, stale)
+        pos += n
+    return out
+
+# ── Workers ───────────────────────────────────────────────────────────────────
+_worker = {}
+
+def _init_worker(desc, spy, anchors):
+    shm = shared_memory.SharedMemory(name=desc["name"])      # the parent unlinks it
+    v   = _views(shm.buf, desc["layout"])
+    _worker.update(shm=shm, views=v, spy=spy, anchors={f"r{tf}": ts for tf, ts in anchors.items()},
+                   offsets=np.concatenate(([0], np.cumsum(v["nbars"])[:-1])),
+                   index={t: i for i, t in enumerate(desc["tickers"])})
+
+def _score_shard(themes):
+    w      = _worker
+    wanted = [t for t in dict.fromkeys(s for th in themes for s in th[5]) if t in w["index"]]
+    p      = _gather(w["views"], w["offsets"], np.array([w["index"][t] for t in wanted], dtype=np.int64))
+    spy    = w["spy"]
+    metrics = (compute_packed(wanted, p, spy["daily_rets"], red_day_avg(spy["daily_rets"]),
+                              w["anchors"]) if wanted else {})
+    raws = _records(p, wanted)
+    recs = [score_theme(th, metrics, spy, build_spark5(th[5], raws), raws, verbose=False)
+            for th in themes]
+    return recs, metrics
+
+def _shards(themes, n):
+    """Contiguous theme runs of roughly equal constituent counts (order preserved)."""
+    target = sum(len(th[5]) for th in themes) / max(n, 1)
+    out, cur, size = [], [], 0
+    for th in themes:
+        cur.append(th)
+        size += len(th[5])
+        if size >= target and len(out) < n - 1:
+            out.append(cur)
+            cur, size = [], 0
+    return out + ([cur] if cur else [])
+
+def score_parallel(themes, cache, spy, anchors, procs):
+    """(theme records in `themes` order, {ticker: metrics}) — identical to
+    score_theme() over compute_universe() in one process."""
+    shm, desc = pack_shared(cache, list(dict.fromkeys(t for th in themes for t in th[5])))
+    try:
+        with ProcessPoolExecutor(max_workers=procs, initializer=_init_worker,
+                                 initargs=(desc, spy, anchors)) as pool:
+            results = list(pool.map(_score_shard, _shards(themes, procs * SHARDS_PER_PROC)))
+    finally:
+        shm.close()
+        shm.unlink()
+    recs, metrics = [], {}
+    for r, m in results:
+        recs.extend(r)
+        metrics.update(m)
+    return recs, metrics
@@ -0,0 +1,142 @@
+"""Compact per-ticker records: typed bar buffers and __slots__ metric rows."""
+
+import numpy as np
+
+from .metrics import TIMEFRAMES
+
+# ── Bars ──────────────────────────────────────────────────────────────────────
+# A parsed chart is five Python lists of boxed numbers with None holes — about
+# 32-36 bytes a value, kept alive in the cache for the whole run. Bars keeps
+# the same record in three buffers: uint32 timestamps, one float64 block with a
+# row per bar column (holes are NaN) and a packed validity bitmask per column,
+# so a bar costs ~37 bytes instead of ~180. It answers the dict interface the
+# metric code uses (raw["closes"] → list with None holes, raw.get("stale")), but
+# that rebuilds the whole column: pipeline code reads the buffers (array(),
+# tail(), close_on()) and the vectorized engine concatenates them directly.
+BAR_COLUMNS = ("closes", "highs", "lows", "vols")
+_COLUMN     = {k: i for i, k in enumerate(BAR_COLUMNS)}
+
+class Bars:
+    __slots__ = ("ts", "values", "valid", "present", "price", "prev_close", "stale")
+
+    def __init__(self, ts, values, valid, present, price, prev_close, stale=False):
+        self.ts         = ts          # uint32[n] unix seconds (good until 2106)
+        self.values     = values      # float64[4, n], NaN where a value is missing
+        self.valid      = valid       # uint8[4, ceil(n/8)] — np.packbits of the valid cells
+        self.present    = present     # bit i set: column i was supplied (else [] on access)
+        self.price      = price
+        self.prev_close = prev_close
+        self.stale      = stale
+
+    @classmethod
+    def from_lists(cls, bars, price, prev_close, stale=False):
+        """From a {"ts", "closes", "highs", "lows", "vols"} dict of lists."""
+        n      = len(bars["ts"])
+        values = np.full((len(BAR_COLUMNS), n), np.nan)
+        present = 0
+        for i, k in enumerate(BAR_COLUMNS):
+            col = bars.get(k) or ()
+            if col:
+                present |= 1 << i
+                m = min(len(col), n)
+                values[i, :m] = np.array(col[:m], dtype=float)
+        return cls(np.array(bars["ts"], dtype=np.uint32), values,
+                   np.packbits(~np.isnan(values), axis=1), present, price, prev_close, stale)
+
+    def __len__(self):
+        return len(self.ts)
+
+    def __bool__(self):               # a record is truthy like the dict it replaces
+        return True
+
+    def mask(self, key):
+        """Validity of each bar of one column (bool[n])."""
+        return np.unpackbits(self.valid[_COLUMN[key]], count=len(self.ts)).astype(bool)
+
+    def array(self, key):
+        """One column as float64 with NaN holes (a view, don't modify)."""
+        return self.values[_COLUMN[key]]
+
+    def last_valid(self, key, k):
+        """Indices of the last `k` valid bars of one column (fewer if there
+        aren't k), found by scanning a growing window back from the end."""
+        col, n = self.values[_COLUMN[key]], len(self.ts)
+        w = min(n, 2 * k)
+        while True:
+            idx = np.flatnonzero(~np.isnan(col[n - w:])) + (n - w)
+            if len(idx) >= k or w == n:
+                return idx[max(len(idx) - k, 0):]
+            w = min(n, 4 * w)
+
+    def tail(self, key, k):
+        """The last `k` valid values of one column (fewer if there aren't k)."""
+        return self.values[_COLUMN[key], self.last_valid(key, k)].tolist()
+
+    def close_on(self, target):
+        """Last valid close at or before unix time `target` (a bisect), or None."""
+        i = int(np.searchsorted(self.ts, target, side="right")) - 1
+        closes = self.values[0]
+        while i >= 0 and closes[i] != closes[i]:
+            i -= 1
+        return float(closes[i]) if i >= 0 else None
+
+    def column(self, key):
+        """One column as the list the scalar code expects: floats and None."""
+        i = _COLUMN[key]
+        if not self.present >> i & 1:
+            return []
+        out = self.values[i].tolist()
+        for j in np.flatnonzero(~self.mask(key)).tolist():
+            out[j] = None
+        return out
+
+    def __getitem__(self, key):
+        if key in _COLUMN:
+            return self.column(key)
+        if key == "ts":
+            return self.ts.tolist()
+        if key in ("price", "prev_close", "stale"):
+            return getattr(self, key)
+        raise KeyError(key)
+
+    def get(self, key, default=None):
+        try:
+            return self[key]
+        except KeyError:
+            return default
+
+    def __repr__(self):
+        return f"<Bars {len(self.ts)} bars price={self.price}{' stale' if self.stale else ''}>"
+
+# ── Per-ticker metrics ────────────────────────────────────────────────────────
+METRIC_KEYS = tuple(f"r{tf}" for tf in TIMEFRAMES) + (
+    "adr_pct", "adv", "brd", "res", "vacc", "adrc", "rst", "prox")
+
+class TickerMetrics:
+    """One ticker's engine output; read like the dict it replaces (m["adv"])."""
+    __slots__ = METRIC_KEYS
+
+    def __init__(self, **values):
+        for k in METRIC_KEYS:
+            setattr(self, k, values.get(k))
+
+    def __getitem__(self, key):
+        try:
+            return getattr(self, key)
+        except (AttributeError, TypeError):
+            raise KeyError(key) from None
+
+    def get(self, key, default=None):
+        return getattr(self, key, default) if key in METRIC_KEYS else default
+
+    def keys(self):
+        return METRIC_KEYS
+
+    def items(self):
+        return [(k, getattr(self, k)) for k in METRIC_KEYS]
+
+    def __eq__(self, other):
+        return dict(self.items()) == (dict(other.items()) if hasattr(other, "items") else other)
+
+    def __repr__(self):
+        return f"TickerMetrics({', '.join(f'{k}={v!r}' for k, v in self.items())})"
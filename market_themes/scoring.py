@@ -0,0 +1,411 @@
+"""Theme aggregation and scoring.
+
+  Composite Score = RetBlend×35% + RSBlend×30% + Resilience×20% + Breadth×15%
+  RetBlend / RSBlend = 1D×20% + 1W×35% + 1M×45%
+  Resilience = avg theme return on SPY red days minus avg SPY return (last 20 sessions)
+  Breadth    = % of constituents above 20-day MA (0–10 scale)
+  ADR weight = 1/ADR% so high-vol small caps don't dominate the signal
+"""
+
+import threading
+
+from .cohesion import compute_cohesion, cohesion_fields
+from .engine import compute_universe
+from .fetcher import prefetch_history, prefetch_intraday, universe_of, _hard_failures
+from .metrics import (TIMEFRAMES, SPY_KEYS, LONG_TIMEFRAMES, wavg, avg,
+                      reference_times, compute_spy, red_day_avg)
+from .net import FETCH_WORKERS
+from .records import Bars
+from .store import HISTORY_RANGE
+from .themes import THEMES, ticker_index
+
+# ── Process themes ────────────────────────────────────────────────────────────
+ADV_MIN = 10_000_000   # $10M minimum average daily dollar volume
+PARALLEL_MIN_THEMES = 64   # fewer changed themes than this always score in-process
+
+# Score weights — shipped in vectors.json as the dashboard's what-if defaults
+BLEND_WEIGHTS    = {"1D": 0.20, "1W": 0.35, "1M": 0.45}                    # RetBlend / RSBlend
+SCORE_WEIGHTS    = {"ret": 0.35, "rs": 0.30, "res": 0.20, "brd": 0.15}      # composite
+EMERGING_WEIGHTS = {"vacc": 0.35, "adrc": 0.25, "rst": 0.25, "prox": 0.15}
+
+def build_spark5(constituents, cache):
+    """Equal-weight blend of the last 5 daily closes across constituents.
+
+    Each stock is normalized to 100 at day -5 so different price scales don't distort.
+    """
+    spark5 = []
+    valid_close_series = []
+    for ticker in constituents:
+        raw = cache.get(ticker)
+        if raw:
+            cl = (raw.tail("closes", 5) if isinstance(raw, Bars)
+                  else [c for c in raw["closes"] if c is not None])
+            if len(cl) >= 5:
+                valid_close_series.append(cl[-5:])
+    if valid_close_series:
+        for day_idx in range(5):
+            day_vals = []
+            for series in valid_close_series:
+                base = series[0]
+                if base and base > 0:
+                    day_vals.append(series[day_idx] / base * 100)
+            spark5.append(round(sum(day_vals)/len(day_vals), 2) if day_vals else None)
+    return [v for v in spark5 if v is not None]
+
+def score_theme(theme, metrics, spy, spark5, cache, verbose=True):
+    """Aggregate one theme's constituent metrics into its output record."""
+    (tid, name, short, icon, sector, constituents, color) = theme
+    log = print if verbose else (lambda *a, **k: None)
+    log(f"\n{name}")
+
+    all_r1D, all_r1W, all_r1M = [], [], []
+    all_res, all_brd, all_w   = [], [], []
+    all_vacc, all_adrc, all_rst, all_prox = [], [], [], []
+    all_long = {tf: [] for tf in LONG_TIMEFRAMES}      # 3M/6M/1Y — display only
+    stale    = []                                       # scored from last-known-good bars
+
+    for ticker in constituents:
+        m = metrics.get(ticker)
+        if not m:
+            continue
+
+        # Skip if below $10M average daily dollar volume
+        adv = m["adv"]
+        if adv is not None and adv < ADV_MIN:
+            log(f"  {ticker:6s}  SKIP — ADV ${adv/1e6:.1f}M < $10M threshold")
+            continue
+
+        r1D, r1W, r1M = m["r1D"], m["r1W"], m["r1M"]
+        res, brd = m["res"], m["brd"]
+
+        # Emerging metrics
+        vacc, adrc, rst, prox = m["vacc"], m["adrc"], m["rst"], m["prox"]
+
+        adr = m["adr_pct"] or 3.0
+        w   = 1.0 / max(adr, 0.5)
+
+        adv_str = f"${adv/1e6:.0f}M" if adv else "—"
+        log(f"  {ticker:6s}  1D={str(r1D):>7}%  1W={str(r1W):>7}%  1M={str(r1M):>7}%"
+              f"  ADR={adr:.1f}%  ADV={adv_str}")
+
+        all_r1D.append(r1D); all_r1W.append(r1W); all_r1M.append(r1M)
+        all_res.append(res); all_brd.append(brd); all_w.append(w)
+        all_vacc.append(vacc); all_adrc.append(adrc); all_rst.append(rst); all_prox.append(prox)
+        for tf in LONG_TIMEFRAMES:
+            all_long[tf].append(m.get(f"r{tf}"))
+        if (cache.get(ticker) or {}).get("stale"):
+            stale.append(ticker)
+
+    r1D = wavg(all_r1D, all_w)
+    r1W = wavg(all_r1W, all_w)
+    r1M = wavg(all_r1M, all_w)
+
+    resilience = avg([r for r in all_res if r is not None])
+    breadth    = avg([b for b in all_brd if b is not None])
+
+    rs1D = round(r1D - spy["d"], 2) if r1D is not None and spy["d"] is not None else None
+    rs1W = round(r1W - spy["w"], 2) if r1W is not None and spy["w"] is not None else None
+    rs1M = round(r1M - spy["m"], 2) if r1M is not None and spy["m"] is not None else None
+
+    long_ret, long_rs = {}, {}
+    for tf in LONG_TIMEFRAMES:
+        r, s = wavg(all_long[tf], all_w), spy.get(SPY_KEYS[tf])
+        long_ret[f"ret{tf}"] = r
+        long_rs[f"rs{tf}"]   = round(r - s, 2) if r is not None and s is not None else None
+
+    score = None
+    if None not in (r1D, r1W, r1M, rs1D, rs1W, rs1M):
+        b, w = BLEND_WEIGHTS, SCORE_WEIGHTS
+        ret_blend = r1D * b["1D"] + r1W * b["1W"] + r1M * b["1M"]
+        rs_blend  = rs1D * b["1D"] + rs1W * b["1W"] + rs1M * b["1M"]
+        res_score = resilience if resilience is not None else 0
+        brd_score = (breadth * 10) if breadth is not None else 5
+        # Score = RetBlend×35% + RSBlend×30% + Resilience×20% + Breadth×15%
+        # MA crossover removed — fully data-driven, no manual inputs
+        score = round(
+            ret_blend  * w["ret"] +
+            rs_blend   * w["rs"] +
+            res_score  * w["res"] +
+            brd_score  * w["brd"],
+            1
+        )
+
+    breadth_display = round(breadth * 10, 1) if breadth is not None else None
+
+    # ── Emerging Score ────────────────────────────────────────────────────────
+    # Designed to catch themes BEFORE the big move
+    # Vol Accumulation×35% + ADR Contraction×25% + RS Trend×25% + Proximity×15%
+    vacc_avg = avg([v for v in all_vacc if v is not None])
+    adrc_avg = avg([v for v in all_adrc if v is not None])
+    rst_avg  = avg([v for v in all_rst  if v is not None])
+    prox_avg = avg([v for v in all_prox if v is not None])
+
+    emerging = None
+    if any(v is not None for v in [vacc_avg, adrc_avg, rst_avg, prox_avg]):
+        # Normalize each component to 0-10 scale
+        # Vol Accum: 1.0=neutral(5), 2.0=strong accum(10), 0.5=distrib(0)
+        v_norm = min(max((vacc_avg - 0.5) / 1.5 * 10, 0), 10) if vacc_avg else 5.0
+        # ADR Contraction: 1.0=no change(5), 2.0=tight(10), 0.5=expanding(0)
+        a_norm = min(max((adrc_avg - 0.5) / 1.5 * 10, 0), 10) if adrc_avg else 5.0
+        # RS Trend: slope, +0.5/session = strong(10), -0.5/session = weak(0)
+        r_norm = min(max((rst_avg + 0.5) / 1.0 * 10, 0), 10) if rst_avg is not None else 5.0
+        # Proximity: already 0-1, scale to 0-10
+        p_norm = (prox_avg * 10) if prox_avg is not None else 5.0
+
+        w = EMERGING_WEIGHTS
+        emerging = round(
+            v_norm * w["vacc"] +
+            a_norm * w["adrc"] +
+            r_norm * w["rst"] +
+            p_norm * w["prox"],
+            1
+        )
+
+    n = sum(1 for r in all_r1M if r is not None)
+    log(f"  → score={score}  emerging={emerging}  vacc={vacc_avg}  adrc={adrc_avg}  rst={rst_avg}  (n={n})")
+
+    # Blended display price: simple avg of constituent current prices (for reference only)
+    constituent_prices = [cache[t]["price"] for t in constituents
+                         if t in cache and cache[t] and cache[t].get("price")]
+    blended_price = round(sum(constituent_prices)/len(constituent_prices), 2) if constituent_prices else None
+
+    return {
+        "id": tid, "name": name, "short": short, "icon": icon,
+        "sector": sector, "stocks": constituents,
+        "color": color, "price": blended_price,
+        "ret1D": r1D, "ret1W": r1W, "ret1M": r1M, **long_ret,
+        "rs1D": rs1D, "rs1W": rs1W, "rs1M": rs1M, **long_rs,
+        "resilience": resilience,
+        "breadth": breadth_display,
+        "score": score,
+        "emerging": emerging,
+        "vol_accum": round(vacc_avg, 2) if vacc_avg else None,
+        "adr_contraction": round(adrc_avg, 2) if adrc_avg else None,
+        "rs_trend": round(rst_avg, 3) if rst_avg is not None else None,
+        "spark5": spark5,
+        "n_stocks": n,
+        "stale": stale,
+    }
+
+# ── Sort & write ──────────────────────────────────────────────────────────────
+def build_output(results, spy, now, mode="daily", cohesion=None):
+    if cohesion is not None:
+        for r in results:
+            r.update(cohesion_fields(cohesion, "themes", r["id"]))
+    results = sorted(results, key=lambda x: x["score"] if x["score"] is not None else -999,
+                     reverse=True)
+    return {
+        "updated":     now.strftime("%Y-%m-%d %H:%M UTC"),
+        "mode":        mode,
+        "methodology": "Pure constituent scoring · No ETF proxy · ADR-weighted · RetBlend×35%+RSBlend×30%+Resilience×20%+Breadth×15%",
+        "spy":         {k: spy.get(k) for k in SPY_KEYS.values()},
+        "themes":      results,
+    }
+
+# ── Per-constituent detail (lazy-loaded by the dashboard) ─────────────────────
+DETAIL_KEYS = tuple(f"r{tf}" for tf in TIMEFRAMES) + (
+    "adr_pct", "brd", "res", "vacc", "adrc", "rst", "prox")
+
+def build_details(themes, metrics, cache, cohesion=None):
+    """{theme id: {"id", "constituents": [per-ticker metrics]}}; with
+    compute_cohesion() output each row also gets theme_corr / peers."""
+    details = {}
+    for (tid, _, _, _, _, constituents, _) in themes:
+        rows = []
+        for ticker in constituents:
+            m, raw = metrics.get(ticker), cache.get(ticker)
+            row = {"ticker": ticker, "price": raw["price"] if raw else None,
+                   "stale": bool(raw and raw.get("stale"))}
+            if m:
+                row.update({k: m[k] for k in DETAIL_KEYS})
+                row["adv"]  = round(m["adv"]) if m["adv"] is not None else None
+                row["skip"] = m["adv"] is not None and m["adv"] < ADV_MIN
+            if cohesion is not None:
+                row.update(cohesion_fields(cohesion, "constituents", (tid, ticker)))
+            rows.append(row)
+        details[tid] = {"id": tid, "constituents": rows}
+    return details
+
+# ── What-if vectors (every theme's scored constituents, for the dashboard) ──
+# The inputs score_theme() aggregates, per theme in published order: one column
+# per VECTOR_FIELDS entry over the constituents it scored (metrics present, ADV
+# at or above the floor), in constituent order so sums run in the same order.
+# The ADR weight is shipped as adr_pct (w = 1 / max(adr or 3, 0.5)). With the
+# default weights the dashboard's rescoring reproduces score and emerging.
+VECTOR_FIELDS = ("r1D", "r1W", "r1M", "res", "brd", "vacc", "adrc", "rst", "prox", "adr_pct")
+
+def build_vectors(output, details):
+    themes = {}
+    for t in output["themes"]:
+        rows = [r for r in details.get(t["id"], {}).get("constituents", ())
+                if "r1D" in r and not r["skip"]]
+        themes[t["id"]] = [[r[k] for r in rows] for k in VECTOR_FIELDS]
+    return {
+        "updated": output["updated"],
+        "spy":     {k: output["spy"].get(k) for k in ("d", "w", "m")},
+        "weights": {"blend": BLEND_WEIGHTS, "score": SCORE_WEIGHTS, "emerging": EMERGING_WEIGHTS},
+        "fields":  list(VECTOR_FIELDS),
+        "themes":  themes,
+    }
+
+# ── Lazy scorer ───────────────────────────────────────────────────────────────
+class ThemeScorer:
+    """Scores themes on demand over one in-memory set of ticker records.
+
+    load() fills the records once (network + bar store). Per-ticker metrics and
+    theme records are computed the first time they are asked for and memoized
+    until a record they depend on changes through update() / invalidate():
+
+        scorer = ThemeScorer().load()
+        scorer.theme("ai")["score"]       # scores one theme's constituents only
+        scorer.output()                   # the document the CLI publishes
+
+    A SPY change invalidates everything (red days, RS and anchors depend on it);
+    set_themes() rescores only the themes whose definitions changed. Cohesion
+    correlates the whole universe, so any change recomputes it.
+    """
+    def __init__(self, themes=THEMES, cache=None, now=None, verbose=False, procs=0):
+        self.verbose = verbose
+        self.procs   = procs            # >1: score() shards big rescoring jobs over processes
+        self.cache   = {} if cache is None else cache
+        self.lock    = threading.RLock()
+        self.by_id, self._spy, self._metrics, self._scores = {}, None, {}, {}
+        self._cohesion = None
+        self.set_themes(themes)
+        self.set_time(now)
+
+    def set_themes(self, themes):
+        """Swap in a new theme set; returns the ids added, edited or removed.
+        Unchanged themes keep their scores and per-ticker metrics are kept
+        (they don't depend on membership) — load() any new tickers."""
+        with self.lock:
+            themes  = list(themes)
+            by_id   = {th[0]: th for th in themes}
+            changed = {tid for tid in self.by_id.keys() | by_id.keys()
+                       if self.by_id.get(tid) != by_id.get(tid)}
+            self.themes, self.by_id = themes, by_id
+            self.themes_of = ticker_index(themes)
+            self.universe  = universe_of(themes)
+            for tid in changed:
+                self._scores.pop(tid, None)
+            if changed:
+                self._cohesion = None
+            return changed
+
+    def set_time(self, now=None):
+        """Re-anchor lookbacks (e.g. a long-running process crossing midnight)."""
+        with self.lock:
+            self.now, self.anchors = reference_times(now)
+            self.invalidate()
+
+    # ── data ──────────────────────────────────────────────────────────────────
+    def load(self, tickers=None, intraday=False, period=HISTORY_RANGE,
+             workers=FETCH_WORKERS, force=False, state=None):
+        """Fetch records for `tickers` (default: the universe) into the cache.
+        With a UniverseState, known-dead symbols are skipped and known-illiquid
+        ones quoted instead of downloaded; call record(state) after scoring."""
+        tickers = self.universe if tickers is None else tickers
+        with self.lock:
+            if force:
+                for t in tickers:
+                    self.cache.pop(t, None)
+            todo = tickers
+            if state is not None:
+                todo, quote, skip = state.screen([t for t in dict.fromkeys(tickers)
+                                                  if t not in self.cache], ADV_MIN, intraday)
+                for t in skip:
+                    self.cache[t] = None
+                if quote:
+                    prefetch_intraday(quote, period, workers, cache=self.cache)
+            if intraday:
+                prefetch_intraday(todo, period, workers, cache=self.cache)
+            else:
+                prefetch_history(todo, period, workers, cache=self.cache)
+            self.invalidate(tickers)
+        return self
+
+    def record(self, state):
+        """Fold this load's full fetches (ADV, hard failures) into `state`."""
+        with self.lock:
+            state.record(self.cache, self.metrics(), _hard_failures)
+
+    def update(self, ticker, raw):
+        with self.lock:
+            self.cache[ticker] = raw
+            self.invalidate([ticker])
+
+    def invalidate(self, tickers=None):
+        """Drop memoized results that depend on `tickers` (None = everything)."""
+        with self.lock:
+            self._cohesion = None
+            if tickers is None or "SPY" in tickers:
+                self._spy, self._metrics, self._scores = None, {}, {}
+                return
+            for t in tickers:
+                self._metrics.pop(t, None)
+                for tid in self.themes_of.get(t, ()):
+                    self._scores.pop(tid, None)
+
+    # ── lazy results ──────────────────────────────────────────────────────────
+    @property
+    def spy(self):
+        with self.lock:
+            if self._spy is None:
+                self._spy = compute_spy(self.cache.get("SPY"), self.anchors, self.verbose)
+            return self._spy
+
+    def metrics(self, tickers=None):
+        """{ticker: metrics} — computed in one engine pass for whatever is missing."""
+        tickers = self.universe if tickers is None else tickers
+        with self.lock:
+            missing = [t for t in dict.fromkeys(tickers)
+                       if t not in self._metrics and self.cache.get(t)]
+            if missing:
+                spy = self.spy
+                self._metrics.update(compute_universe(
+                    {t: self.cache[t] for t in missing}, spy["daily_rets"],
+                    red_day_avg(spy["daily_rets"]),
+                    {f"r{tf}": ts for tf, ts in self.anchors.items()}))
+            return {t: self._metrics[t] for t in tickers if t in self._metrics}
+
+    def theme(self, theme_id):
+        """One theme's output record (memoized; treat as read-only)."""
+        with self.lock:
+            rec = self._scores.get(theme_id)
+            if rec is None:
+                th  = self.by_id[theme_id]
+                rec = self._scores[theme_id] = score_theme(
+                    th, self.metrics(th[5]), self.spy, build_spark5(th[5], self.cache),
+                    self.cache, self.verbose)
+            return rec
+
+    def scores(self):
+        """Every theme record, in theme order (one engine pass for the universe)."""
+        with self.lock:
+            todo = [th for th in self.themes if th[0] not in self._scores]
+            if self.procs > 1 and len(todo) >= PARALLEL_MIN_THEMES:
+                self._score_parallel(todo)
+            else:
+                self.metrics()
+            return [self.theme(th[0]) for th in self.themes]
+
+    def cohesion(self):
+        """compute_cohesion() over the current themes and records (memoized)."""
+        with self.lock:
+            if self._cohesion is None:
+                self._cohesion = compute_cohesion(self.themes, self.cache)
+            return self._cohesion
+
+    def _score_parallel(self, themes):
+        from .parallel import score_parallel      # imports this module
+        recs, metrics = score_parallel(themes, self.cache, self.spy, self.anchors, self.procs)
+        for t, m in metrics.items():
+            self._metrics.setdefault(t, m)
+        self._scores.update(zip((th[0] for th in themes), recs))
+
+    def output(self, mode="daily"):
+        return build_output([dict(r) for r in self.scores()], self.spy, self.now, mode,
+                            self.cohesion())
+
+    def details(self):
+        return build_details(self.themes, self.metrics(), self.cache, self.cohesion())
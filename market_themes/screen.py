@@ -0,0 +1,68 @@
+"""Pre-screen: skip known-dead symbols and quote known-illiquid ones instead of
+downloading their history."""
+
+import datetime, json, os
+
+SCREEN_PATH        = os.environ.get("SCREEN_PATH", os.path.join("data", "universe_state.json"))
+LIQUIDITY_TTL_DAYS = 7    # an ADV measured this recently is trusted for the screen
+DEAD_RECHECK_DAYS  = 7    # known-dead symbols get one real fetch a week
+
+# ── Universe state ────────────────────────────────────────────────────────────
+# {"tickers": {ticker: {"checked": date, "adv": $, "dead": date, "error": str}}}
+# "checked" is the last full fetch. A ticker whose ADV was below the floor at
+# that fetch is served from stored bars + a batched spark quote until the entry
+# expires; one that failed hard (404, empty chart) is skipped until it does.
+class UniverseState:
+    def __init__(self, path=SCREEN_PATH):
+        self.path    = path
+        self.pending = set()      # tickers fully fetched this run, recorded after metrics
+        try:
+            with open(path) as f:
+                self.tickers = json.load(f).get("tickers", {})
+        except (FileNotFoundError, ValueError):
+            self.tickers = {}
+
+    @staticmethod
+    def _age(entry, today):
+        return (today - datetime.date.fromisoformat(entry["checked"])).days
+
+    def screen(self, tickers, adv_min, intraday=False, today=None):
+        """Split `tickers` into (full fetch, quote only, skip)."""
+        today = today or datetime.datetime.utcnow().date()
+        full, quote, skip = [], [], []
+        for t in tickers:
+            e = self.tickers.get(t)
+            if e and e.get("dead") and self._age(e, today) < DEAD_RECHECK_DAYS:
+                skip.append(t)
+            elif (e and e.get("adv") is not None and e["adv"] < adv_min
+                  and self._age(e, today) < LIQUIDITY_TTL_DAYS):
+                quote.append(t)
+            else:
+                full.append(t)
+        if intraday:                # everything is quoted; only the dead list applies
+            full, quote = full + quote, []
+        self.pending = set() if intraday else set(full)
+        if quote or skip:
+            print(f"Screen: {len(full)} full · {len(quote)} quote-only (ADV < ${adv_min / 1e6:g}M)"
+                  f" · {len(skip)} known dead skipped")
+        return full, quote, skip
+
+    def record(self, cache, metrics, hard_failures, today=None):
+        """Fold this run's full fetches into the state: ADV for live tickers,
+        dead for hard failures. Stale fallbacks and timeouts change nothing."""
+        day = (today or datetime.datetime.utcnow().date()).isoformat()
+        for t in self.pending:
+            raw = cache.get(t)
+            if raw is None and t in hard_failures:
+                self.tickers[t] = {"checked": day, "dead": day, "error": hard_failures[t]}
+            elif raw and not raw.get("stale"):
+                adv = (metrics.get(t) or {}).get("adv")
+                self.tickers[t] = {"checked": day, "adv": round(adv) if adv is not None else None}
+        self.pending = set()
+
+    def save(self):
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        rows = ",\n".join(f"{json.dumps(t)}:{json.dumps(e, separators=(',', ':'))}"
+                          for t, e in sorted(self.tickers.items()))
+        with open(self.path, "w") as f:
+            f.write('{"tickers":{\n' + rows + "\n}}\n")     # one ticker per line for diffs
@@ -0,0 +1,169 @@
+"""Local JSON service: scores from a warm in-memory ThemeScorer, refreshed in the background."""
+
+import gzip, http.server, os, threading, time, urllib.parse
+
+from .net import _budget
+from .output import _dumps, _digest
+from .scoring import build_vectors
+from .store import HISTORY_RANGE
+
+SERVE_HOST     = os.environ.get("SERVE_HOST", "127.0.0.1")
+SERVE_PORT     = int(os.environ.get("SERVE_PORT", "8000"))
+SERVE_INTERVAL = float(os.environ.get("SERVE_INTERVAL", "300"))   # seconds between refreshes
+GZIP_MIN       = 1024     # smaller bodies go out uncompressed
+
+# ── Snapshot ──────────────────────────────────────────────────────────────────
+# Every response body is encoded (and gzipped) once per refresh. A refresh
+# builds a new Snapshot off to the side and swaps the reference, so readers
+# never wait on the scorer and never see a half-updated set of themes.
+class Snapshot:
+    def __init__(self, output, details):
+        self.built   = time.time()
+        self.updated = output["updated"]
+        self.bodies  = {}
+        self._put("/themes", output)
+        self._put("/vectors", build_vectors(output, details))
+        for t in output["themes"]:
+            d = details.get(t["id"], {})
+            self._put(f"/themes/{t['id']}", {**t, **d})
+            for row in d.get("constituents", ()):
+                self._put(f"/tickers/{row['ticker']}", {**row, "theme": t["id"]})
+
+    def _put(self, path, obj):
+        # the two encodings are different bytes, so each gets its own strong ETag
+        body = _dumps(obj)
+        tag  = _digest(body)
+        gz   = gzip.compress(body, 6) if len(body) >= GZIP_MIN else None
+        self.bodies[path] = (body, f'"{tag}"', gz, f'"{tag}-gz"')
+
+class ThemeService:
+    """Owns the scorer and the current Snapshot; refresh() runs on a timer thread."""
+    def __init__(self, scorer, interval=SERVE_INTERVAL, intraday=False, period=HISTORY_RANGE,
+                 state=None):
+        self.scorer    = scorer
+        self.interval  = interval
+        self.intraday  = intraday
+        self.period    = period
+        self.state     = state       # UniverseState for the pre-screen, or None
+        self.snapshot  = None
+        self.refreshes = 0
+        self.failures  = 0
+        self.last_error = None
+        self._stop     = threading.Event()
+        self._thread   = None
+
+    def refresh(self):
+        t0 = time.monotonic()
+        _budget.reset()
+        self.scorer.set_time()
+        self.scorer.load(intraday=self.intraday, period=self.period,
+                         force=self.snapshot is not None, state=self.state)
+        snap = Snapshot(self.scorer.output("intraday" if self.intraday else "daily"),
+                        self.scorer.details())
+        self.snapshot = snap
+        if self.state is not None:
+            self.scorer.record(self.state)
+            self.state.save()
+        self.refreshes += 1
+        print(f"Refreshed {len(snap.bodies)} resources in {time.monotonic() - t0:.1f}s"
+              f"  (data as of {snap.updated})")
+
+    def _loop(self):
+        while not self._stop.wait(self.interval):
+            try:
+                self.refresh()
+            except Exception as e:       # keep serving the last good snapshot
+                self.failures, self.last_error = self.failures + 1, repr(e)
+                print(f"  refresh failed: {e!r} — serving snapshot from {self.snapshot.updated}")
+
+    def start(self):
+        self._thread = threading.Thread(target=self._loop, name="refresh", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+
+    def health(self):
+        snap = self.snapshot
+        return {"ok": snap is not None, "updated": snap and snap.updated,
+                "age_s": snap and round(time.time() - snap.built, 1),
+                "refreshes": self.refreshes, "failures": self.failures,
+                "last_error": self.last_error, "interval_s": self.interval,
+                "mode": "intraday" if self.intraday else "daily"}
+
+# ── HTTP ──────────────────────────────────────────────────────────────────────
+def _matches(if_none_match, etag):
+    """If-None-Match against our ETag: "*" or any listed tag (weak or strong)."""
+    if not if_none_match:
+        return False
+    tags = [t.strip() for t in if_none_match.split(",")]
+    return "*" in tags or any(t.removeprefix("W/") == etag for t in tags)
+
+class Handler(http.server.BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"      # keep-alive for pollers
+    server_version   = "market-themes"
+    disable_nagle_algorithm = True     # headers and body are separate writes
+
+    def do_GET(self):
+        path = urllib.parse.urlsplit(self.path).path.rstrip("/") or "/"
+        service = self.server.service
+        if path == "/health":
+            return self._send(200, _dumps(service.health()))
+        snap = service.snapshot
+        if snap is None:
+            return self._send(503, _dumps({"error": "warming up"}), {"Retry-After": "5"})
+        if path.startswith("/tickers/"):
+            path = "/tickers/" + urllib.parse.unquote(path[9:]).upper()
+        hit = snap.bodies.get(path)
+        if hit is None:
+            return self._send(404, _dumps({"error": f"no such resource: {path}"}))
+        body, etag, gz, gz_etag = hit
+        gzipped = gz is not None and "gzip" in self.headers.get("Accept-Encoding", "")
+        if gzipped:
+            body, etag = gz, gz_etag
+        headers = {"ETag": etag, "Cache-Control": "no-cache", "Vary": "Accept-Encoding"}
+        if _matches(self.headers.get("If-None-Match"), etag):
+            return self._send(304, None, headers)
+        if gzipped:
+            headers["Content-Encoding"] = "gzip"
+        self._send(200, body, headers)
+
+    def do_OPTIONS(self):                # CORS preflight from a page on another origin
+        self._send(204, None, {"Access-Control-Allow-Methods": "GET",
+                              "Access-Control-Allow-Headers": "If-None-Match",
+                              "Access-Control-Max-Age": "86400"})
+
+    def _send(self, code, body, headers=None):
+        """Send a response; `body` None (204, 304) sends no entity headers."""
+        self.send_response(code)
+        self.send_header("Access-Control-Allow-Origin", "*")
+        self.send_header("Access-Control-Expose-Headers", "ETag")
+        if body is not None:
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+        for k, v in (headers or {}).items():
+            self.send_header(k, v)
+        self.end_headers()
+        if body is not None:
+            self.wfile.write(body)
+
+    def log_message(self, fmt, *args):
+        if self.server.verbose:
+            super().log_message(fmt, *args)
+
+def serve(service, host=SERVE_HOST, port=SERVE_PORT, verbose=False):
+    """Load once, then serve until interrupted while refreshing every `interval` s."""
+    service.refresh()
+    httpd = http.server.ThreadingHTTPServer((host, port), Handler)
+    httpd.daemon_threads = True
+    httpd.service, httpd.verbose = service, verbose
+    service.start()
+    print(f"\nServing on http://{host}:{httpd.server_address[1]}  "
+          f"(/themes, /themes/<id>, /tickers/<symbol>, /vectors, /health; refresh every {service.interval:g}s)")
+    try:
+        httpd.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        service.stop()
+        httpd.server_close()
@@ -0,0 +1,168 @@
+"""NYSE session calendar: rules-based holidays, early closes and DST, with
+session ordinals so lookbacks and cross-ticker alignment are array indices."""
+
+import datetime, functools
+
+import numpy as np
+
+CALENDAR_FIRST_YEAR = 2000
+CALENDAR_YEARS_AHEAD = 5
+
+# ── Rules ─────────────────────────────────────────────────────────────────────
+# Shipped with the project and evaluated offline — no exchange feed, no tzdata.
+# Regular close 16:00 ET, early close 13:00 ET; ET is UTC−5, or UTC−4 under US
+# daylight saving time (second Sunday of March → first Sunday of November
+# since 2007; first Sunday of April → last Sunday of October before).
+OPEN_ET, CLOSE_ET, EARLY_CLOSE_ET = (9, 30), (16, 0), (13, 0)
+
+# Unscheduled closures (national days of mourning, weather)
+SPECIAL_CLOSURES = {
+    datetime.date(2001, 9, 11): "September 11",
+    datetime.date(2001, 9, 12): "September 11",
+    datetime.date(2001, 9, 13): "September 11",
+    datetime.date(2001, 9, 14): "September 11",
+    datetime.date(2004, 6, 11): "Reagan day of mourning",
+    datetime.date(2007, 1, 2):  "Ford day of mourning",
+    datetime.date(2012, 10, 29): "Hurricane Sandy",
+    datetime.date(2012, 10, 30): "Hurricane Sandy",
+    datetime.date(2018, 12, 5): "Bush day of mourning",
+    datetime.date(2025, 1, 9):  "Carter day of mourning",
+}
+
+def _nth_weekday(year, month, weekday, n):
+    """The n-th `weekday` (Mon=0) of the month; n=-1 is the last one."""
+    if n > 0:
+        d = datetime.date(year, month, 1)
+        return d + datetime.timedelta(days=(weekday - d.weekday()) % 7 + 7 * (n - 1))
+    d = datetime.date(year + month // 12, month % 12 + 1, 1) - datetime.timedelta(days=1)
+    return d - datetime.timedelta(days=(d.weekday() - weekday) % 7)
+
+def _easter(year):
+    """Western Easter Sunday (anonymous Gregorian algorithm)."""
+    a, b, c = year % 19, year // 100, year % 100
+    d, e = b // 4, b % 4
+    g = (8 * b + 13) // 25
+    h = (19 * a + b - d - g + 15) % 30
+    i, k = c // 4, c % 4
+    l = (32 + 2 * e + 2 * i - h - k) % 7
+    m = (a + 11 * h + 19 * l) // 433
+    month = (h + l - 7 * m + 90) // 25
+    return datetime.date(year, month, (h + l - 7 * m + 33 * month + 19) % 32)
+
+def _observed(d):
+    """Saturday holidays are observed on Friday, Sunday ones on Monday."""
+    if d.weekday() == 5:
+        return d - datetime.timedelta(days=1)
+    if d.weekday() == 6:
+        return d + datetime.timedelta(days=1)
+    return d
+
+def holidays(year):
+    """{date: name} of the full-day NYSE closures in `year`."""
+    out = {}
+    new_year = datetime.date(year, 1, 1)
+    if new_year.weekday() != 5:         # a Saturday New Year's Day isn't made up
+        out[_observed(new_year)] = "New Year's Day"
+    if year >= 1998:
+        out[_nth_weekday(year, 1, 0, 3)] = "Martin Luther King Jr. Day"
+    out[_nth_weekday(year, 2, 0, 3)] = "Washington's Birthday"
+    out[_easter(year) - datetime.timedelta(days=2)] = "Good Friday"
+    out[_nth_weekday(year, 5, 0, -1)] = "Memorial Day"
+    if year >= 2022:
+        out[_observed(datetime.date(year, 6, 19))] = "Juneteenth"
+    out[_observed(datetime.date(year, 7, 4))] = "Independence Day"
+    out[_nth_weekday(year, 9, 0, 1)] = "Labor Day"
+    out[_nth_weekday(year, 11, 3, 4)] = "Thanksgiving Day"
+    out[_observed(datetime.date(year, 12, 25))] = "Christmas Day"
+    out.update({d: n for d, n in SPECIAL_CLOSURES.items() if d.year == year})
+    return out
+
+def early_closes(year):
+    """Sessions that close at 13:00 ET: July 3 and Christmas Eve when they fall
+    Monday–Thursday, and the day after Thanksgiving."""
+    out = {_nth_weekday(year, 11, 3, 4) + datetime.timedelta(days=1)}
+    for d in (datetime.date(year, 7, 3), datetime.date(year, 12, 24)):
+        if d.weekday() < 4:
+            out.add(d)
+    return out
+
+def dst_bounds(year):
+    """(first, last) date of US daylight saving time in `year` (ET = UTC−4)."""
+    if year >= 2007:
+        return _nth_weekday(year, 3, 6, 2), _nth_weekday(year, 11, 6, 1) - datetime.timedelta(days=1)
+    return _nth_weekday(year, 4, 6, 1), _nth_weekday(year, 10, 6, -1) - datetime.timedelta(days=1)
+
+# ── Session calendar ──────────────────────────────────────────────────────────
+# Sessions are numbered 0, 1, 2, … in date order; days are unix days (ts //
+# 86400) of the New York calendar date. One int array over every calendar day
+# maps a day to the last session on or before it, so "last close on or before
+# date" and "N sessions back" are a lookup and a subtraction, not a scan.
+EPOCH = datetime.date(1970, 1, 1)
+
+class SessionCalendar:
+    """NYSE sessions for the years first..last (inclusive)."""
+
+    def __init__(self, first, last):
+        self.first, self.last = first, last
+        self.day0 = (datetime.date(first, 1, 1) - EPOCH).days
+        span  = (datetime.date(last, 12, 31) - EPOCH).days - self.day0 + 1
+        dates = [datetime.date(first, 1, 1) + datetime.timedelta(days=i) for i in range(span)]
+        closed, early, dst = set(), set(), np.zeros(span, dtype=bool)
+        for y in range(first, last + 1):
+            closed |= holidays(y).keys()
+            early  |= early_closes(y)
+            lo, hi = dst_bounds(y)
+            dst[(lo - EPOCH).days - self.day0:(hi - EPOCH).days - self.day0 + 1] = True
+        is_session = np.array([d.weekday() < 5 and d not in closed for d in dates])
+        self.days  = np.flatnonzero(is_session).astype(np.int64) + self.day0
+        self.early = np.array([dates[i] in early for i in np.flatnonzero(is_session)], dtype=bool)
+        offset     = np.where(dst[self.days - self.day0], 4, 5) * 3600
+        self.opens  = self.days * 86400 + OPEN_ET[0] * 3600 + OPEN_ET[1] * 60 + offset
+        close = np.where(self.early, EARLY_CLOSE_ET[0], CLOSE_ET[0]) * 3600
+        self.closes = self.days * 86400 + close + offset
+        self._dst   = dst
+        self._on_or_before = np.cumsum(is_session) - 1     # per day; −1 before the first
+        self._ordinal      = np.where(is_session, self._on_or_before, -1)
+
+    def __len__(self):
+        return len(self.days)
+
+    def day(self, ts):
+        """New York calendar day (unix day number) of each timestamp."""
+        ts  = np.asarray(ts, dtype=np.int64)
+        est = (ts - 5 * 3600) // 86400
+        dst = self._dst[np.clip(est - self.day0, 0, len(self._dst) - 1)]
+        return (ts - np.where(dst, 4, 5) * 3600) // 86400
+
+    def _index(self, day):
+        i = np.asarray(day, dtype=np.int64) - self.day0
+        if np.any(i >= len(self._dst)):
+            raise ValueError(f"date beyond the session calendar ({self.last})")
+        return i
+
+    def on_or_before(self, day):
+        """Ordinal of the last session on or before each day (−1 = none)."""
+        i = self._index(day)
+        return np.where(i >= 0, self._on_or_before[np.maximum(i, 0)], -1)
+
+    def ordinal(self, day):
+        """Ordinal of the session held on each day (−1 = not a session day)."""
+        i = self._index(day)
+        return np.where(i >= 0, self._ordinal[np.maximum(i, 0)], -1)
+
+    def session_index(self, ts):
+        """Ordinals of bar timestamps, −1 for bars off the calendar."""
+        return self.ordinal(self.day(ts))
+
+    def date(self, ordinal):
+        return EPOCH + datetime.timedelta(days=int(self.days[ordinal]))
+
+@functools.lru_cache(maxsize=None)
+def _calendar(last):
+    return SessionCalendar(CALENDAR_FIRST_YEAR, last)
+
+def nyse(year=None):
+    """The shared NYSE calendar, covering at least through `year` (default:
+    CALENDAR_YEARS_AHEAD years past the current one)."""
+    this = datetime.datetime.utcnow().year + CALENDAR_YEARS_AHEAD
+    return _calendar(max(this, year or this))
@@ -0,0 +1,105 @@
+"""Per-run instrumentation: stage timings, fetch counters, memory."""
+
+import contextlib, datetime, threading, time
+from collections import defaultdict
+try:
+    import resource                 # peak RSS; not available on Windows
+except ImportError:
+    resource = None
+
+_local = threading.local()      # .io = counters of the ticker this thread is fetching
+
+# ── Run instrumentation ───────────────────────────────────────────────────────
+# One RunStats per process. Fetch workers report through a thread-local so
+# bytes, requests and retries are attributed to the ticker being fetched;
+# everything also feeds run-wide totals. summary() and per_ticker() make up the
+# data/run_stats.json sidecar; the published documents carry neither, so they
+# only change when the scores do.
+class RunStats:
+    def __init__(self):
+        self.lock    = threading.Lock()
+        self.t0      = time.monotonic()
+        self.started = datetime.datetime.utcnow()
+        self.stages  = {}
+        self.tickers = {}
+        self.totals  = defaultdict(float)
+        self.peak_traced = None
+
+    @contextlib.contextmanager
+    def stage(self, name):
+        t0 = time.monotonic()
+        try:
+            yield
+        finally:
+            self.stages[name] = round(time.monotonic() - t0, 3)
+
+    @contextlib.contextmanager
+    def ticker(self, ticker):
+        with self.batch([ticker]) as io:
+            yield io
+
+    @contextlib.contextmanager
+    def batch(self, tickers):
+        """Attribute the requests made inside to `tickers`. A batched request
+        (spark) serves several symbols: each gets its latency, and its record
+        carries the whole batch's counters with "batch": the symbol count."""
+        io = _local.io = {"requests": 0, "bytes": 0, "retries": 0, "http_s": 0.0, "wait_s": 0.0}
+        t0 = time.monotonic()
+        try:
+            yield io
+        finally:
+            _local.io = None
+            rec = {k: io[k] for k in ("requests", "bytes", "retries")}
+            rec["ms"]      = round((time.monotonic() - t0) * 1000, 1)   # wall, incl. queueing
+            rec["http_ms"] = round(io["http_s"] * 1000, 1)
+            rec["wait_ms"] = round(io["wait_s"] * 1000, 1)
+            if len(tickers) > 1:
+                rec["batch"] = len(tickers)
+            with self.lock:
+                for t in tickers:
+                    self.tickers[t] = rec
+
+    def add(self, **counts):
+        with self.lock:
+            for k, v in counts.items():
+                self.totals[k] += v
+        io = getattr(_local, "io", None)
+        if io is not None:
+            for k, v in counts.items():
+                if k in io:
+                    io[k] += v
+
+    def summary(self, cache, universe):
+        t, lat = self.totals, sorted(io["http_ms"] for io in self.tickers.values())
+        pick = lambda q: lat[min(len(lat) - 1, int(q * len(lat)))] if lat else None
+        raws = [cache.get(k) for k in universe]
+        peak = (resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024) if resource else None
+        return {
+            "started":  self.started.strftime("%Y-%m-%dT%H:%M:%SZ"),
+            "total_s":  round(time.monotonic() - self.t0, 3),
+            "stages":   dict(self.stages),
+            "fetch": {
+                "tickers":  len(universe),
+                "ok":       sum(1 for r in raws if r and not r.get("stale")),
+                "stale":    sum(1 for r in raws if r and r.get("stale")),
+                "failed":   sum(1 for r in raws if not r),
+                "requests": int(t["requests"]), "retries": int(t["retries"]),
+                "bytes":    int(t["bytes"]),
+                "http_s":   round(t["http_s"], 3),   # summed across workers
+                "wait_s":   round(t["wait_s"], 3),   # rate-limiter queueing, summed
+                "parse_s":  round(t["parse_s"], 3),
+                "store_s":  round(t["store_s"], 3),
+                "latency_ms": {"p50": pick(0.5), "p90": pick(0.9), "max": lat[-1] if lat else None},
+                "slowest":  sorted(((k, v["http_ms"]) for k, v in self.tickers.items()),
+                                   key=lambda kv: -kv[1])[:5],
+            },
+            "cache":    {"hits": int(t["cache_hits"]), "misses": int(t["cache_misses"])},
+            "peak_rss_mb":    round(peak, 1) if peak else None,
+            "peak_traced_mb": self.peak_traced,
+        }
+
+    def per_ticker(self, cache):
+        status = lambda r: "failed" if not r else "stale" if r.get("stale") else "ok"
+        return {k: {**v, "status": status(cache.get(k))} for k, v in sorted(self.tickers.items())}
+
+_stats = RunStats()
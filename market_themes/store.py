@@ -0,0 +1,64 @@
+"""Persistent per-ticker daily bar store."""
+
+import json, os, threading, time
+
+from .stats import _stats
+
+# ── Bar store: persistent per-ticker daily history under data/bars/ ─────────
+# One small columnar JSON file per ticker. The first run downloads the run's
+# history window; later runs ask only for bars since the last stored session
+# (minus STORE_OVERLAP_DAYS so a revised or still-forming last bar is
+# replaced) and merge them in. Widening the window (e.g. 1y → 2y) triggers
+# one full re-download per ticker.
+BARS_DIR           = os.environ.get("BARS_DIR", os.path.join("data", "bars"))
+HISTORY_RANGE      = os.environ.get("HISTORY_RANGE", "1y")
+HISTORY_DAYS       = {"3mo": 92, "6mo": 183, "1y": 366, "2y": 731, "5y": 1827}
+HISTORY_PAD_DAYS   = 14        # so the 1Y anchor still lands inside a 1y window
+STORE_OVERLAP_DAYS = 5
+BAR_FIELDS         = ("ts", "closes", "highs", "lows", "vols")
+
+def store_cap(period):
+    """Sessions kept per ticker for a history window (≈5 sessions a week)."""
+    return (HISTORY_DAYS[period] + HISTORY_PAD_DAYS) * 5 // 7 + 5
+
+def _bars_path(ticker):
+    return os.path.join(BARS_DIR, ticker.replace("/", "_") + ".json")
+
+def load_bars(ticker):
+    t0 = time.monotonic()
+    try:
+        with open(_bars_path(ticker)) as f:
+            bars = json.load(f)
+    except (OSError, ValueError):
+        return None
+    finally:
+        _stats.add(store_s=time.monotonic() - t0)
+    if not bars.get("ts") or any(len(bars.get(k, ())) != len(bars["ts"]) for k in BAR_FIELDS):
+        return None
+    bars.setdefault("history", "1y")
+    return bars
+
+def save_bars(ticker, bars):
+    os.makedirs(BARS_DIR, exist_ok=True)
+    path = _bars_path(ticker)
+    tmp  = f"{path}.{threading.get_ident()}.tmp"
+    t0   = time.monotonic()
+    with open(tmp, "w") as f:
+        json.dump({"history": bars.get("history", HISTORY_RANGE),
+                   **{k: bars[k] for k in BAR_FIELDS}}, f, separators=(",", ":"))
+    os.replace(tmp, path)
+    _stats.add(store_s=time.monotonic() - t0)
+
+def merge_bars(old, new, period=HISTORY_RANGE):
+    """Stored bars before the first new session + all new bars (new wins on overlap).
+    The store keeps the wider of its own window and `period`, so a 1y run over
+    a 5y store (e.g. after a --backtest --history 5y run) doesn't trim it."""
+    if not new["ts"]:
+        return old
+    cut  = new["ts"][0] // 86400        # UTC day of the first fresh bar
+    keep = 0
+    while keep < len(old["ts"]) and old["ts"][keep] // 86400 < cut:
+        keep += 1
+    period = max(period, old.get("history", period), key=lambda p: HISTORY_DAYS.get(p, 0))
+    cap = store_cap(period)
+    return {"history": period, **{k: (old[k][:keep] + new[k])[-cap:] for k in BAR_FIELDS}}
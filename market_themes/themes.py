@@ -0,0 +1,340 @@
+"""Theme universe: every theme's constituents, one ticker per theme.
+
+The built-in THEMES below can be replaced or extended by a JSON / TOML / YAML
+file (load_themes); every theme set is validated and indexed by ticker once.
+"""
+
+import json, os, re
+
+# ── STOCK ASSIGNMENT RULES ────────────────────────────────────────────────────
+# Each ticker lives in ONE theme only. Assignment is by primary revenue driver.
+# NVDA → ai (biggest AI revenue driver)
+# ARM  → semi (chip IP architecture)
+# MRVL → memory (storage controllers)
+# NET  → cyber (zero-trust + security, not CDN)
+# GOOGL→ cloud (GCP is primary swing driver vs peers)
+# MSFT → cloud (Azure is primary swing driver)
+# AMZN → cloud (AWS is primary swing driver)
+# TSLA → autonomouv (FSD/robo-taxi is primary catalyst now)
+# ETN  → grid (transformers/power mgmt is primary)
+# VRT  → datacntr (data center cooling/power is primary)
+# ISRG → meddevice (surgical robot = medical device)
+# ALB  → battery (lithium = battery input, not mineral)
+# CCJ  → uranium (pure-play miner, not nuclear utility)
+# PLTR → agenticai (AIP platform = agentic enterprise AI)
+# META → arvr (Reality Labs + Quest = XR primary catalyst)
+# WPM  → silver (streaming model, primary metal is silver)
+# GLD  → gold (physical gold ETF)
+# SNOW → aiinfra (data cloud = AI pipeline infra)
+# PATH → robotics (RPA = automation)
+# ONTO → semiequip (process control = equipment)
+# CAT  → machinery (heavy equipment = primary)
+# DE   → machinery (farm/construction equipment)
+# NUE  → steel (largest US steelmaker)
+# GTLB → saas (DevSecOps SaaS platform)
+# FNV  → gold (royalty = gold exposure)
+# PPLT → pgm (physical platinum)
+# PALL → pgm (physical palladium)
+# SLV  → silver (physical silver ETF)
+
+THEMES = [
+  # Format: (id, name, short, icon, sector, constituents, color)
+  # All metrics computed purely from constituent stocks — no ETF proxy
+
+  # ═══════════════════════════════════════════════════════════════════
+  # TECHNOLOGY — AI
+  # ═══════════════════════════════════════════════════════════════════
+  ("ai",        "Artificial Intelligence",     "AI",          "⚡","Technology",
+   ["NVDA","PLTR","AI","MSFT","META","GOOGL"],                   "#00d4ff"),
+
+  ("agenticai", "Agentic AI",                  "Agentic AI",  "🧠","Technology",
+   ["CRM","ORCL","PEGA","GTLB","SOUN","BBAI"],                   "#818cf8"),
+
+  ("edgecomp",  "Edge Computing",              "Edge Compute","🖥","Technology",
+   ["AMBA","QCOM","AKAM","FSLY","OSS","ADI"],                   "#a78bfa"),
+
+  ("aiinfra",   "AI Infrastructure Software",  "AI Infra SW", "🗄","Technology",
+   ["DDOG","MDB","HASHI","NEWR","CFLT","NTNX"],                 "#60a5fa"),
+
+  # ═══════════════════════════════════════════════════════════════════
+  # TECHNOLOGY — SEMICONDUCTORS
+  # ═══════════════════════════════════════════════════════════════════
+  ("semi",      "Semiconductors & Chips",      "Semis",       "💎","Technology",
+   ["AMD","AVGO","ARM","TSM","ASML","LRCX"],                    "#6366f1"),
+
+  ("semiequip", "Semiconductor Equipment",     "Semi Equip",  "🔭","Technology",
+   ["AMAT","KLAC","ONTO","TER","UCTT","MKSI"],                  "#4f46e5"),
+
+  ("memory",    "Memory & Data Storage",       "Memory",      "💾","Memory & Storage",
+   ["SNDK","WDC","STX","MU","MRVL","NTAP"],                    "#38bdf8"),
+
+  ("fiber",     "Fiber Optics & Optical Net.", "Fiber Optics","🔆","Fiber Optics",
+   ["AAOI","LITE","COHR","CIEN","VIAV","FNSR"],                 "#bbf7d0"),
+
+  ("datacntr",  "Data Centers & Infra",        "DataCtrs",    "🏭","Technology",
+   ["EQIX","DLR","SMCI","VRT","DELL","NXDT"],                  "#fca5a5"),
+
+  # ═══════════════════════════════════════════════════════════════════
+  # TECHNOLOGY — SOFTWARE
+  # ═══════════════════════════════════════════════════════════════════
+  ("cloud",     "Cloud Computing",             "Cloud",       "☁","Technology",
+   ["AMZN","DOCN","SNOW","WDAY","PSTG","ESTC"],                "#93c5fd"),
+
+  ("cyber",     "Cybersecurity",               "Cyber",       "🔐","Technology",
+   ["CRWD","PANW","FTNT","S","OKTA","ZS"],                     "#22d3ee"),
+
+  ("quantum",   "Quantum Computing",           "Quantum",     "⚛","Technology",
+   ["IONQ","RGTI","QUBT","QBTS","HON","IBM"],                  "#e879f9"),
+
+  ("robotics",  "Robotics & Automation",       "Robots",      "🤖","Technology",
+   ["ISRG","ROK","PATH","BRZE","KUKA","FANUC"],                "#c084fc"),
+
+  ("saas",      "Software as a Service",       "SaaS",        "🧩","Technology",
+   ["NOW","HUBS","BILL","INTU","VEEV","ZM"],                   "#6ee7b7"),
+
+  ("cdn",       "CDN & Edge Delivery",         "CDN/Edge",    "🌐","Technology",
+   ["EGIO","FFIV","ZAYO","LUMN","CCOI","ATNI"],                "#67e8f9"),
+
+  ("iot",       "Internet of Things",          "IoT",         "📡","Technology",
+   ["TXN","SWKS","SLAB","SMTC","MCHP","NXPI"],                "#7dd3fc"),
+
+  ("print3d",   "3D Printing",                 "3D Print",    "🖨","Technology",
+   ["DDD","SSYS","XMTR","MTLS","MKFG","NNDM"],                "#7c3aed"),
+
+  # ═══════════════════════════════════════════════════════════════════
+  # TECHNOLOGY — CONSUMER
+  # ═══════════════════════════════════════════════════════════════════
+  ("arvr",      "AR / VR & Spatial Computing", "AR/VR",       "🥽","Consumer Tech",
+   ["RBLX","SNAP","IMMR","UNITY","U","AAPL"],                  "#f472b6"),
+
+  ("autonomouv","Autonomous Vehicles",          "Auto Vehicles","🚗","Consumer Tech",
+   ["TSLA","MBLY","LAZR","OUST","APTV","MOBILEYE"],            "#34d399"),
+
+  # ═══════════════════════════════════════════════════════════════════
+  # HEALTHCARE
+  # ═══════════════════════════════════════════════════════════════════
+  ("aidrug",    "AI Drug Discovery",           "AI Drug",     "🧬","Healthcare",
+   ["RXRX","SDGR","ABCL","EXAI","INSM","CRVS"],               "#10b981"),
+
+  ("meddevice", "Medical Devices",             "Med Devices", "🏥","Healthcare",
+   ["EW","SYK","INSP","TNDM","NVCR","ALGN"],                  "#3b82f6"),
+
+  ("glp1",      "GLP-1 & Obesity Drugs",       "GLP-1",       "💊","Healthcare",
+   ["NVO","LLY","VKTX","HIMS","AMGN","ZFOX"],                 "#8b5cf6"),
+
+  # ═══════════════════════════════════════════════════════════════════
+  # FINTECH
+  # ═══════════════════════════════════════════════════════════════════
+  ("fintech",   "Digital Payments & Fintech",  "Fintech",     "💳","Fintech",
+   ["SQ","AFRM","SOFI","NU","UPST","HOOD"],                   "#f97316"),
+
+  # ═══════════════════════════════════════════════════════════════════
+  # ENERGY
+  # ═══════════════════════════════════════════════════════════════════
+  ("nuclear",   "Nuclear Energy",              "Nuclear",     "☢","Energy",
+   ["CEG","VST","TLN","BWXT","SMR","ETR"],                    "#fde68a"),
+
+  ("uranium",   "Uranium Mining",              "Uranium",     "🪨","Energy",
+   ["CCJ","NXE","DNN","UUUU","URG","UEC"],                    "#f59e0b"),
+
+  ("grid",      "Power Grid Modernization",    "Grid",        "🔌","Energy",
+   ["ETN","EMR","HUBB","PWR","GEV","AMPS"],                   "#86efac"),
+
+  ("solar",     "Solar Energy",                "Solar",       "☀","Energy",
+   ["ENPH","FSLR","SEDG","ARRY","CSIQ","MAXN"],               "#fbbf24"),
+
+  ("clean",     "Wind & Renewable Energy",     "Wind/Renew",  "🌱","Energy",
+   ["NEE","BEP","AES","CWEN","RUN","NOVA"],                   "#4ade80"),
+
+  ("battery",   "Battery Technology",          "Battery",     "🔋","Energy",
+   ["ALB","QS","LTHM","ENVX","FLNC","STEM"],                   "#34d399"),
+
+  ("lng",       "LNG Export & Natural Gas",    "LNG",         "🔥","Energy",
+   ["LNG","CQP","NFE","GLNG","AR","KNTK"],                    "#fb923c"),
+
+  ("oilgas",    "Traditional Oil & Gas",       "Oil & Gas",   "🛢","Energy",
+   ["XOM","CVX","COP","SLB","EOG","MPC"],                     "#d97706"),
+
+  # ═══════════════════════════════════════════════════════════════════
+  # MATERIALS
+  # ═══════════════════════════════════════════════════════════════════
+  ("minerals",  "Critical Minerals",           "Minerals",    "⛏","Materials",
+   ["FCX","MP","VALE","RIO","SCCO","HBM"],                    "#fb923c"),
+
+  ("steel",     "Steel & Aluminum",            "Steel/Al",    "🏗","Materials",
+   ["NUE","STLD","CLF","CMC","AA","CENX"],                    "#78716c"),
+
+  ("agri",      "Agriculture & Fertilizers",   "Agriculture", "🌾","Materials",
+   ["MOS","NTR","CF","ICL","CTVA","SQM"],                    "#65a30d"),
+
+  # ═══════════════════════════════════════════════════════════════════
+  # PRECIOUS METALS
+  # ═══════════════════════════════════════════════════════════════════
+  ("gold",      "Gold & Gold Miners",          "Gold",        "🥇","Precious Metals",
+   ["GLD","NEM","GOLD","AEM","WPM","FNV"],                    "#ffd700"),
+
+  ("silver",    "Silver & Silver Miners",      "Silver",      "🥈","Precious Metals",
+   ["SLV","PAAS","AG","HL","FSM","MAG"],                      "#e2e8f0"),
+
+  ("jrgold",    "Junior Gold Miners",          "Jr. Gold",    "⛏","Precious Metals",
+   ["GDXJ","ORLA","NGD","KGC","IAG","SAND"],                  "#fcd34d"),
+
+  ("pgm",       "Platinum Group Metals",       "PGMs",        "⚗","Precious Metals",
+   ["PPLT","PALL","SBSW","PLZL","PLAT","PAL"],                "#cbd5e1"),
+
+  # ═══════════════════════════════════════════════════════════════════
+  # UTILITIES
+  # ═══════════════════════════════════════════════════════════════════
+  ("water",     "Water Management",            "Water",       "💧","Utilities",
+   ["AWK","XYL","WTRG","PNR","ARTNA","YORW"],                 "#0ea5e9"),
+
+  # ═══════════════════════════════════════════════════════════════════
+  # INDUSTRIALS
+  # ═══════════════════════════════════════════════════════════════════
+  ("defense",   "Defense & Military Tech",     "Defense",     "🛡","Industrials",
+   ["LMT","RTX","NOC","GD","BA","HII"],                       "#ff6b35"),
+
+  ("drones",    "Drones & Autonomous",         "Drones",      "🛸","Industrials",
+   ["ACHR","JOBY","AVAV","KTOS","RCAT","ARK"],                "#f472b6"),
+
+  ("space",     "Space Exploration",           "Space",       "🚀","Industrials",
+   ["ASTS","LUNR","RKLB","PL","SPCE","SATL"],                 "#8b5cf6"),
+
+  ("shipping",  "Shipping & Logistics",        "Shipping",    "🚢","Industrials",
+   ["ZIM","GOGL","SBLK","MATX","STNG","FLNG"],                "#0369a1"),
+
+  ("reshoring", "Supply Chain Reshoring",      "Reshoring",   "🏗","Industrials",
+   ["URI","MLM","VMC","FAST","GWW","BLDR"],                   "#fdba74"),
+
+  ("machinery", "Heavy Machinery & Infra",     "Machinery",   "🔧","Industrials",
+   ["CAT","DE","CMI","PCAR","OSK","TEX"],                     "#94a3b8"),
+]
+
+# ── Ticker → theme index ──────────────────────────────────────────────────────
+def ticker_index(themes):
+    """{ticker: [theme ids]} — built once per theme set, used for duplicate
+    checks, reverse lookups and invalidation."""
+    index = {}
+    for (tid, _, _, _, _, stocks, _) in themes:
+        for s in stocks:
+            index.setdefault(s, []).append(tid)
+    return index
+
+# ── Verify no duplicates ──────────────────────────────────────────────────────
+def check_duplicates(themes, index=None):
+    index = ticker_index(themes) if index is None else index
+    dupes = {s: ts for s, ts in index.items() if len(ts) > 1}
+    if dupes:
+        print(f"⚠ DUPLICATE STOCKS DETECTED:")
+        for s, ts in dupes.items():
+            print(f"  {s} in {ts}")
+    else:
+        print(f"✅ No duplicate stocks across {len(themes)} themes")
+    return dupes
+
+# ── Theme files ───────────────────────────────────────────────────────────────
+# {"builtin": true, "themes": [{"id": "ai", "name": "…", "stocks": [...]}, …]}
+# (or [[themes]] tables in TOML, or a bare list). builtin=true keeps the themes
+# above and lets the file add to them; a file theme with a built-in id
+# replaces it. Only id, name and stocks are required.
+THEMES_FILE  = os.environ.get("THEMES_FILE")
+THEME_FIELDS = ("id", "name", "short", "icon", "sector", "stocks", "color")
+THEME_DEFAULTS = {"icon": "•", "sector": "Custom", "color": "#64748b"}
+_ID_RE    = re.compile(r"^[a-z0-9][a-z0-9_-]{0,47}$")     # ends up in file names and URLs
+_COLOR_RE = re.compile(r"^#(?:[0-9a-fA-F]{3}){1,2}$")
+_TICKER_RE = re.compile(r"^[A-Z0-9^][A-Z0-9.^=-]{0,14}$")  # BRK-B, ^VIX, GC=F, 0700.HK — in URLs and bar file names
+
+class ThemeConfigError(ValueError):
+    """A theme file that can't be read or fails validation (lists every problem)."""
+
+def _read_config(path, error=ThemeConfigError, what="themes"):
+    """Parse a JSON / TOML / YAML file by extension; problems raise `error`."""
+    ext = os.path.splitext(path)[1].lower()
+    with open(path, "rb") as f:
+        body = f.read()
+    if ext == ".json":
+        parse, errors = json.loads, ValueError
+    elif ext == ".toml":
+        try:
+            import tomllib
+        except ImportError:             # Python < 3.11
+            try:
+                import tomli as tomllib
+            except ImportError:
+                raise error(f"{path}: TOML {what} need Python 3.11+ or tomli") from None
+        parse, errors = (lambda b: tomllib.loads(b.decode())), ValueError
+    elif ext in (".yaml", ".yml"):
+        try:
+            import yaml
+        except ImportError:
+            raise error(f"{path}: YAML {what} need PyYAML (pip install pyyaml)") from None
+        parse, errors = yaml.safe_load, (ValueError, yaml.YAMLError)
+    else:
+        raise error(f"{path}: unknown file type {ext!r} (use .json, .toml or .yaml)")
+    try:
+        return parse(body)
+    except errors as e:
+        raise error(f"{path}: {e}") from None
+
+def validate_themes(entries, source="themes"):
+    """Theme dicts → (id, name, short, icon, sector, stocks, color) tuples.
+    Collects every problem before raising ThemeConfigError."""
+    if not isinstance(entries, list):
+        raise ThemeConfigError(f"{source}: expected a list of themes")
+    out, errors, ids = [], [], set()
+    for i, e in enumerate(entries):
+        where = f"{source}[{i}]"
+        if not isinstance(e, dict):
+            errors.append(f"{where}: expected a table/object, got {type(e).__name__}")
+            continue
+        where += f" ({e.get('id')!r})" if "id" in e else ""
+        bad = len(errors)
+        unknown = set(e) - set(THEME_FIELDS)
+        if unknown:
+            errors.append(f"{where}: unknown field(s) {', '.join(sorted(unknown))}")
+        tid, name, stocks = e.get("id"), e.get("name"), e.get("stocks")
+        if not isinstance(tid, str) or not _ID_RE.match(tid):
+            errors.append(f"{where}: id must be 1-48 chars of a-z, 0-9, '-' or '_'")
+        elif tid in ids:
+            errors.append(f"{where}: duplicate id")
+        ids.add(tid)
+        if not isinstance(name, str) or not name.strip():
+            errors.append(f"{where}: name is required")
+        for k in ("short", "icon", "sector", "color"):
+            if k in e and not isinstance(e[k], str):
+                errors.append(f"{where}: {k} must be a string")
+        if isinstance(e.get("color"), str) and not _COLOR_RE.match(e["color"]):
+            errors.append(f"{where}: color must be #rgb or #rrggbb")
+        if (not isinstance(stocks, list) or not stocks
+                or not all(isinstance(s, str) and s.strip() for s in stocks)):
+            errors.append(f"{where}: stocks must be a non-empty list of tickers")
+        else:
+            stocks = [s.strip().upper() for s in stocks]
+            invalid = [s for s in stocks if not _TICKER_RE.match(s)]
+            if invalid:
+                errors.append(f"{where}: invalid ticker(s) {', '.join(map(repr, invalid))}"
+                              " (1-15 chars of A-Z, 0-9, '.', '-', '^' or '=')")
+            if len(set(stocks)) != len(stocks):
+                errors.append(f"{where}: a ticker is listed twice")
+        if len(errors) > bad:
+            continue
+        e = {**THEME_DEFAULTS, "short": name, **e, "stocks": stocks}
+        out.append(tuple(e[k] for k in THEME_FIELDS))
+    if errors:
+        raise ThemeConfigError(f"{len(errors)} problem(s) in {source}:\n  " + "\n  ".join(errors))
+    return out
+
+def load_themes(path):
+    """Validated theme tuples from a JSON / TOML / YAML file."""
+    cfg = _read_config(path)
+    builtin = False
+    if isinstance(cfg, dict):
+        unknown = set(cfg) - {"builtin", "themes"}
+        if unknown:
+            raise ThemeConfigError(f"{path}: unknown top-level key(s) {', '.join(sorted(unknown))}")
+        builtin, cfg = bool(cfg.get("builtin")), cfg.get("themes", [])
+    themes = validate_themes(cfg, path)
+    if not builtin:
+        return themes
+    mine = {th[0] for th in themes}
+    return [th for th in THEMES if th[0] not in mine] + themes
@@ -0,0 +1,256 @@
+"""
+Pipeline benchmark — offline replay of market_themes
+======================================================
+Replays chart JSON fixtures for every ticker in THEMES through a stand-in for
+fetch(), times each pipeline stage and reports throughput and peak memory at
+multiples of the real universe. Nothing touches the network.
+
+  python tools/bench_pipeline.py                          # synthetic fixtures, 1/10/100×
+  python tools/bench_pipeline.py --scale 1,10 --repeat 5
+  python tools/bench_pipeline.py --record fixtures/       # capture from YAHOO_BASE_URL
+  python tools/bench_pipeline.py --fixtures fixtures/
+  python tools/bench_pipeline.py --json new.json --baseline old.json --tolerance 0.25
+  python tools/bench_pipeline.py --scale 20 --procs 4     # process-pool scoring
+
+Stages
+  fetch      fixture JSON decode + per-ticker record build (prefetch, 1 worker)
+  metrics    SPY benchmark + compute_universe()
+  cohesion   compute_cohesion(): blocked return correlations over the universe
+  spark      spark5 blend for every theme
+  themes     per-theme aggregation, scoring and sort
+  serialize  per-constituent details + render_output() (summary, theme files, manifest)
+
+With --procs N the metrics, spark and themes work runs in score_parallel()
+(N processes over shared memory) and is reported under "themes"; every scale
+is also run serially and the two outputs must be identical (exit 1 if not).
+
+Scaled runs clone every theme k times with tickers renamed TICKER~i; clones
+replay their source ticker's fixture, so timings scale with the universe
+while the data stays realistic. With --baseline the run exits 1 if any
+stage's total grows by more than --tolerance.
+"""
+
+import argparse, contextlib, json, os, resource, sys, time, tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+import market_themes as F
+from market_themes.net import YAHOO_BASE
+from market_themes.parallel import score_parallel
+from market_themes.store import HISTORY_PAD_DAYS
+import mock_yahoo
+
+STAGES = ("fetch", "metrics", "cohesion", "spark", "themes", "serialize")
+
+
+# ── Fixtures ──────────────────────────────────────────────────────────────────
+def base_ticker(ticker):
+    return ticker.split("~", 1)[0]
+
+def synthetic_fixtures(tickers, period=F.HISTORY_RANGE):
+    """Fixture bytes from the mock server's generator (None = dead symbol)."""
+    out, now = {}, int(time.time())
+    since = now - (F.HISTORY_DAYS[period] + HISTORY_PAD_DAYS) * 86400
+    for t in tickers:
+        payload = mock_yahoo.chart_payload(t, {"period1": [since], "period2": [now]}, now)
+        out[t] = json.dumps(payload).encode() if payload else None
+    return out
+
+def load_fixtures(path, tickers):
+    out = {}
+    for t in tickers:
+        try:
+            with open(os.path.join(path, f"{t}.json"), "rb") as f:
+                out[t] = f.read()
+        except FileNotFoundError:
+            out[t] = None
+    return out
+
+def record_fixtures(path, tickers, period=F.HISTORY_RANGE):
+    os.makedirs(path, exist_ok=True)
+    ok, now = 0, int(time.time())
+    since = now - (F.HISTORY_DAYS[period] + HISTORY_PAD_DAYS) * 86400
+    for t in tickers:
+        try:
+            body = F.http_get(f"{YAHOO_BASE}/v8/finance/chart/{t}"
+                              f"?period1={since}&period2={now}&interval=1d")
+        except Exception as e:
+            print(f"  skip {t}: {e}")
+            continue
+        with open(os.path.join(path, f"{t}.json"), "wb") as f:
+            f.write(body)
+        ok += 1
+    print(f"Recorded {ok}/{len(tickers)} fixtures into {path}")
+
+def replay_fetcher(fixtures):
+    """Stand-in for fetch(): same parsing path, fixture bytes instead of HTTP."""
+    def fetch(ticker):
+        body = fixtures.get(base_ticker(ticker))
+        if body is None:
+            return None
+        return F.raw_from_bars(*F.parse_chart(json.loads(body)))
+    return fetch
+
+def scaled_themes(themes, k):
+    out = list(themes)
+    for i in range(1, k):
+        out += [(f"{tid}~{i}", name, short, icon, sector, [f"{s}~{i}" for s in stocks], color)
+                for (tid, name, short, icon, sector, stocks, color) in themes]
+    return out
+
+
+# ── One pipeline pass ─────────────────────────────────────────────────────────
+@contextlib.contextmanager
+def _timed(timings, stage):
+    t0 = time.perf_counter()
+    yield
+    timings[stage] = time.perf_counter() - t0
+
+def run_pipeline(themes, fetcher, procs=0, out=None):
+    """Run every stage of the CLI in memory; returns {stage: seconds}."""
+    cache, t = {}, {}
+    with open(os.devnull, "w") as null, contextlib.redirect_stdout(null):
+        now, anchors = F.reference_times()
+        with _timed(t, "fetch"):
+            F.prefetch(F.universe_of(themes), workers=1, fetcher=fetcher, cache=cache)
+        if procs > 1:
+            with _timed(t, "metrics"):
+                spy = F.compute_spy(cache.get("SPY"), anchors)
+            with _timed(t, "cohesion"):
+                cohesion = F.compute_cohesion(themes, cache)
+            t["spark"] = 0.0
+            with _timed(t, "themes"):
+                results, metrics = score_parallel(themes, cache, spy, anchors, procs)
+                output = F.build_output(results, spy, now, cohesion=cohesion)
+        else:
+            with _timed(t, "metrics"):
+                spy     = F.compute_spy(cache.get("SPY"), anchors)
+                metrics = F.compute_universe(cache, spy["daily_rets"],
+                                             F.red_day_avg(spy["daily_rets"]),
+                                             {f"r{tf}": ts for tf, ts in anchors.items()})
+            with _timed(t, "cohesion"):
+                cohesion = F.compute_cohesion(themes, cache)
+            with _timed(t, "spark"):
+                sparks = {th[0]: F.build_spark5(th[5], cache) for th in themes}
+            with _timed(t, "themes"):
+                results = [F.score_theme(th, metrics, spy, sparks[th[0]], cache) for th in themes]
+                output  = F.build_output(results, spy, now, cohesion=cohesion)
+        with _timed(t, "serialize"):
+            files = F.render_output(output, F.build_details(themes, metrics, cache, cohesion))
+    if out is not None:
+        out.update(files)
+    return t
+
+def same_output(themes, fetcher, procs):
+    """Parallel and serial runs publish byte-identical files (timestamps aside)."""
+    files = [{}, {}]
+    run_pipeline(themes, fetcher, 0, files[0])
+    run_pipeline(themes, fetcher, procs, files[1])
+    strip = lambda fs: {p: b for p, b in fs.items() if p not in ("summary.json", "market_data.json", "manifest.json")}
+    summary = [json.loads(fs["summary.json"]) for fs in files]
+    for d in summary:
+        d.pop("updated")
+    return strip(files[0]) == strip(files[1]) and summary[0] == summary[1]
+
+def bench_scale(themes, fixtures, k, repeat, measure_memory, procs=0):
+    scaled  = scaled_themes(themes, k)
+    fetcher = replay_fetcher(fixtures)
+    n_tick  = len(F.universe_of(scaled))
+    runs    = [run_pipeline(scaled, fetcher, procs) for _ in range(repeat)]
+    best    = {s: min(r[s] for r in runs) for s in STAGES}
+    total   = sum(best.values())
+    row = {"scale": k, "tickers": n_tick, "themes": len(scaled),
+           "stages": {s: round(v, 4) for s, v in best.items()},
+           "total": round(total, 4),
+           "tickers_per_s": round(n_tick / total, 1) if total else None}
+    if procs > 1:
+        row["procs"], row["identical"] = procs, same_output(scaled, fetcher, procs)
+    if measure_memory:
+        tracemalloc.start()
+        run_pipeline(scaled, fetcher, procs)
+        row["peak_mb"] = round(tracemalloc.get_traced_memory()[1] / 2**20, 1)
+        tracemalloc.stop()
+    return row
+
+
+# ── Report ────────────────────────────────────────────────────────────────────
+def print_table(rows):
+    hdr = f"{'scale':>5} {'tickers':>8} {'themes':>7}  " + "".join(f"{s:>10}" for s in STAGES)
+    hdr += f"{'total':>10} {'tick/s':>9} {'peak MB':>8}"
+    print(hdr)
+    print("─" * len(hdr))
+    for r in rows:
+        line = f"{r['scale']:>4}× {r['tickers']:>8} {r['themes']:>7}  "
+        line += "".join(f"{r['stages'][s]:>10.3f}" for s in STAGES)
+        line += f"{r['total']:>10.3f} {r['tickers_per_s'] or 0:>9.0f} {r.get('peak_mb', '—'):>8}"
+        print(line)
+
+def compare(rows, baseline, tolerance):
+    """Stages (and totals) slower than baseline × (1 + tolerance)."""
+    base = {r["scale"]: r for r in baseline.get("rows", [])}
+    regressions = []
+    for r in rows:
+        b = base.get(r["scale"])
+        if not b:
+            continue
+        pairs = [(s, r["stages"][s], b["stages"].get(s)) for s in STAGES]
+        pairs.append(("total", r["total"], b.get("total")))
+        for stage, new, old in pairs:
+            # ignore sub-10ms stages — timer noise dominates
+            if old and new > old * (1 + tolerance) and new - old > 0.01:
+                regressions.append(f"{r['scale']}× {stage}: {old:.3f}s → {new:.3f}s "
+                                   f"(+{(new / old - 1) * 100:.0f}%)")
+    return regressions
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Offline benchmark of the market_themes pipeline")
+    ap.add_argument("--scale", default="1,10,100", help="comma-separated universe multiples")
+    ap.add_argument("--repeat", type=int, default=3, help="runs per scale (best is reported)")
+    ap.add_argument("--fixtures", help="directory of recorded <TICKER>.json chart payloads")
+    ap.add_argument("--record", metavar="DIR", help="record fixtures from YAHOO_BASE_URL and exit")
+    ap.add_argument("--no-memory", action="store_true", help="skip the tracemalloc pass")
+    ap.add_argument("--json", metavar="FILE", help="write results as JSON")
+    ap.add_argument("--baseline", metavar="FILE", help="JSON from an earlier run to compare against")
+    ap.add_argument("--tolerance", type=float, default=0.25, help="allowed slowdown vs baseline")
+    ap.add_argument("--procs", type=int, default=0, help="score themes with score_parallel() in N processes")
+    args = ap.parse_args()
+
+    tickers = F.universe_of(F.THEMES)
+    if args.record:
+        record_fixtures(args.record, tickers)
+        return 0
+
+    fixtures = (load_fixtures(args.fixtures, tickers) if args.fixtures
+                else synthetic_fixtures(tickers))
+    print(f"Fixtures: {sum(1 for v in fixtures.values() if v)}/{len(tickers)} tickers "
+          f"({'recorded: ' + args.fixtures if args.fixtures else 'synthetic'})\n")
+
+    rows = [bench_scale(F.THEMES, fixtures, int(k), args.repeat, not args.no_memory, args.procs)
+            for k in args.scale.split(",")]
+    print_table(rows)
+    if args.procs > 1:
+        bad = [r["scale"] for r in rows if not r["identical"]]
+        print(f"\n{'⚠ PARALLEL OUTPUT DIFFERS at ' + ', '.join(f'{k}×' for k in bad) if bad else '✅ Parallel output identical to serial'}"
+              f" ({args.procs} processes, {os.cpu_count()} CPUs)")
+        if bad:
+            return 1
+    print(f"\nmax RSS {resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024:.0f} MB")
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump({"python": sys.version.split()[0], "rows": rows}, f, indent=2)
+    if args.baseline:
+        with open(args.baseline) as f:
+            regressions = compare(rows, json.load(f), args.tolerance)
+        if regressions:
+            print("\n⚠ PERFORMANCE REGRESSIONS vs baseline:")
+            for line in regressions:
+                print(f"  {line}")
+            return 1
+        print(f"\n✅ Within {args.tolerance:.0%} of baseline")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
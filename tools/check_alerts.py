@@ -0,0 +1,174 @@
+"""
+Alert replay: AlertState events against re-evaluating everything
+================================================================
+AlertState only re-tests rules on records whose inputs changed since its saved
+state. This replays --runs runs over the built-in themes, scored on mock bars,
+with 0%, 5% and 50% of the records moving between runs. Along the way the
+ranking is re-sorted, a theme drops out for a run and comes back, and a rule
+is added halfway through. The state file is saved and reloaded between runs,
+as the CLI does. Each run's events must be exactly those a naive
+reference produces by testing every rule on every record against the whole
+previous snapshot; otherwise the run is reported and the script exits 1.
+
+It then times both at --scale times the universe, with 2% and 20% moving.
+
+  python tools/check_alerts.py
+  python tools/check_alerts.py --runs 50 --scale 40
+"""
+
+import argparse, copy, os, random, sys, tempfile, time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+import market_themes as F
+from market_themes.alerts import AlertState, _records, compile_rules
+import mock_yahoo
+from mock_yahoo import with_holes
+
+RULES = [
+    {"id": "score-above-5",    "when": "score crosses above 5"},
+    {"id": "breadth-below-4",  "when": "breadth crosses below 4"},
+    {"id": "emerging-climber", "when": "emerging > 7 and rank falls"},
+    {"id": "top-5",            "when": "rank <= 5"},
+    {"id": "lost-20d-ma",      "scope": "constituent", "when": "brd crosses below 1"},
+    {"id": "hot-stock",        "scope": "constituent", "when": "r1W >= 8 and adr_pct < 6"},
+]
+LATE_RULE = {"id": "cohesive", "when": "cohesion > 0.1"}
+
+
+# ── Reference: every rule, every record, whole previous snapshot ──────────────
+class FullDiff:
+    def __init__(self):
+        self.prev, self.active, self.known = {}, {}, {}
+
+    def evaluate(self, rules, output, details):
+        events, snap = [], {}
+        meta = {"updated": output.get("updated"), "mode": output.get("mode")}
+        recs = list(_records(output, details))
+        for r in rules:
+            sig   = f"{r.scope}: {r.when}"
+            fresh = self.known.get(r.id) != sig
+            if fresh:
+                self.active[r.id] = set()
+            for scope, key, tid, ticker, rec in recs:
+                if scope != r.scope:
+                    continue
+                now  = {f: rec.get(f) for f in r.fields}
+                prev = {f: v for f, v in self.prev.get((scope, key), {}).items() if f in r.fields}
+                hit  = r.test(now, prev)
+                if r.level:
+                    if hit == (key in self.active[r.id]):
+                        continue
+                    (self.active[r.id].add if hit else self.active[r.id].discard)(key)
+                if hit and not fresh:
+                    ev = {**meta, "rule": r.id, "scope": scope, "theme": tid}
+                    if ticker is not None:
+                        ev["ticker"] = ticker
+                    ev.update({"when": r.when, "values": now, "prev": {f: prev.get(f) for f in r.fields}})
+                    events.append(ev)
+            self.known[r.id] = sig
+        for scope, key, _, _, rec in recs:
+            snap[(scope, key)] = dict(rec)
+        self.prev = snap
+        for rid in self.active:
+            scope = next((r.scope for r in rules if r.id == rid), None)
+            self.active[rid] &= {k for s, k in snap if s == scope}
+        return events
+
+
+# ── Run sequence ──────────────────────────────────────────────────────────────
+def scored(themes):
+    tickers = [t for t in F.universe_of(themes) if t not in mock_yahoo.DEAD_SYMBOLS]
+    cache = {}
+    for t in tickers:
+        b = with_holes(t.split("~")[0], mock_yahoo.bars(t.split("~")[0]))
+        cache[t] = F.raw_from_bars({"regularMarketPrice": next(c for c in reversed(b["closes"]) if c)}, b)
+    scorer = F.ThemeScorer(themes, cache=cache)
+    return scorer.output(), scorer.details()
+
+def scaled_themes(themes, k):
+    return [(f"{tid}~{i}", name, short, icon, sector, [f"{s}~{i}" for s in stocks], color)
+            for i in range(k) for (tid, name, short, icon, sector, stocks, color) in themes]
+
+def step(output, details, rng, share):
+    """Move a random share of records, re-sort by score; returns new copies."""
+    output, details = copy.deepcopy(output), copy.deepcopy(details)
+    for t in output["themes"]:
+        if rng.random() < share:
+            t["score"]    = round((t["score"] or 0) + rng.uniform(-1.5, 1.5), 2)
+            t["breadth"]  = round(min(10, max(0, (t["breadth"] or 0) + rng.uniform(-2, 2))), 1)
+            t["emerging"] = round(min(10, max(0, (t["emerging"] or 0) + rng.uniform(-1.5, 1.5))), 1)
+    output["themes"].sort(key=lambda t: t["score"] if t["score"] is not None else -999, reverse=True)
+    for d in details.values():
+        for row in d["constituents"]:
+            if "brd" in row and rng.random() < share:
+                row["brd"] = 1 - (row["brd"] or 0)
+                row["r1W"] = round((row["r1W"] or 0) + rng.uniform(-4, 4), 2)
+    return output, details
+
+def replay(output, details, runs, share, seed=1):
+    """(differences, {timing: seconds}, stats of the last run)."""
+    rng, diff, t = random.Random(seed), [], {"evaluate": 0.0, "state": 0.0, "full": 0.0}
+    ref = FullDiff()
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "state.json")
+        for i in range(runs):
+            specs = RULES + ([LATE_RULE] if i >= runs // 2 else [])
+            rules = compile_rules(specs)
+            out, det = output, details
+            if i % 7 == 3:                       # a theme drops out for a run
+                gone = out["themes"][rng.randrange(len(out["themes"]))]["id"]
+                out = {**out, "themes": [t for t in out["themes"] if t["id"] != gone]}
+                det = {k: v for k, v in det.items() if k != gone}
+            out = {**out, "updated": f"run {i}"}
+            t0 = time.perf_counter()
+            state = AlertState(path)
+            t1 = time.perf_counter()
+            got = state.evaluate(rules, out, det)
+            t2 = time.perf_counter()
+            state.save()
+            t3 = time.perf_counter()
+            want = ref.evaluate(rules, out, det)
+            t["evaluate"] += t2 - t1
+            t["state"]    += t1 - t0 + t3 - t2
+            t["full"]     += time.perf_counter() - t3
+            key = lambda e: (e["rule"], e["theme"], e.get("ticker", ""))
+            if sorted(got, key=key) != sorted(want, key=key):
+                g, w = {key(e) for e in got}, {key(e) for e in want}
+                diff.append(f"run {i}: {len(got)} events vs {len(want)} "
+                            f"(only incremental {sorted(g - w)[:3]}, only full diff {sorted(w - g)[:3]})")
+            output, details = step(output, details, rng, share)
+    return diff, t, state.stats
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Incremental alert evaluation vs a full-snapshot diff")
+    ap.add_argument("--runs", type=int, default=30, help="runs replayed per check")
+    ap.add_argument("--scale", type=int, default=20, help="universe multiple for the timing")
+    args = ap.parse_args()
+
+    output, details = scored(F.THEMES)
+    diff = []
+    for share in (0.0, 0.05, 0.5):
+        d, _, st = replay(output, details, args.runs, share)
+        diff += [f"share {share}: {line}" for line in d]
+        print(f"{share:4.0%} moving, {args.runs} runs: {st['changed']}/{st['records']} records changed, "
+              f"{st['tested']} rule checks in the last run")
+    output, details = scored(scaled_themes(F.THEMES, args.scale))
+    for share in (0.02, 0.2):
+        d, t, st = replay(output, details, 6, share)
+        diff += [f"{args.scale}× share {share}: {line}" for line in d]
+        ms = {k: f"{1000 * v / 6:.1f}" for k, v in t.items()}
+        print(f"{args.scale}× ({st['records']} records), {share:.0%} moving: evaluate {ms['evaluate']} ms"
+              f" + state file {ms['state']} ms per run · full diff {ms['full']} ms")
+    if diff:
+        print(f"\n⚠ ALERTS DIFFER ({len(diff)})")
+        for line in diff[:20]:
+            print(f"    {line}")
+        return 1
+    print("\n✅ Incremental alerts match the full-snapshot diff")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
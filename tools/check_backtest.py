@@ -0,0 +1,123 @@
+"""
+Backtest replay — session_scores() against the live path, one session at a time
+===============================================================================
+session_scores() scores every theme at every stored session in one vectorized
+pass. To trust it, this takes the mock history (extra holes added, eight
+tickers listed partway through) and picks --samples sessions, always including
+the last. For each, it cuts every record off at that session and scores it
+the way a daily run would: compute_spy(), compute_universe(), score_theme()
+and build_output(). Each ticker metric, and each theme's score, emerging
+score and rank, must equal the backtest's cell for that session. The exit
+code is 1 if any sampled session disagrees.
+
+  python tools/check_backtest.py                   # 25 sampled sessions
+  python tools/check_backtest.py --samples 100 --scale 4
+
+--scale k only affects the timing line: it clones the universe k times
+(TICKER~i, same bars) and times the vectorized pass over the clones.
+"""
+
+import argparse, math, os, random, sys, time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+import market_themes as F
+from market_themes.backtest import session_scores, session_time, ticker_sessions
+from market_themes.records import Bars
+from bench_pipeline import base_ticker, scaled_themes
+import mock_yahoo
+from mock_yahoo import with_holes
+
+
+def live_session(themes, full, ts):
+    """(metrics, {id: (score, emerging, rank)}) the way the job scores at `ts`."""
+    day  = ts // 86400
+    raws = {}
+    for t, bars in full.items():
+        n = sum(1 for x in bars["ts"] if x // 86400 <= day)
+        if not n:
+            continue
+        cut   = {k: v[:n] for k, v in bars.items()}
+        valid = [c for c in cut["closes"] if c is not None]
+        raws[t] = F.raw_from_bars({"regularMarketPrice": valid[-1] if valid else None}, cut)
+    now, anchors = F.reference_times(session_time(ts))
+    spy     = F.compute_spy(raws["SPY"], anchors, verbose=False)
+    metrics = F.compute_universe(raws, spy["daily_rets"], F.red_day_avg(spy["daily_rets"]),
+                                 {f"r{tf}": a for tf, a in anchors.items()})
+    recs    = [F.score_theme(th, metrics, spy, [], raws, verbose=False) for th in themes]
+    out     = F.build_output(recs, spy, now)["themes"]
+    return metrics, {r["id"]: (r["score"], r["emerging"], i + 1) for i, r in enumerate(out)}
+
+def same(a, b):
+    if a is None or b is None:
+        return a is None and b is None
+    return a == b or (math.isnan(a) and math.isnan(b))
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Vectorized backtest vs live scoring")
+    ap.add_argument("--samples", type=int, default=25, help="sessions replayed through the live path")
+    ap.add_argument("--scale", type=int, default=1, help="clone the universe k times for timing")
+    ap.add_argument("--seed", type=int, default=7)
+    args = ap.parse_args()
+
+    themes  = F.THEMES
+    tickers = [t for t in F.universe_of(themes) if t not in mock_yahoo.DEAD_SYMBOLS]
+    full    = {t: with_holes(t, mock_yahoo.bars(t)) for t in tickers}
+    rng     = random.Random(args.seed)
+    for t in rng.sample([t for t in tickers if t != "SPY"], 8):     # listed partway through
+        cut = rng.randrange(len(full[t]["ts"]) // 2)
+        full[t] = {k: v[cut:] for k, v in full[t].items()}
+    bars    = {t: Bars.from_lists(b, None, None) for t, b in full.items()}
+
+    t0   = time.perf_counter()
+    hist = session_scores(themes, bars)
+    t_bt = time.perf_counter() - t0
+    names, sess, tm, _ = ticker_sessions(bars)
+    row  = {t: i for i, t in enumerate(names)}
+    col  = {tid: i for i, tid in enumerate(hist["ids"])}
+
+    picks = sorted(rng.sample(range(20, len(sess) - 1), min(args.samples - 1, len(sess) - 21)) + [len(sess) - 1])
+    bad, t_live = 0, []
+    for s in picks:
+        t0 = time.perf_counter()
+        metrics, live = live_session(themes, full, int(sess[s]))
+        t_live.append(time.perf_counter() - t0)
+        diff = []
+        for t, m in metrics.items():
+            for k, v in m.items():
+                got = tm[k][row[t], s]
+                if not same(v, None if math.isnan(got) else float(got)):
+                    diff.append(f"{t}.{k}: backtest {got!r} ≠ live {v!r}")
+        for tid, (score, emerging, rank) in live.items():
+            got = (hist["score"][col[tid], s], hist["emerging"][col[tid], s], hist["rank"][col[tid], s])
+            got = tuple(None if isinstance(x, float) and math.isnan(x) else x for x in got)
+            if not (same(score, got[0]) and same(emerging, got[1]) and rank == got[2]):
+                diff.append(f"{tid}: backtest {got} ≠ live {(score, emerging, rank)}")
+        if diff:
+            bad += 1
+            print(f"✗ {hist['dates'][s]}: {len(diff)} differences")
+            for line in diff[:10]:
+                print(f"    {line}")
+
+    print(f"{len(picks)} sessions replayed · {len(sess)} sessions × {len(themes)} themes "
+          f"× {len(tickers)} tickers in the backtest")
+    print(f"  vectorized, every session: {t_bt:.2f}s")
+    print(f"  live path, one session:    {1000 * sorted(t_live)[len(t_live) // 2]:.0f} ms median "
+          f"→ ≈{sorted(t_live)[len(t_live) // 2] * len(sess):.0f}s replaying every session")
+    if args.scale > 1:
+        big   = scaled_themes(themes, args.scale)
+        bbars = {t: bars[base_ticker(t)] for t in F.universe_of(big) if base_ticker(t) in bars}
+        t0 = time.perf_counter()
+        session_scores(big, bbars)
+        print(f"  {args.scale}× universe ({len(big)} themes, {len(bbars)} tickers): "
+              f"{time.perf_counter() - t0:.2f}s")
+    if bad:
+        print(f"\n⚠ BACKTEST DIFFERS from live scoring in {bad}/{len(picks)} sessions")
+        return 1
+    print("\n✅ Backtest identical to live scoring")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
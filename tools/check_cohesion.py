@@ -0,0 +1,177 @@
+"""
+Theme cohesion against a brute-force correlation loop
+=====================================================
+compute_cohesion() correlates the whole universe in blocks. The reference
+here is deliberately naive: for every pair of constituents, np.corrcoef over
+the sessions both have a return for. Both run on the mock bars twice, once as
+served, which takes the full-window path, and once with extra holes, which
+takes the masked path. The block size is forced down so pairs straddle slab
+boundaries. They must agree on each theme's cohesion, each constituent's
+correlation to its own theme, and the cross-theme neighbours and peers; any
+mismatch is listed and exits 1.
+
+Timing runs separately, on a synthetic factor-model universe at each
+--scale multiple of the constituent count, with peak memory.
+
+  python tools/check_cohesion.py
+  python tools/check_cohesion.py --scale 10,25
+"""
+
+import argparse, os, sys, time, tracemalloc
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+import market_themes as F
+from market_themes.cohesion import COHESION_MIN_OBS, COHESION_PEERS, COHESION_WINDOW, compute_cohesion
+from market_themes.sessions import nyse
+import mock_yahoo
+from mock_yahoo import with_holes
+
+TOL = 1e-9
+
+
+# ── Reference ─────────────────────────────────────────────────────────────────
+def reference_returns(raws, window):
+    """{ticker: returns with NaN holes} over the last window + 1 NYSE sessions."""
+    cal  = nyse()
+    ords = {t: cal.session_index(np.asarray(r["ts"], dtype=np.int64)) for t, r in raws.items()}
+    last = max(int(o.max()) for o in ords.values())
+    out  = {}
+    for t, r in raws.items():
+        C = np.full(window + 1, np.nan)
+        for o, c in zip(ords[t].tolist(), r["closes"]):
+            if o >= last - window and c is not None:
+                C[o - (last - window)] = c
+        out[t] = C[1:] / C[:-1] - 1
+    return out
+
+def reference(themes, raws, window=COHESION_WINDOW, min_obs=COHESION_MIN_OBS, peers=COHESION_PEERS):
+    rets  = reference_returns(raws, window)
+    slots = [(tid, t) for (tid, *_, stocks, _) in themes for t in stocks
+             if t in rets and np.isfinite(rets[t]).sum() >= min_obs]
+    n = len(slots)
+    corr = np.full((n, n), np.nan)
+    for i in range(n):
+        for j in range(i + 1, n):
+            a, b = rets[slots[i][1]], rets[slots[j][1]]
+            ok = np.isfinite(a) & np.isfinite(b)
+            if slots[i][1] != slots[j][1] and ok.sum() >= min_obs and a[ok].std() > 0 and b[ok].std() > 0:
+                corr[i, j] = corr[j, i] = np.corrcoef(a[ok], b[ok])[0, 1]
+    mean = lambda v: float(np.mean(v)) if len(v) else None
+    th, cons = {}, {}
+    for tid, *_ in themes:
+        mine = [i for i, s in enumerate(slots) if s[0] == tid]
+        pair = [corr[i, j] for i in mine for j in mine if i != j and not np.isnan(corr[i, j])]
+        cross = {}
+        for i in mine:
+            for j, s in enumerate(slots):
+                if s[0] != tid and not np.isnan(corr[i, j]):
+                    cross.setdefault(s[0], []).append(corr[i, j])
+        near = sorted(cross, key=lambda h: -np.mean(cross[h]))[:peers]
+        th[tid] = {"cohesion": mean(pair), "neighbours": near,
+                   "neighbour_corr": [mean(cross[h]) for h in near]}
+    for i, (tid, t) in enumerate(slots):
+        own = [corr[i, j] for j, s in enumerate(slots) if s[0] == tid and not np.isnan(corr[i, j])]
+        out = sorted((j for j, s in enumerate(slots) if s[0] != tid and not np.isnan(corr[i, j])),
+                     key=lambda j: -corr[i, j])[:peers]
+        cons[(tid, t)] = {"theme_corr": mean(own), "peers": [slots[j][1] for j in out],
+                          "peer_corr": [float(corr[i, j]) for j in out]}
+    return {"themes": th, "constituents": cons}
+
+def mock_raws(tickers, holes):
+    raws = {}
+    for t in tickers:
+        s = mock_yahoo.bars(t)
+        b = with_holes(t, s) if holes else {"ts": s["ts"], "closes": s["close"], "highs": s["high"],
+                                            "lows": s["low"], "vols": s["volume"]}
+        raws[t] = F.raw_from_bars({"regularMarketPrice": next(c for c in reversed(b["closes"]) if c)}, b)
+    return raws
+
+def differences(got, want):
+    out = []
+    for part in ("themes", "constituents"):
+        if got[part].keys() != want[part].keys():
+            out.append(f"{part}: keys differ ({len(got[part])} vs {len(want[part])})")
+        for key in want[part].keys() & got[part].keys():
+            for k, w in want[part][key].items():
+                g = got[part][key][k]
+                if isinstance(w, list) and w and isinstance(w[0], float):
+                    bad = len(g) != len(w) or any(abs(a - b) > TOL for a, b in zip(g, w))
+                elif isinstance(w, float):
+                    bad = g is None or abs(g - w) > TOL
+                else:
+                    bad = g != w
+                if bad:
+                    out.append(f"{key}.{k}: blocked {g!r} ≠ pairwise {w!r}")
+    return out
+
+
+# ── Scale ─────────────────────────────────────────────────────────────────────
+def factor_universe(themes, k, window=COHESION_WINDOW, seed=7):
+    """Themes cloned k times, each member = its theme factor + own noise, as Bars
+    over the last window + 1 sessions (one stock in 20 has holes)."""
+    rng   = np.random.default_rng(seed)
+    ts    = nyse().opens[-(window + 1) - 1300:-1300].astype(np.int64)     # a past stretch
+    scaled, cache = [], {}
+    for i in range(k):
+        for (tid, name, short, icon, sector, stocks, color) in themes:
+            names  = [f"{s}~{i}" for s in stocks]
+            scaled.append((f"{tid}~{i}", name, short, icon, sector, names, color))
+            factor = rng.normal(0, 0.012, window + 1)
+            for s in names:
+                rets = factor * rng.uniform(0.3, 1.2) + rng.normal(0, 0.015, window + 1)
+                closes = (100 * np.cumprod(1 + rets)).tolist()
+                if rng.random() < 0.05:
+                    for j in rng.integers(0, window + 1, 2):
+                        closes[j] = None
+                cache[s] = F.Bars.from_lists({"ts": ts.tolist(), "closes": closes}, closes[-1], closes[-2])
+    return scaled, cache
+
+def time_scale(themes, k):
+    scaled, cache = factor_universe(themes, k)
+    t0 = time.perf_counter()
+    got = compute_cohesion(scaled, cache)
+    dt = time.perf_counter() - t0
+    tracemalloc.start()
+    compute_cohesion(scaled, cache)
+    peak = tracemalloc.get_traced_memory()[1] / 2**20
+    tracemalloc.stop()
+    n = len(got["constituents"])
+    coh = [v["cohesion"] for v in got["themes"].values() if v["cohesion"] is not None]
+    print(f"  {k:>3}×  {n:>6} stocks {len(scaled):>6} themes  {dt:7.2f}s  peak {peak:6.0f} MB "
+          f"(full matrix {n * n * 8 / 2**20:6.0f} MB)  median cohesion {np.median(coh):.2f}")
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Blocked cohesion pass vs pairwise correlations")
+    ap.add_argument("--scale", default="1,10,25", help="comma-separated universe multiples for the timing")
+    args = ap.parse_args()
+
+    tickers = [t for t in F.universe_of(F.THEMES) if t not in mock_yahoo.DEAD_SYMBOLS]
+    diff = []
+    for holes in (False, True):      # mostly full windows (Z·Zᵀ) / mostly holey (masked sums)
+        raws = mock_raws(tickers, holes)
+        t0   = time.perf_counter()
+        want = reference(F.THEMES, raws)
+        t1   = time.perf_counter()
+        for cells in (1 << 20, 4096, 1):
+            diff += differences(compute_cohesion(F.THEMES, raws, block_cells=cells), want)
+        t2 = time.perf_counter()
+        print(f"{'extra holes' if holes else 'mock bars  '}: {len(want['constituents'])} constituents · "
+              f"{len(want['themes'])} themes · pairwise loop {t1 - t0:.2f}s · blocked pass ×3 {t2 - t1:.2f}s")
+    print("timing on a synthetic factor universe:")
+    for k in (int(s) for s in args.scale.split(",")):
+        time_scale(F.THEMES, k)
+    if diff:
+        print(f"\n⚠ COHESION DIFFERS ({len(diff)})")
+        for line in diff[:20]:
+            print(f"    {line}")
+        return 1
+    print("\n✅ Blocked cohesion matches the pairwise correlations")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
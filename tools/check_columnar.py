@@ -0,0 +1,101 @@
+"""
+Round-trip of the --columnar tables
+===================================
+Reads data/columnar/ as written by `fetch_data.py --columnar` and rebuilds
+theme records and constituent rows from it with columnar_records(). They must
+match market_data.json from the same run field for field, with the same
+keys, the same types and equal values, so decoded strings, nulls and floats
+must all survive the round trip. Fields that differ are listed and the
+script exits 1. It needs a published run in --data and fetches nothing.
+
+The timing line compares reading one column, and then every field, from the
+memory-mapped tables and from the JSON (median of --repeat reads).
+
+  python tools/check_columnar.py
+  python tools/check_columnar.py --data data --columnar data/columnar
+"""
+
+import argparse, json, os, sys, time
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from market_themes.columnar import COLUMNAR_DIR, columnar_records, load_columnar
+
+
+def differences(want, got, where):
+    """Paths where two JSON values differ (NaN never appears: nulls are None)."""
+    if isinstance(want, dict) and isinstance(got, dict):
+        out = [f"{where}.{k}: missing" for k in want.keys() - got.keys()]
+        out += [f"{where}.{k}: extra" for k in got.keys() - want.keys()]
+        for k in want.keys() & got.keys():
+            out += differences(want[k], got[k], f"{where}.{k}")
+        return out
+    if isinstance(want, list) and isinstance(got, list) and len(want) == len(got):
+        return [d for i, (a, b) in enumerate(zip(want, got)) for d in differences(a, b, f"{where}[{i}]")]
+    return [] if want == got and type(want) is type(got) else [f"{where}: json {want!r} ≠ columnar {got!r}"]
+
+
+def timed(fn, repeat):
+    """Median wall time of `repeat` calls, in ms."""
+    ts = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        ts.append(time.perf_counter() - t0)
+    return sorted(ts)[len(ts) // 2] * 1000
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Columnar export vs market_data.json")
+    ap.add_argument("--data", default="data", help="directory holding market_data.json")
+    ap.add_argument("--columnar", default=COLUMNAR_DIR, help="directory written by --columnar")
+    ap.add_argument("--repeat", type=int, default=25, help="timed reads per format (median reported)")
+    args = ap.parse_args()
+
+    with open(os.path.join(args.data, "market_data.json")) as f:
+        doc = json.load(f)
+    cols = load_columnar(args.columnar)
+    themes, details = columnar_records(cols)
+
+    want_themes  = [{k: v for k, v in t.items() if k not in ("constituents", "hist")} for t in doc["themes"]]
+    want_details = {t["id"]: t.get("constituents", []) for t in doc["themes"]}
+    diff  = differences(want_themes, themes, "themes")
+    diff += differences(want_details, details, "constituents")
+    for k in ("updated", "mode", "spy"):
+        diff += differences(doc.get(k), cols["schema"].get(k), k)
+
+    path = os.path.join(args.data, "market_data.json")
+    def from_json():
+        with open(path) as f:
+            return np.array([t["score"] for t in json.load(f)["themes"]], dtype=float)
+    def from_columns():
+        return np.asarray(load_columnar(args.columnar, columns=["score"])["themes"]["score"])
+    def whole_json():
+        with open(path) as f:
+            return json.load(f)
+    def whole_columns():
+        return load_columnar(args.columnar, mmap=False)
+    assert float(np.nansum(from_json())) == float(np.nansum(from_columns()))
+
+    spec = cols["schema"]["tables"]
+    names = os.listdir(args.columnar)
+    size = sum(os.path.getsize(os.path.join(args.columnar, n)) for n in names)
+    print(f"{spec['themes']['rows']} themes × {len(spec['themes']['columns'])} columns · "
+          f"{spec['constituents']['rows']} constituents × {len(spec['constituents']['columns'])} columns · "
+          f"{len(names)} files, {size / 1024:.0f} KB (market_data.json {os.path.getsize(path) / 1024:.0f} KB)")
+    print(f"  one column, all themes:  market_data.json {timed(from_json, args.repeat):.2f} ms · "
+          f"columnar (mmap) {timed(from_columns, args.repeat):.2f} ms")
+    print(f"  every field (as arrays): market_data.json {timed(whole_json, args.repeat):.2f} ms · "
+          f"columnar (read) {timed(whole_columns, args.repeat):.2f} ms")
+    if diff:
+        print(f"\n⚠ COLUMNAR EXPORT DIFFERS from market_data.json ({len(diff)} fields)")
+        for line in diff[:20]:
+            print(f"    {line}")
+        return 1
+    print("\n✅ Columnar export matches market_data.json")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,140 @@
+"""
+Does compute_universe() still agree with metrics.py?
+====================================================
+metrics.py keeps the scalar compute_* functions as the readable spec; the
+pipeline only ever runs the vectorized engine. This feeds both the same
+--series records built from the mock server's bars, each damaged the way real
+charts arrive: history cut short, null rows, no high/low or no volume column,
+zero volume, no live price, a bar dated on a weekend, staggered start dates.
+Every metric of every ticker must come back with the same keys, the same None
+and the same rounded value, once for dict records and once for Bars.
+
+Bars are stamped at the session open, as Yahoo sends them. The engine places
+a bar by its NYSE session and the scalar code by its timestamp; the two can
+only disagree for a bar stamped later in its day than SPY's.
+
+  python tools/check_engine.py
+  python tools/check_engine.py --series 2000 --seed 3
+"""
+
+import argparse, datetime, math, os, random, sys, time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+import market_themes as F
+from market_themes.metrics import (compute_adr_adv, compute_adr_contraction, compute_breadth,
+                                   compute_proximity_to_high, compute_resilience, compute_rs_trend,
+                                   compute_vol_accumulation, pct, price_on)
+import mock_yahoo
+
+
+# ── Reference: the scalar functions, one ticker at a time ─────────────────────
+def scalar_metrics(raw, spy_sessions, anchors):
+    adr, adv = compute_adr_adv(raw)
+    out = {"r1D": pct(raw["price"], raw["prev_close"])}
+    for key, target in anchors.items():
+        out[key] = pct(raw["price"], price_on(raw["ts"], raw["closes"], target))
+    out.update({"adr_pct": adr, "adv": adv, "brd": compute_breadth(raw),
+                "res": compute_resilience(raw, spy_sessions),
+                "vacc": compute_vol_accumulation(raw), "adrc": compute_adr_contraction(raw),
+                "rst": compute_rs_trend(raw, spy_sessions), "prox": compute_proximity_to_high(raw)})
+    return out
+
+# ── Perturbed series ──────────────────────────────────────────────────────────
+def perturbed(ticker, rng, weekend=0.0, lengths=(3, 8, 11, 13, 21, 26, 60, 260, 400, None)):
+    """A mock series as bar lists, cut and holed at random (seeded)."""
+    s = mock_yahoo.bars(ticker)
+    bars = {"ts": list(s["ts"]), "closes": list(s["close"]), "highs": list(s["high"]),
+            "lows": list(s["low"]), "vols": list(s["volume"])}
+    n  = len(bars["ts"])
+    lo = n - (rng.choice(lengths) or n)                                # around every length threshold
+    hi = n - (rng.randrange(30) if rng.random() < 0.3 else 0)          # ends before the last session
+    bars = {k: v[max(lo, 0):hi] for k, v in bars.items()}
+    p_hole = rng.choice([0.0, 0.01, 0.1, 0.4])
+    for i in range(len(bars["ts"])):
+        x = rng.random()
+        if x < p_hole / 4:
+            bars["closes"][i] = None
+        elif x < p_hole / 2:
+            bars["highs"][i] = None
+        elif x < 3 * p_hole / 4:
+            bars["vols"][i] = rng.choice([0, None])
+        elif x < p_hole:
+            bars["lows"][i] = None
+    for k in ("highs", "lows", "vols"):
+        if rng.random() < 0.05:
+            bars[k] = []
+    if len(bars["ts"]) > 1 and rng.random() < weekend:  # a bar dated on a weekend → union-of-timestamps path
+        i   = rng.randrange(1, len(bars["ts"]))
+        sat = bars["ts"][i] - 86400 * ((datetime.datetime.utcfromtimestamp(bars["ts"][i]).weekday() + 2) % 7)
+        if sat > bars["ts"][i - 1]:
+            bars["ts"][i] = sat
+    closes = [c for c in bars["closes"] if c is not None]
+    price  = None if rng.random() < 0.03 or not closes else round(closes[-1] * (1 + rng.gauss(0, 0.02)), 4)
+    prev   = closes[-2] if len(closes) >= 2 and rng.random() > 0.03 else None
+    return bars, price, prev
+
+def universe(tickers, k, rng, **kw):
+    """{name: (bars, price, prev)} — k perturbed series cycling over `tickers`."""
+    return {f"{tickers[i % len(tickers)]}~{i}": perturbed(tickers[i % len(tickers)], rng, **kw)
+            for i in range(k)}
+
+def differences(got, want, what):
+    out = []
+    for t in want:
+        for key, w in want[t].items():
+            g = got[t][key]
+            if g != w and not (isinstance(g, float) and isinstance(w, float)
+                               and math.isnan(g) and math.isnan(w)):
+                out.append(f"{what} {t}.{key}: engine {g!r} ≠ scalar {w!r}")
+    return out
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Vectorized engine vs the scalar metric functions")
+    ap.add_argument("--series", type=int, default=1000, help="perturbed series to compare")
+    ap.add_argument("--seed", type=int, default=1)
+    args = ap.parse_args()
+
+    rng     = random.Random(args.seed)
+    tickers = [t for t in F.universe_of(F.THEMES) if t not in mock_yahoo.DEAD_SYMBOLS]
+    cases   = {                                     # one weekend bar sends a whole universe off the calendar
+        "session columns": universe(tickers, args.series, rng),
+        "timestamp union": universe(tickers, args.series // 4, rng, weekend=0.05),
+        "short histories": universe(tickers, 20, rng, lengths=(1, 3, 8, 11)),
+    }
+    spy     = mock_yahoo.bars("SPY")
+    spy_raw = F.raw_from_bars({"regularMarketPrice": spy["close"][-1]},
+                              {"ts": spy["ts"], "closes": spy["close"]})
+    now, anchors = F.reference_times(datetime.datetime.utcfromtimestamp(spy["ts"][-1]).replace(hour=21))
+    spy_s   = F.compute_spy(spy_raw, anchors, verbose=False)["daily_rets"]
+    keys    = {f"r{tf}": ts for tf, ts in anchors.items()}
+    diff    = []
+    for label, series in cases.items():
+        dicts = {t: {"ts": b["ts"], "closes": b["closes"], "highs": b["highs"], "lows": b["lows"],
+                     "vols": b["vols"], "price": p, "prev_close": pc} for t, (b, p, pc) in series.items()}
+        bars  = {t: F.Bars.from_lists(b, p, pc) for t, (b, p, pc) in series.items()}
+        for sessions in (spy_s[-3:], spy_s):          # under 5 SPY sessions: no RS trend
+            red  = F.red_day_avg(sessions)
+            t0   = time.perf_counter()
+            want = {t: scalar_metrics(r, sessions, keys) for t, r in dicts.items()}
+            t1   = time.perf_counter()
+            got  = F.compute_universe(bars, sessions, red, keys)
+            t2   = time.perf_counter()
+            what = f"{label}, {len(sessions)} SPY sessions:"
+            diff += differences(got, want, what + " Bars")
+            diff += differences(F.compute_universe(dicts, sessions, red, keys), want, what + " dicts")
+        n_val = sum(1 for m in want.values() for v in m.values() if v is not None)
+        print(f"{label}: {len(series):>4} series · {n_val:>5} non-null values · "
+              f"scalar {(t1 - t0) * 1000:4.0f} ms · engine {(t2 - t1) * 1000:4.0f} ms")
+    if diff:
+        print(f"\n⚠ ENGINE DIFFERS ({len(diff)})")
+        for line in diff[:20]:
+            print(f"    {line}")
+        return 1
+    print("\n✅ compute_universe() matches the scalar compute_* functions value for value")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
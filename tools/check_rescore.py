@@ -0,0 +1,93 @@
+"""
+Browser what-if rescoring, run under Node
+=========================================
+index.html rescores themes client-side from data/vectors.json when the user
+moves the weight sliders. This extracts that WHAT-IF RESCORING block, runs it
+in node at the shipped weights, and checks every theme's score and emerging
+value against data/summary.json from the same run. It also checks the
+page's pyRound() against Python's round() on random values and on exact .5
+ties, since the two must round alike for scores to match. Any mismatch exits
+1; without `node` on PATH it exits 2. Needs a published run in --data. The
+timing line rescores --scale times the theme count.
+
+  python tools/check_rescore.py
+  python tools/check_rescore.py --data data --scale 40
+"""
+
+import argparse, json, os, random, shutil, subprocess, sys, tempfile
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+
+HARNESS = r"""
+const fs = require('fs'), vm = require('vm');
+const [html, dir, cases, scale] = process.argv.slice(2);
+const page = fs.readFileSync(html, 'utf8');
+const a = page.indexOf('// ── WHAT-IF RESCORING'), b = page.indexOf('async function loadVectors');
+vm.runInThisContext(page.slice(a, b) + ';globalThis.rescore=rescore;globalThis.pyRound=pyRound;');
+const vec = JSON.parse(fs.readFileSync(dir + '/vectors.json'));
+const sum = JSON.parse(fs.readFileSync(dir + '/summary.json'));
+const got = rescore(vec, vec.weights, true), diff = [];
+for (const t of sum.themes) {
+  const s = got[t.id];
+  if (!s || s.score !== t.score || s.emerging !== t.emerging)
+    diff.push(`${t.id}: rescore ${JSON.stringify(s)} ≠ published score ${t.score} emerging ${t.emerging}`);
+}
+for (const [x, nd, want] of JSON.parse(fs.readFileSync(cases)))
+  if (pyRound(x, nd) !== want) diff.push(`pyRound(${x}, ${nd}) = ${pyRound(x, nd)} ≠ ${want}`);
+const big = {...vec, themes: {}};
+for (let k = 0; k < +scale; k++) for (const id in vec.themes) big.themes[id + '~' + k] = vec.themes[id];
+for (let i = 0; i < 5; i++) rescore(big, vec.weights, true);
+const t0 = performance.now();
+for (let i = 0; i < 20; i++) rescore(big, vec.weights, false);
+console.log(JSON.stringify({themes: sum.themes.length, big: Object.keys(big.themes).length,
+                            ms: (performance.now() - t0) / 20, diff}));
+"""
+
+
+def round_cases(n, seed=1):
+    """[x, nd, round(x, nd)] — random values, many of them on or next to ties."""
+    rng, out = random.Random(seed), []
+    for _ in range(n):
+        nd = rng.choice((1, 2, 3))
+        x  = rng.uniform(-200, 200)
+        if rng.random() < 0.3:
+            x = round(x, nd + 1)
+        elif rng.random() < 0.2:
+            x = rng.randint(-4000, 4000) / (2 * 10 ** nd)
+        out.append([x, nd, round(x, nd)])
+    return out
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Dashboard what-if rescoring vs published scores")
+    ap.add_argument("--data", default="data", help="directory holding vectors.json and summary.json")
+    ap.add_argument("--scale", type=int, default=40, help="theme multiple for the timing")
+    args = ap.parse_args()
+    node = shutil.which("node")
+    if not node:
+        print("node not found on PATH")
+        return 2
+
+    with tempfile.TemporaryDirectory() as tmp:
+        js, cases = os.path.join(tmp, "harness.js"), os.path.join(tmp, "cases.json")
+        with open(js, "w") as f:
+            f.write(HARNESS)
+        with open(cases, "w") as f:
+            json.dump(round_cases(100_000), f)
+        res = json.loads(subprocess.run(
+            [node, js, os.path.join(ROOT, "index.html"), args.data, cases, str(args.scale)],
+            check=True, capture_output=True, text=True).stdout)
+
+    print(f"{res['themes']} themes rescored at the shipped weights · 100000 pyRound cases")
+    print(f"  rescore, {res['big']} themes: {res['ms']:.2f} ms")
+    if res["diff"]:
+        print(f"\n⚠ RESCORING DIFFERS ({len(res['diff'])})")
+        for line in res["diff"][:20]:
+            print(f"    {line}")
+        return 1
+    print("\n✅ Dashboard rescoring reproduces the published scores")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
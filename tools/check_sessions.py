@@ -0,0 +1,129 @@
+"""
+NYSE calendar and session alignment
+===================================
+Three things can go wrong with market_themes.sessions, and this looks for each:
+
+  1. holidays and early closes: the rules must produce exactly the dates NYSE
+     published for 2021-2026, plus the unscheduled closures;
+  2. close times: sessions on both sides of the 2024 DST switches, and two
+     early closes, must close at the expected UTC time;
+  3. alignment: laying the mock bars (with extra holes) onto the engine by
+     NYSE session ordinal must give the same metrics as laying them over the
+     union of bar timestamps.
+
+A mismatch in any of them is listed and the script exits 1.
+
+  python tools/check_sessions.py
+"""
+
+import datetime, math, os, sys, time
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+import market_themes as F
+import market_themes.engine as engine
+from market_themes.sessions import early_closes, holidays, nyse
+import mock_yahoo
+from mock_yahoo import with_holes
+
+D = datetime.date
+PUBLISHED = {
+    2021: ([D(2021, 1, 1), D(2021, 1, 18), D(2021, 2, 15), D(2021, 4, 2), D(2021, 5, 31),
+            D(2021, 7, 5), D(2021, 9, 6), D(2021, 11, 25), D(2021, 12, 24)],
+           [D(2021, 11, 26)]),
+    2022: ([D(2022, 1, 17), D(2022, 2, 21), D(2022, 4, 15), D(2022, 5, 30), D(2022, 6, 20),
+            D(2022, 7, 4), D(2022, 9, 5), D(2022, 11, 24), D(2022, 12, 26)],
+           [D(2022, 11, 25)]),
+    2023: ([D(2023, 1, 2), D(2023, 1, 16), D(2023, 2, 20), D(2023, 4, 7), D(2023, 5, 29),
+            D(2023, 6, 19), D(2023, 7, 4), D(2023, 9, 4), D(2023, 11, 23), D(2023, 12, 25)],
+           [D(2023, 7, 3), D(2023, 11, 24)]),
+    2024: ([D(2024, 1, 1), D(2024, 1, 15), D(2024, 2, 19), D(2024, 3, 29), D(2024, 5, 27),
+            D(2024, 6, 19), D(2024, 7, 4), D(2024, 9, 2), D(2024, 11, 28), D(2024, 12, 25)],
+           [D(2024, 7, 3), D(2024, 11, 29), D(2024, 12, 24)]),
+    2025: ([D(2025, 1, 1), D(2025, 1, 9), D(2025, 1, 20), D(2025, 2, 17), D(2025, 4, 18),
+            D(2025, 5, 26), D(2025, 6, 19), D(2025, 7, 4), D(2025, 9, 1), D(2025, 11, 27),
+            D(2025, 12, 25)],
+           [D(2025, 7, 3), D(2025, 11, 28), D(2025, 12, 24)]),
+    2026: ([D(2026, 1, 1), D(2026, 1, 19), D(2026, 2, 16), D(2026, 4, 3), D(2026, 5, 25),
+            D(2026, 6, 19), D(2026, 7, 3), D(2026, 9, 7), D(2026, 11, 26), D(2026, 12, 25)],
+           [D(2026, 11, 27), D(2026, 12, 24)]),
+}
+CLOSED = [D(2001, 9, 11), D(2004, 6, 11), D(2007, 1, 2), D(2012, 10, 29), D(2012, 10, 30),
+          D(2018, 12, 5)]
+# (session, close in UTC): either side of the 2024 DST switches, and an early close
+CLOSES = [(D(2024, 3, 8), "21:00"), (D(2024, 3, 11), "20:00"), (D(2024, 11, 1), "20:00"),
+          (D(2024, 11, 4), "21:00"), (D(2024, 11, 29), "18:00"), (D(2024, 12, 24), "18:00")]
+
+
+def calendar_differences():
+    cal, out = nyse(), []
+    for year, (closed, early) in PUBLISHED.items():
+        got = holidays(year)
+        out += [f"{d}: NYSE closed, rules open" for d in closed if d not in got]
+        out += [f"{d}: rules closed ({got[d]}), NYSE open" for d in got if d not in closed]
+        got = early_closes(year) - set(closed)
+        out += [f"{d}: early close missing" for d in early if d not in got]
+        out += [f"{d}: extra early close" for d in got if d not in early]
+    for d in CLOSED:
+        if d not in holidays(d.year):
+            out.append(f"{d}: closure missing")
+    for d, hhmm in CLOSES:
+        k = int(cal.ordinal((d - datetime.date(1970, 1, 1)).days))
+        got = datetime.datetime.utcfromtimestamp(int(cal.closes[k])).strftime("%H:%M") if k >= 0 else "closed"
+        if got != hhmm:
+            out.append(f"{d}: close {got} UTC, expected {hhmm}")
+    return out
+
+def union_columns(ts, rows):
+    cal = np.unique(ts)
+    return (np.searchsorted(cal, ts), len(cal),
+            lambda t: int(np.searchsorted(cal, t, side="right")) - 1)
+
+def engine_differences():
+    tickers = [t for t in F.universe_of(F.THEMES) if t not in mock_yahoo.DEAD_SYMBOLS]
+    raws = {}
+    for t in tickers:
+        b = with_holes(t, mock_yahoo.bars(t))
+        raws[t] = F.raw_from_bars({"regularMarketPrice": next(c for c in reversed(b["closes"]) if c)}, b)
+    _, anchors = F.reference_times()
+    spy  = F.compute_spy(raws["SPY"], anchors, verbose=False)
+    args = (spy["daily_rets"], F.red_day_avg(spy["daily_rets"]),
+            {f"r{tf}": a for tf, a in anchors.items()})
+    t0 = time.perf_counter()
+    got = F.compute_universe(raws, *args)
+    t1 = time.perf_counter()
+    ordinal, engine.session_columns = engine.session_columns, union_columns
+    try:
+        want = F.compute_universe(raws, *args)
+    finally:
+        engine.session_columns = ordinal
+    t2 = time.perf_counter()
+    out = []
+    for t, m in want.items():
+        for k in m.__slots__:
+            a, b = getattr(got[t], k), getattr(m, k)
+            if a != b and not (isinstance(a, float) and isinstance(b, float) and math.isnan(a) and math.isnan(b)):
+                out.append(f"{t}.{k}: sessions {a!r} ≠ union {b!r}")
+    print(f"engine over {len(tickers)} tickers: session ordinals {1000 * (t1 - t0):.0f} ms · "
+          f"union of timestamps {1000 * (t2 - t1):.0f} ms")
+    return out
+
+
+def main():
+    diff = calendar_differences()
+    print(f"calendar: {len(nyse())} sessions {nyse().date(0)} … {nyse().date(-1)} · "
+          f"{len(PUBLISHED)} published years checked")
+    diff += engine_differences()
+    if diff:
+        print(f"\n⚠ SESSION CALENDAR DIFFERS ({len(diff)})")
+        for line in diff[:20]:
+            print(f"    {line}")
+        return 1
+    print("\n✅ Session calendar matches NYSE and the engine layouts agree")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
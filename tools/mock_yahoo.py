@@ -0,0 +1,337 @@
+"""
+Mock Yahoo Finance chart server — offline fixture for fetch_data.py
+===================================================================
+Serves deterministic synthetic daily bars on the same URL shape as
+query1.finance.yahoo.com, so the fetcher can be exercised without network:
+
+  python tools/mock_yahoo.py --port 8765 --latency 0.05 --limit 20
+  YAHOO_BASE_URL=http://127.0.0.1:8765 python fetch_data.py
+
+Endpoints:
+  /v8/finance/chart/{ticker}?range=3mo&interval=1d   (also period1/period2)
+  /v7/finance/spark?symbols=A,B,C&range=1d            latest session close per symbol
+  /__stats                                            request/throughput counters
+  /__reset                                            zero the counters
+
+--latency  adds a fixed per-request delay (simulated round trip)
+--limit    answers 429 once more than N requests arrive in any 1s window,
+           which is how the client-side token bucket is checked
+--fail     answers 503 to this fraction of data requests (seeded, repeatable)
+           to exercise the client's retries and stale-bar fallback
+
+From Python it can be used as a context-managed fixture:
+
+  with MockYahoo(latency=0.05, limit=20) as mock:
+      os.environ["YAHOO_BASE_URL"] = mock.url
+      ...
+      print(mock.stats())
+"""
+
+import argparse, collections, datetime, gzip, json, os, random, sys, threading, time, zlib
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit, parse_qs, unquote
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from market_themes.sessions import EPOCH, nyse
+
+# Symbols that answer 404 "No data found, symbol may be delisted"
+DEAD_SYMBOLS = {"HASHI", "NEWR", "KUKA", "FANUC"}
+# Symbols generated with tiny volume so they fail the $10M ADV screen
+ILLIQUID_SYMBOLS = {"ARTNA", "YORW", "ATNI"}
+
+HISTORY_DAYS = 5 * 366
+RANGES = {"1d": 1, "5d": 5, "1mo": 31, "3mo": 92, "6mo": 183,
+          "1y": 366, "2y": 731, "5y": 1827, "10y": 3653, "max": 100_000}
+
+
+# ── Synthetic bars ────────────────────────────────────────────────────────────
+_bars_cache = {}
+_bars_lock  = threading.Lock()
+
+def _sessions(today):
+    """Open timestamps of the NYSE sessions covering HISTORY_DAYS, oldest
+    first (Yahoo stamps a daily bar with its session's open)."""
+    cal = nyse(today.year)
+    lo  = int(cal.on_or_before((today - datetime.timedelta(days=HISTORY_DAYS) - EPOCH).days - 1)) + 1
+    hi  = int(cal.on_or_before((today - EPOCH).days))
+    return cal.opens[lo:hi + 1].tolist()
+
+def bars(ticker, today=None):
+    """Deterministic OHLCV random walk for `ticker` (same ticker → same series)."""
+    today = today or datetime.datetime.utcnow().date()
+    key = (ticker, today)
+    with _bars_lock:
+        if key in _bars_cache:
+            return _bars_cache[key]
+
+    rng   = random.Random(zlib.crc32(ticker.encode()))
+    price = rng.uniform(8, 400)
+    vol   = rng.uniform(0.008, 0.045)
+    drift = rng.uniform(-0.0015, 0.0025)
+    dollars = rng.uniform(1e5, 3e6) if ticker in ILLIQUID_SYMBOLS else rng.uniform(2e7, 3e9)
+    shares  = dollars / price
+    ts, o_, h_, l_, c_, v_ = [], [], [], [], [], []
+    for t in _sessions(today):
+        op  = price
+        cl  = max(0.5, op * (1 + rng.gauss(drift, vol)))
+        hi  = max(op, cl) * (1 + abs(rng.gauss(0, vol / 2)))
+        lo  = min(op, cl) * (1 - abs(rng.gauss(0, vol / 2)))
+        ts.append(t)
+        o_.append(round(op, 4)); h_.append(round(hi, 4)); l_.append(round(lo, 4))
+        c_.append(round(cl, 4)); v_.append(int(shares * rng.uniform(0.5, 1.8)))
+        price = cl
+    # Yahoo occasionally returns null rows — keep a few so callers handle holes
+    for i in range(len(ts) - 40, 0, -97):
+        if rng.random() < 0.3:
+            o_[i] = h_[i] = l_[i] = c_[i] = v_[i] = None
+    series = {"ts": ts, "open": o_, "high": h_, "low": l_, "close": c_, "volume": v_}
+    with _bars_lock:
+        _bars_cache[key] = series
+    return series
+
+def with_holes(ticker, series):
+    """The series as the fetcher's bar lists, with extra seeded per-column holes
+    (missing high, zero or missing volume, missing close) for the check tools."""
+    rng  = random.Random(ticker)
+    bars = {"ts": list(series["ts"]), "closes": list(series["close"]),
+            "highs": list(series["high"]), "lows": list(series["low"]),
+            "vols": list(series["volume"])}
+    for i in range(len(bars["ts"])):
+        x = rng.random()
+        if x < 0.01:
+            bars["highs"][i] = None
+        elif x < 0.02:
+            bars["vols"][i] = 0
+        elif x < 0.03:
+            bars["vols"][i] = None
+        elif x < 0.035:
+            bars["closes"][i] = None
+    return bars
+
+def _window(series, query, now):
+    ts = series["ts"]
+    if "period1" in query:
+        lo = int(query["period1"][0])
+        hi = int(query.get("period2", [now])[0])
+    else:
+        rng = query.get("range", ["3mo"])[0]
+        if rng == "ytd":
+            lo = int(datetime.datetime(datetime.datetime.utcnow().year, 1, 1,
+                                       tzinfo=datetime.timezone.utc).timestamp())
+        else:
+            lo = now - RANGES.get(rng, 92) * 86400
+        hi = now
+    return [i for i, t in enumerate(ts) if lo <= t <= hi]
+
+def chart_payload(ticker, query=None, now=None):
+    """Body of /v8/finance/chart/{ticker} as Yahoo shapes it, or None if dead."""
+    if ticker in DEAD_SYMBOLS:
+        return None
+    now    = int(now or time.time())
+    query  = query or {}
+    series = bars(ticker)
+    idx    = _window(series, query, now)
+    col    = lambda k: [series[k][i] for i in idx]
+    closes = [c for c in series["close"] if c is not None]
+    first  = idx[0] if idx else len(series["ts"])
+    prior  = [c for c in series["close"][:first] if c is not None]
+    meta = {
+        "currency": "USD", "symbol": ticker, "exchangeName": "NMS",
+        "instrumentType": "EQUITY", "dataGranularity": "1d",
+        "regularMarketTime": series["ts"][-1] + 6 * 3600,
+        "regularMarketPrice": closes[-1],
+        "regularMarketPreviousClose": closes[-2],
+        "chartPreviousClose": prior[-1] if prior else None,
+        "regularMarketVolume": series["volume"][-1],
+    }
+    return {"chart": {"result": [{
+        "meta": meta,
+        "timestamp": col("ts"),
+        "indicators": {"quote": [{"open": col("open"), "high": col("high"),
+                                  "low": col("low"), "close": col("close"),
+                                  "volume": col("volume")}]},
+    }], "error": None}}
+
+def spark_payload(symbols, now=None):
+    """Body of /v7/finance/spark for range=1d: last session per live symbol."""
+    result = []
+    for sym in symbols:
+        if sym in DEAD_SYMBOLS:
+            continue
+        series = bars(sym)
+        last   = max(i for i, c in enumerate(series["close"]) if c is not None)
+        closes = [c for c in series["close"] if c is not None]
+        result.append({"symbol": sym, "response": [{
+            "meta": {"currency": "USD", "symbol": sym, "exchangeName": "NMS",
+                     "instrumentType": "EQUITY", "dataGranularity": "1d",
+                     "regularMarketTime": series["ts"][last] + 6 * 3600,
+                     "regularMarketPrice": closes[-1],
+                     "chartPreviousClose": closes[-2], "previousClose": closes[-2]},
+            "timestamp": [series["ts"][last]],
+            "indicators": {"quote": [{"close": [closes[-1]]}]},
+        }]})
+    return {"spark": {"result": result, "error": None}}
+
+NOT_FOUND = {"chart": {"result": None, "error": {
+    "code": "Not Found", "description": "No data found, symbol may be delisted"}}}
+
+
+# ── Server ────────────────────────────────────────────────────────────────────
+class _Stats:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        self.requests = self.throttled = self.not_found = self.failed = 0
+        self.connections = self.bytes_out = self.peak_rps = 0
+        self.window = collections.deque()
+        self.first = self.last = None
+
+    def hit(self, limit):
+        """Record one request; returns False if it breaches the rate limit."""
+        with self.lock:
+            now = time.monotonic()
+            self.first = self.first or now
+            self.last  = now
+            self.requests += 1
+            self.window.append(now)
+            while self.window and self.window[0] <= now - 1.0:
+                self.window.popleft()
+            self.peak_rps = max(self.peak_rps, len(self.window))
+            if limit and len(self.window) > limit:
+                self.throttled += 1
+                return False
+            return True
+
+    def snapshot(self):
+        with self.lock:
+            span = (self.last - self.first) if self.first else 0.0
+            return {
+                "requests": self.requests, "throttled": self.throttled,
+                "not_found": self.not_found, "failed": self.failed,
+                "connections": self.connections,
+                "bytes_out": self.bytes_out, "peak_rps": self.peak_rps,
+                "span_s": round(span, 3),
+                "avg_rps": round(self.requests / span, 2) if span > 0 else None,
+            }
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"       # keep-alive, like the real endpoint
+
+    def setup(self):
+        super().setup()
+        with self.server.stats.lock:
+            self.server.stats.connections += 1
+
+    def log_message(self, *args):
+        pass
+
+    def _send(self, status, obj, compress=True):
+        body = json.dumps(obj, separators=(",", ":")).encode()
+        gz = compress and "gzip" in (self.headers.get("Accept-Encoding") or "")
+        if gz:
+            body = gzip.compress(body, compresslevel=5)
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        if gz:
+            self.send_header("Content-Encoding", "gzip")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+        with self.server.stats.lock:
+            self.server.stats.bytes_out += len(body)
+
+    def do_GET(self):
+        parts = urlsplit(self.path)
+        stats = self.server.stats
+        if parts.path == "/__stats":
+            return self._send(200, stats.snapshot(), compress=False)
+        if parts.path == "/__reset":
+            with stats.lock:
+                stats.reset()
+            return self._send(200, {"ok": True}, compress=False)
+
+        if not stats.hit(self.server.limit):
+            return self._send(429, {"finance": {"error": {"code": "Too Many Requests"}}})
+        if self.server.latency:
+            time.sleep(self.server.latency)
+        if self.server.fail and self.server.rng.random() < self.server.fail:
+            with stats.lock:
+                stats.failed += 1
+            return self._send(503, {"finance": {"error": {"code": "Service Unavailable"}}})
+
+        query = parse_qs(parts.query)
+        if parts.path.startswith("/v8/finance/chart/"):
+            ticker  = unquote(parts.path.rsplit("/", 1)[-1])
+            payload = chart_payload(ticker, query)
+            if payload is None:
+                with stats.lock:
+                    stats.not_found += 1
+                return self._send(404, NOT_FOUND)
+            return self._send(200, payload)
+        if parts.path == "/v7/finance/spark":
+            symbols = [s for s in query.get("symbols", [""])[0].split(",") if s]
+            return self._send(200, spark_payload(symbols))
+        return self._send(404, {"error": f"unknown path {parts.path}"})
+
+
+class MockYahoo:
+    """Run the mock server on a background thread (port 0 = pick a free one)."""
+
+    def __init__(self, host="127.0.0.1", port=0, latency=0.0, limit=0, fail=0.0):
+        self.server = ThreadingHTTPServer((host, port), _Handler)
+        self.server.daemon_threads = True
+        self.server.stats   = _Stats()
+        self.server.latency = latency
+        self.server.limit   = limit
+        self.server.fail    = fail
+        self.server.rng     = random.Random(0)
+        self.url    = f"http://{host}:{self.server.server_address[1]}"
+        self.thread = None
+
+    def start(self):
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def stats(self):
+        return self.server.stats.snapshot()
+
+    def reset(self):
+        with self.server.stats.lock:
+            self.server.stats.reset()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    ap.add_argument("--host", default="127.0.0.1")
+    ap.add_argument("--port", type=int, default=8765)
+    ap.add_argument("--latency", type=float, default=0.0, help="seconds added per request")
+    ap.add_argument("--limit", type=int, default=0, help="max requests per 1s window (0 = off)")
+    ap.add_argument("--fail", type=float, default=0.0, help="fraction of requests answered 503")
+    args = ap.parse_args()
+    mock = MockYahoo(args.host, args.port, args.latency, args.limit, args.fail)
+    print(f"Mock Yahoo on {mock.url}  (latency={args.latency}s, limit={args.limit or '∞'} req/s)")
+    try:
+        mock.server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        print(json.dumps(mock.stats()))
+        mock.server.server_close()
+
+
+if __name__ == "__main__":
+    main()